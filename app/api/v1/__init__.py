@@ -1,7 +1,12 @@
 """
 API v1 router initialization.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
+
+from app.cache import cache_stats
+from app.core.config import settings
+from app.core.database import async_db_manager, db_manager
+from app.write_behind import write_behind
 
 # Import only auth for now to isolate the issue
 from app.api.v1 import auth
@@ -27,3 +32,25 @@ except Exception as e:
 def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "version": "1.0.0"}
+
+@api_router.get("/health/caches", tags=["Health"])
+def cache_health():
+    """Hit/miss/expiration/eviction counters for the in-process caches."""
+    return {"caches": cache_stats()}
+
+@api_router.get("/health/db", tags=["Health"])
+def database_health():
+    """Database round trip plus connection pool statistics."""
+    try:
+        db_manager.execute_query("SELECT 1")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database unavailable: {e}"
+        )
+    return {
+        "status": "healthy",
+        "pool": db_manager.pool_stats(),
+        "async_pool": async_db_manager.pool_stats(),
+        "write_behind": write_behind.stats() if settings.write_behind_enabled else None,
+    }
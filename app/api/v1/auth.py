@@ -7,19 +7,31 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.config import settings
 from app.core.dependencies import get_auth_service, get_current_user
+from app.password_hashing import HasherSaturated
 from app.services.auth_service import AuthService
 from app.schemas.auth import UserCreate, UserResponse, TokenResponse, UserLogin
-from app.models.user import User
+from app.models.user import Principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+def _hashing_busy() -> HTTPException:
+    # Fail fast under a login burst instead of queueing behind bcrypt
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins at the moment, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     user_create: UserCreate,
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """Register a new user."""
-    success, message, user = auth_service.register_user(user_create)
+    try:
+        success, message, user = await auth_service.register_user_async(user_create)
+    except HasherSaturated:
+        raise _hashing_busy()
     
     if not success:
         raise HTTPException(
@@ -34,13 +46,16 @@ def register(
     )
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """Login and get access token."""
     user_login = UserLogin(username=form_data.username, password=form_data.password)
-    success, message, user = auth_service.authenticate_user(user_login)
+    try:
+        success, message, user = await auth_service.authenticate_user_async(user_login)
+    except HasherSaturated:
+        raise _hashing_busy()
     
     if not success:
         raise HTTPException(
@@ -59,7 +74,7 @@ def login(
     return TokenResponse(access_token=access_token, token_type="bearer")
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Get current user information."""
     return UserResponse(
         id=current_user.id,
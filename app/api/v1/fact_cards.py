@@ -1,7 +1,7 @@
 """
 Fact Cards API routes.
 """
-from typing import List, Optional
+from typing import List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 
@@ -43,9 +43,12 @@ class FactCardResponse(BaseModel):
 class FactCardsListResponse(BaseModel):
     """Schema for list of fact cards."""
     fact_cards: List[FactCardResponse]
-    total_count: int
+    # Counted for the first page only (None on cursor pages); keep the first page's value
+    total_count: Optional[int] = None
     category: str
     has_more: bool
+    # Pass back as ``cursor`` to get the next page; None on the last page
+    next_cursor: Optional[str] = None
 
 class FactCardStatsResponse(BaseModel):
     """Schema for fact card statistics."""
@@ -56,13 +59,13 @@ class FactCardStatsResponse(BaseModel):
 router = APIRouter(prefix="/fact-cards", tags=["Fact Cards"])
 
 @router.post("/save")
-def save_fact_card(
+async def save_fact_card(
     request: SaveFactCardRequest,
     user_id: int = Depends(get_current_user_id),
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
     """Save a search result as a fact card."""
-    fact_card = fact_card_service.save_search_result(
+    fact_card = await fact_card_service.save_search_result_async(
         user_id, 
         request.search_query, 
         request.search_result
@@ -77,76 +80,83 @@ def save_fact_card(
     return {"message": "Fact card saved successfully", "id": fact_card.id}
 
 @router.get("/", response_model=FactCardsListResponse)
-def get_fact_cards(
+async def get_fact_cards(
     category: str = Query(default="All", description="Category to filter by"),
     limit: int = Query(default=20, ge=1, le=100, description="Number of cards to return"),
-    offset: int = Query(default=0, ge=0, description="Offset for pagination"),
+    offset: int = Query(default=0, ge=0, description="Offset for pagination (ignored with cursor)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
     user_id: int = Depends(get_current_user_id),
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
-    """Get user's fact cards, optionally filtered by category."""
-    fact_cards = fact_card_service.get_user_fact_cards(user_id, category, limit, offset)
+    """Get user's fact cards, optionally filtered by category.
     
-    # Get total count for pagination
-    stats = fact_card_service.get_fact_card_stats(user_id)
-    if category.lower() == "all":
-        total_count = stats["total_fact_cards"]
-    else:
-        total_count = stats["category_counts"].get(category, 0)
-    
-    has_more = offset + limit < total_count
+    Page with ``cursor`` (constant cost at any depth); ``offset`` is kept for older clients.
+    """
+    try:
+        fact_cards, next_cursor, total_count = await fact_card_service.get_user_fact_cards_page_async(
+            user_id, category, limit, cursor, offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return FactCardsListResponse(
         fact_cards=fact_cards,
         total_count=total_count,
         category=category,
-        has_more=has_more
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor
     )
 
 @router.get("/categories")
-def get_user_categories(
+async def get_user_categories(
     user_id: int = Depends(get_current_user_id),
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
     """Get all categories that have fact cards for the user."""
-    categories = fact_card_service.get_user_categories(user_id)
+    categories = await fact_card_service.get_user_categories_async(user_id)
     return {"categories": categories}
 
 @router.get("/stats", response_model=FactCardStatsResponse)
-def get_fact_card_stats(
+async def get_fact_card_stats(
     user_id: int = Depends(get_current_user_id),
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
     """Get statistics about user's fact cards."""
-    stats = fact_card_service.get_fact_card_stats(user_id)
+    stats = await fact_card_service.get_fact_card_stats_async(user_id)
     return FactCardStatsResponse(**stats)
 
 @router.get("/search")
-def search_fact_cards(
+async def search_fact_cards(
     q: str = Query(..., description="Search term"),
     category: Optional[str] = Query(default=None, description="Category to filter by"),
     limit: int = Query(default=20, ge=1, le=100, description="Number of results"),
+    mode: Literal["fulltext", "substring"] = Query(
+        default="fulltext", description="fulltext: ranked word/prefix match; substring: plain LIKE match"
+    ),
     user_id: int = Depends(get_current_user_id),
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
-    """Search user's fact cards."""
-    fact_cards = fact_card_service.search_fact_cards(user_id, q, category, limit)
+    """Search user's fact cards, most relevant first."""
+    fact_cards = await fact_card_service.search_fact_cards_async(
+        user_id, q, category, limit, full_text=(mode == "fulltext")
+    )
     
     return {
         "fact_cards": fact_cards,
         "search_term": q,
         "category": category,
+        "mode": mode,
         "total_results": len(fact_cards)
     }
 
 @router.delete("/{fact_card_id}")
-def delete_fact_card(
+async def delete_fact_card(
     fact_card_id: int,
     user_id: int = Depends(get_current_user_id),
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
     """Delete a fact card."""
-    success = fact_card_service.delete_fact_card(user_id, fact_card_id)
+    success = await fact_card_service.delete_fact_card_async(user_id, fact_card_id)
     
     if not success:
         raise HTTPException(
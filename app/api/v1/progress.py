@@ -2,12 +2,12 @@
 Progress tracking API routes.
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 
 from app.core.dependencies import get_progress_service, get_current_user_id
 from app.services.progress_service import ProgressService
-from app.schemas.progress import ProgressResponse, CategoriesResponse
+from app.schemas.progress import ProgressResponse, CategoriesResponse, TimeseriesResponse
 
 class SearchActivityRequest(BaseModel):
     """Schema for search activity tracking."""
@@ -60,6 +60,15 @@ def get_categories_breakdown(
     
     return CategoriesResponse(categories=categories, total=total)
 
+@router.get("/timeseries", response_model=TimeseriesResponse)
+def get_activity_timeseries(
+    days: int = Query(7, ge=1, le=365, description="Number of days, ending today"),
+    user_id: int = Depends(get_current_user_id),
+    progress_service: ProgressService = Depends(get_progress_service)
+):
+    """Get user's daily activity counts for the activity chart."""
+    return TimeseriesResponse(**progress_service.get_timeseries(user_id, days))
+
 @router.post("/search")
 def track_search_activity(
     request: SearchActivityRequest,
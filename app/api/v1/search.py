@@ -1,11 +1,15 @@
 """
 Search API routes integrating existing search functionality.
 """
-from typing import List
+from contextlib import nullcontext
+from typing import List, Optional
 from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
+from app.core.config import settings
+from app.core.database import db_manager
 from app.core.dependencies import get_current_user_id, get_search_service, get_fact_card_service
+from app.schemas.health_categories import HealthCategory, classify_health_claim
 from app.services.search_service import SearchService
 from app.services.fact_card_service import FactCardService
 
@@ -29,6 +33,8 @@ class SearchResponse(BaseModel):
     explanation: str
     sources: List[dict]
     confidence: float
+    # Set when no verdict could be reached (e.g. "timeout" in batch runs)
+    error: Optional[str] = None
     
     class Config:
         schema_extra = {
@@ -47,6 +53,38 @@ class SearchResponse(BaseModel):
             }
         }
 
+class BatchSearchRequest(BaseModel):
+    """Schema for batch search request."""
+    claims: List[str]
+    
+    @field_validator("claims")
+    @classmethod
+    def validate_claims(cls, v: List[str]) -> List[str]:
+        # Rejected rather than dropped, so results[i] always answers claims[i]
+        blank = [i for i, claim in enumerate(v) if not claim.strip()]
+        if blank:
+            raise ValueError(f"claims must not be blank (positions {blank})")
+        if not v:
+            raise ValueError("claims must contain at least one claim")
+        if len(v) > settings.batch_verify_max_claims:
+            raise ValueError(f"at most {settings.batch_verify_max_claims} claims per batch")
+        return v
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "claims": [
+                    "Eating vegetables daily improves overall health",
+                    "Vitamin C prevents the common cold"
+                ]
+            }
+        }
+
+class BatchSearchResponse(BaseModel):
+    """Schema for batch search response."""
+    results: List[SearchResponse]
+    total: int
+
 @router.post("/verify", response_model=SearchResponse)
 def search_verified_claim(
     request: SearchRequest,
@@ -55,9 +93,22 @@ def search_verified_claim(
     fact_card_service: FactCardService = Depends(get_fact_card_service)
 ):
     """Search and verify a health claim."""
-    result = search_service.search_verified_claim(request.claim, user_id)
+    # Network work first, so no database connection is held while searching
+    result = search_service.verify_claim(request.claim)
+    # Classification is an OpenAI call too: once, before any connection is borrowed
+    category = classify_health_claim(request.claim)
+    
+    # Progress and the automatic fact card share one connection and one commit,
+    # unless they are queued for the write-behind buffer's next batch
+    with nullcontext() if settings.write_behind_enabled else db_manager.transaction():
+        search_service.record_search(user_id, request.claim, result, category)
+        _save_fact_card(fact_card_service, user_id, request.claim, result, category)
     
-    # Automatically save the search result as a fact card
+    return SearchResponse(**result)
+
+def _save_fact_card(fact_card_service: FactCardService, user_id: int, claim: str, result: dict,
+                    category: HealthCategory):
+    """Automatically save the search result as a fact card."""
     try:
         # Convert search result to fact card format
         search_result_for_card = {
@@ -74,12 +125,25 @@ def search_verified_claim(
         }
         
         # Save as fact card
-        fact_card_service.save_search_result(user_id, request.claim, search_result_for_card)
+        fact_card_service.save_search_result(user_id, claim, search_result_for_card, category)
     except Exception as e:
         # Don't fail the search if fact card saving fails
         print(f"Warning: Failed to save fact card: {e}")
-    
-    return SearchResponse(**result)
+
+@router.post("/verify/batch", response_model=BatchSearchResponse,
+             dependencies=[Depends(get_current_user_id)])
+async def search_verified_claims_batch(
+    request: BatchSearchRequest,
+    search_service: SearchService = Depends(get_search_service)
+):
+    """Verify a batch of health claims, sharing search and page fetches across claims."""
+    results = await search_service.verify_claims_batch_async(
+        request.claims, deadline=settings.batch_verify_deadline_seconds
+    )
+    return BatchSearchResponse(
+        results=[SearchResponse(**result) for result in results],
+        total=len(results)
+    )
 
 @router.get("/history")
 def get_search_history(
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Callable, Sequence
+
+import numpy as np
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed passage set, scored with NumPy.
+
+    Term statistics are built once, term-major (CSC-style postings), so scoring a
+    query only touches the postings of its terms and is a single ``bincount``.
+    Parameters and the negative-idf floor match ``rank_bm25.BM25Okapi``, and
+    per-document sums are accumulated in the same order, so scores are identical.
+    """
+
+    def __init__(
+        self,
+        passages: Sequence[str],
+        tokenizer: Callable[[str], list[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ):
+        self.passages = list(passages)
+        self.k1 = k1
+        self.b = b
+        n_docs = len(self.passages)
+
+        vocab: dict[str, int] = {}
+        term_ids: list[int] = []
+        doc_ids: list[int] = []
+        freqs: list[int] = []
+        doc_len = np.zeros(n_docs, dtype=np.float64)
+        first_seen: dict[str, int] = {}
+        first_index = np.empty(n_docs, dtype=np.int64)
+        for d, passage in enumerate(self.passages):
+            first_index[d] = first_seen.setdefault(passage, d)
+            tokens = tokenizer(passage)
+            doc_len[d] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(d)
+                freqs.append(tf)
+
+        self._vocab = vocab
+        # Ties are broken like the original sort key: by first occurrence of the passage
+        self._first_index = first_index
+        self._n_docs = n_docs
+        if not vocab:
+            self._indptr = np.zeros(1, dtype=np.int64)
+            self._post_docs = np.zeros(0, dtype=np.int64)
+            self._post_weights = np.zeros(0, dtype=np.float64)
+            return
+
+        tids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(tids, kind="stable")
+        post_docs = np.asarray(doc_ids, dtype=np.int64)[order]
+        post_tf = np.asarray(freqs, dtype=np.float64)[order]
+        post_tids = tids[order]
+
+        df = np.bincount(tids, minlength=len(vocab))
+        # math.log and a plain running sum (not the compensated sum() of Python 3.12+)
+        # keep idf bit-for-bit equal to rank_bm25
+        idf_values = [math.log(n_docs - f + 0.5) - math.log(f + 0.5) for f in df.tolist()]
+        idf_sum = 0.0
+        for value in idf_values:
+            idf_sum += value
+        floor = epsilon * (idf_sum / len(idf_values))
+        idf = np.asarray([v if v >= 0 else floor for v in idf_values], dtype=np.float64)
+
+        avgdl = doc_len.sum() / n_docs
+        norm = k1 * (1 - b + b * doc_len / avgdl)
+
+        self._indptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self._post_docs = post_docs
+        # Each posting's contribution is query-independent, so precompute it
+        self._post_weights = idf[post_tids] * (post_tf * (k1 + 1) / (post_tf + norm[post_docs]))
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index (passages, vocabulary and postings)."""
+        arrays = (self._first_index, self._indptr, self._post_docs, self._post_weights)
+        return (
+            sum(len(passage) for passage in self.passages)
+            + sum(len(term) + 64 for term in self._vocab)
+            + sum(array.nbytes for array in arrays)
+        )
+
+    def get_scores(self, query_tokens: list[str]) -> np.ndarray:
+        slices = []
+        for token in query_tokens:
+            tid = self._vocab.get(token)
+            if tid is not None:
+                slices.append(slice(self._indptr[tid], self._indptr[tid + 1]))
+        if not slices:
+            return np.zeros(self._n_docs, dtype=np.float64)
+        docs = np.concatenate([self._post_docs[s] for s in slices])
+        weights = np.concatenate([self._post_weights[s] for s in slices])
+        return np.bincount(docs, weights=weights, minlength=self._n_docs)
+
+    def top_k(self, query_tokens: list[str], k: int) -> list[tuple[float, str]]:
+        """Highest-scoring ``(score, passage)`` pairs, best first."""
+        n = self._n_docs
+        k = min(int(k), n)
+        if k <= 0:
+            return []
+        scores = self.get_scores(query_tokens)
+        if k < n:
+            # argpartition finds the k-th best score; keep everything tied with it
+            # so the tie-break below sees the same candidates a full sort would
+            threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+            candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(n)
+        order = np.lexsort((candidates, -self._first_index[candidates], -scores[candidates]))
+        top = candidates[order[:k]]
+        return [(float(scores[i]), self.passages[i]) for i in top]
@@ -1,33 +1,389 @@
+import asyncio
+import heapq
+import itertools
+import sys
+import threading
 import time
+import weakref
 from collections import OrderedDict
-from typing import Any, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Iterator
+
+from .concurrency import SingleFlight
+
+
+# Named caches, so their counters can be scraped at runtime (see cache_stats())
+_REGISTRY: "weakref.WeakValueDictionary[str, TTLCache]" = weakref.WeakValueDictionary()
+# Every live cache, swept by the background janitor
+_ALL_CACHES: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _refresh_pool() -> ThreadPoolExecutor:
+    # Runs stale-while-revalidate refreshes for sync callers
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="healthfact-cache-refresh")
+        return _refresh_executor
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a cached value, in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class _Shard:
+    __slots__ = (
+        "lock", "store", "expiry", "seq", "maxsize", "maxbytes", "bytes",
+        "hits", "stale_hits", "misses", "expirations", "evictions", "rejections", "refreshes",
+    )
+
+    def __init__(self, maxsize: int, maxbytes: int | None):
+        self.lock = threading.Lock()
+        # key -> (monotonic hard expiry, value, estimated size, monotonic end of freshness)
+        self.store: "OrderedDict[Hashable, tuple[float, Any, int, float]]" = OrderedDict()
+        # Min-heap of (expiry, seq, key). Records for overwritten/evicted keys are
+        # left in place and skipped when popped; compact_expiry() bounds their number.
+        self.expiry: list[tuple[float, int, Hashable]] = []
+        self.seq = itertools.count()
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.refreshes = 0
+
+    def pop(self, key: Hashable) -> bool:
+        item = self.store.pop(key, None)
+        if item is None:
+            return False
+        self.bytes -= item[2]
+        return True
+
+    def over_budget(self) -> bool:
+        return len(self.store) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes)
+
+    def schedule(self, key: Hashable, expires_at: float) -> None:
+        heapq.heappush(self.expiry, (expires_at, next(self.seq), key))
+        if len(self.expiry) > 2 * len(self.store) + 64:
+            self.compact_expiry()
+
+    def compact_expiry(self) -> None:
+        self.expiry = [(item[0], next(self.seq), key) for key, item in self.store.items()]
+        heapq.heapify(self.expiry)
+
+    def purge(self, now: float) -> int:
+        """Drop entries whose expiry has passed; O(log n) per reclaimed record."""
+        purged = 0
+        while self.expiry and self.expiry[0][0] < now:
+            expires_at, _, key = heapq.heappop(self.expiry)
+            item = self.store.get(key)
+            if item is not None and item[0] == expires_at:
+                self.pop(key)
+                self.expirations += 1
+                purged += 1
+        return purged
 
 
 class TTLCache:
-    def __init__(self, maxsize: int = 256, ttl_seconds: int = 60):
+    """Thread-safe LRU cache with a per-entry TTL.
+
+    Keys are spread over ``shards`` independently locked segments, so concurrent
+    threadpool requests only contend when they hit the same shard. LRU order and
+    capacity are tracked per shard.
+
+    TTLs use the monotonic clock; set() can give one entry its own TTL. Expired
+    entries are reclaimed from a per-shard expiry heap on every write and by the
+    background janitor (start_janitor()), so memory tracks the live working set
+    rather than waiting for LRU pressure.
+
+    With ``maxbytes`` the cache is also bounded by the estimated size of its values
+    (``sizeof``, default estimate_size()): least recently used entries are evicted
+    until the cache is back under budget. Values larger than ``max_entry_bytes``
+    (or than one shard's share of ``maxbytes``) are not cached at all.
+
+    With ``stale_ttl_seconds`` an entry stays servable for that long after its TTL:
+    get_or_compute()/aget_or_compute() return the stale value immediately and refresh
+    it in the background. Plain get() only returns fresh values.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl_seconds: int = 60,
+        shards: int = 8,
+        name: str | None = None,
+        maxbytes: int | None = None,
+        max_entry_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+        stale_ttl_seconds: float = 0,
+    ):
         self.maxsize = maxsize
         self.ttl_seconds = ttl_seconds
-        self._store: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.name = name
+        self.maxbytes = maxbytes
+        self.max_entry_bytes = max_entry_bytes
+        self._sizeof = sizeof or estimate_size
+        count = max(1, min(shards, maxsize))
+        self._shards = [
+            _Shard(
+                maxsize // count + (1 if i < maxsize % count else 0),
+                maxbytes // count if maxbytes is not None else None,
+            )
+            for i in range(count)
+        ]
+        self._flights = SingleFlight()
+        self._refresh_tasks: set[asyncio.Task] = set()
+        _ALL_CACHES.add(self)
+        if name:
+            _REGISTRY[name] = self
 
-    def get(self, key: Hashable) -> Any | None:
-        now = time.time()
-        item = self._store.get(key)
+    def _shard(self, key: Hashable) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _lookup(self, shard: _Shard, key: Hashable, now: float) -> tuple[Any, bool] | None:
+        # Caller holds shard.lock; returns (value, is_fresh)
+        item = shard.store.get(key)
         if not item:
             return None
-        ts, value = item
-        if now - ts > self.ttl_seconds:
-            self._store.pop(key, None)
+        expires_at, value, _, fresh_until = item
+        if now > expires_at:
+            shard.pop(key)
+            shard.expirations += 1
             return None
         # refresh LRU order
-        self._store.move_to_end(key)
-        return value
+        shard.store.move_to_end(key)
+        return value, now <= fresh_until
+
+    def _read(self, key: Hashable, allow_stale: bool) -> tuple[Any, bool] | None:
+        shard = self._shard(key)
+        with shard.lock:
+            found = self._lookup(shard, key, time.monotonic())
+            if found is None or not (found[1] or allow_stale):
+                shard.misses += 1
+                return None
+            if found[1]:
+                shard.hits += 1
+            else:
+                shard.stale_hits += 1
+            return found
+
+    def get(self, key: Hashable) -> Any | None:
+        found = self._read(key, allow_stale=False)
+        return found[0] if found is not None else None
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        """Store ``value``; ``ttl_seconds`` overrides the cache's TTL for this entry."""
+        now = time.monotonic()
+        fresh_until = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        expires_at = fresh_until + self.stale_ttl_seconds
+        shard = self._shard(key)
+        size = self._sizeof(value) if self.maxbytes is not None or self.max_entry_bytes is not None else 0
+        with shard.lock:
+            shard.purge(now)
+            shard.pop(key)
+            if (self.max_entry_bytes is not None and size > self.max_entry_bytes) or (
+                shard.maxbytes is not None and size > shard.maxbytes
+            ):
+                shard.rejections += 1
+                return
+            shard.store[key] = (expires_at, value, size, fresh_until)
+            shard.bytes += size
+            shard.schedule(key, expires_at)
+            while shard.over_budget():
+                _, (_, _, evicted_size, _) = shard.store.popitem(last=False)
+                shard.bytes -= evicted_size
+                shard.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.pop(key)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.store.clear()
+                shard.expiry.clear()
+                shard.bytes = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard.store) for shard in self._shards)
+
+    def purge_expired(self) -> int:
+        """Reclaim every expired entry now; returns how many were dropped."""
+        now = time.monotonic()
+        purged = 0
+        for shard in self._shards:
+            with shard.lock:
+                purged += shard.purge(now)
+        return purged
+
+    def _peek(self, key: Hashable) -> Any | None:
+        # Fresh value without touching the counters
+        shard = self._shard(key)
+        with shard.lock:
+            found = self._lookup(shard, key, time.monotonic())
+            return found[0] if found is not None and found[1] else None
+
+    def _note_refresh(self, key: Hashable) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.refreshes += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any | None:
+        """Return the cached value, or compute it once for all concurrent callers.
+
+        ``compute`` returning None means "nothing to cache" (e.g. an upstream error).
+        A stale value is returned as-is while a background thread recomputes it.
+        """
+
+        def fill() -> Any | None:
+            # Another caller may have filled the entry while we waited to lead
+            cached = self._peek(key)
+            if cached is not None:
+                return cached
+            result = compute()
+            if result is not None:
+                self.set(key, result)
+            return result
+
+        found = self._read(key, allow_stale=True)
+        if found is not None:
+            value, fresh = found
+            if not fresh and not self._flights.in_flight(key):
+                self._note_refresh(key)
+                _refresh_pool().submit(self._flights.do, key, fill)
+            return value
+
+        return self._flights.do(key, fill)
+
+    async def aget_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any | None:
+        """Async counterpart of get_or_compute(); ``compute`` is a coroutine function."""
+
+        async def fill() -> Any | None:
+            cached = self._peek(key)
+            if cached is not None:
+                return cached
+            result = await compute()
+            if result is not None:
+                self.set(key, result)
+            return result
+
+        found = self._read(key, allow_stale=True)
+        if found is not None:
+            value, fresh = found
+            if not fresh and not self._flights.in_flight(key):
+                self._note_refresh(key)
+                task = asyncio.ensure_future(self._flights.do_async(key, fill))
+                # Hold a reference until done; a failed refresh just leaves the stale value
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_done)
+            return value
+
+        return await self._flights.do_async(key, fill)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        totals = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "expirations": 0, "evictions": 0,
+            "rejections": 0, "refreshes": 0, "size": 0, "bytes": 0,
+        }
+        for shard in self._shards:
+            with shard.lock:
+                totals["hits"] += shard.hits
+                totals["stale_hits"] += shard.stale_hits
+                totals["refreshes"] += shard.refreshes
+                totals["misses"] += shard.misses
+                totals["expirations"] += shard.expirations
+                totals["evictions"] += shard.evictions
+                totals["rejections"] += shard.rejections
+                totals["size"] += len(shard.store)
+                totals["bytes"] += shard.bytes
+        lookups = totals["hits"] + totals["stale_hits"] + totals["misses"]
+        return {
+            "name": self.name,
+            "maxsize": self.maxsize,
+            "maxbytes": self.maxbytes,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_ttl_seconds": self.stale_ttl_seconds,
+            **totals,
+            "hit_ratio": round((totals["hits"] + totals["stale_hits"]) / lookups, 4) if lookups else None,
+        }
+
+
+def cache_stats() -> list[dict[str, Any]]:
+    """Counters for every named cache in this process."""
+    return [cache.stats() for _, cache in sorted(_REGISTRY.items())]
+
+
+# Per-request memo (see request_scope()); shared by the request's task and the
+# threadpool threads it hands work to, since they all see the same dict
+_request_memo: ContextVar[dict | None] = ContextVar("healthfact_request_memo", default=None)
+
+
+@contextmanager
+def request_scope() -> Iterator[dict]:
+    """Give everything running inside the block one shared memo dict (one per HTTP request)."""
+    token = _request_memo.set({})
+    try:
+        yield _request_memo.get()
+    finally:
+        _request_memo.reset(token)
+
+
+def request_memo() -> dict | None:
+    """The current request's memo, or None outside request_scope()."""
+    return _request_memo.get()
+
+
+_janitor: threading.Thread | None = None
+_janitor_stop = threading.Event()
+_janitor_lock = threading.Lock()
+
+
+def _sweep_forever(interval: float) -> None:
+    while not _janitor_stop.wait(interval):
+        for cache in list(_ALL_CACHES):
+            cache.purge_expired()
 
-    def set(self, key: Hashable, value: Any) -> None:
-        now = time.time()
-        self._store[key] = (now, value)
-        self._store.move_to_end(key)
-        while len(self._store) > self.maxsize:
-            self._store.popitem(last=False)
 
+def start_janitor(interval_seconds: float) -> None:
+    """Start the daemon thread that purges expired entries from every cache."""
+    global _janitor
+    with _janitor_lock:
+        if _janitor is not None and _janitor.is_alive():
+            return
+        _janitor_stop.clear()
+        _janitor = threading.Thread(
+            target=_sweep_forever, args=(interval_seconds,), name="healthfact-cache-janitor", daemon=True
+        )
+        _janitor.start()
 
 
+def stop_janitor() -> None:
+    global _janitor
+    with _janitor_lock:
+        _janitor_stop.set()
+        if _janitor is not None:
+            _janitor.join(timeout=5)
+        _janitor = None
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    # One long-lived loop shared by every sync caller, so async clients and
+    # in-flight tasks outlive a single request instead of dying with asyncio.run().
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="healthfact-aio", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run a coroutine from sync code (FastAPI threadpool routes, scripts) and wait for it."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+        return future.result(timeout)
+    coro.close()
+    raise RuntimeError("run_sync() cannot be called from a running event loop; await the coroutine instead")
+
+
+class _Abandoned(Exception):
+    """The leading caller was cancelled before producing a result; followers retry."""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one in-flight computation.
+
+    Works across threads and event loops: the shared slot is a ``concurrent.futures.Future``,
+    so sync callers block on it and async callers await it. The slot is dropped as soon as
+    the computation finishes, so this only de-duplicates work that overlaps in time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def _claim(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            # A running future cannot be cancelled by a follower that gives up waiting
+            future.set_running_or_notify_cancel()
+            self._calls[key] = future
+            return future, True
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        while True:
+            future, leader = self._claim(key)
+            if not leader:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                future.set_exception(exc)
+                raise
+            except BaseException:
+                future.set_exception(_Abandoned())
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._release(key, future)
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        while True:
+            future, leader = self._claim(key)
+            if not leader:
+                try:
+                    return await asyncio.wrap_future(future)
+                except _Abandoned:
+                    continue
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                future.set_exception(exc)
+                raise
+            except BaseException:
+                future.set_exception(_Abandoned())
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._release(key, future)
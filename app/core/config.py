@@ -32,7 +32,14 @@ class Settings(BaseModel):
 
     @property
     def is_postgresql(self) -> bool:
-        return True
+        # PostgreSQL unless DATABASE_URL points at a SQLite file (local development)
+        return not (self.DATABASE_URL or "").lower().startswith("sqlite")
+    
+    @property
+    def sqlite_path(self) -> str:
+        """Database file of a ``sqlite:///path`` DATABASE_URL."""
+        url = self.DATABASE_URL or ""
+        return url.split(":///", 1)[1] if ":///" in url else "healthfact.db"
     
     # External API Keys
     bing_api_key: Optional[str] = Field(default=os.getenv("BING_API_KEY"))
@@ -43,6 +50,13 @@ class Settings(BaseModel):
     secret_key: str = Field(default=os.getenv("SECRET_KEY", "supersecretkey"))
     algorithm: str = Field(default=os.getenv("ALGORITHM", "HS256"))
     access_token_expire_minutes: int = Field(default=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")))
+    # Verified tokens remembered (by SHA-256 digest) until they expire; 0 disables
+    token_cache_max_entries: int = Field(default=int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000")))
+    # bcrypt cost; stored hashes with a different cost are rehashed on the next login
+    bcrypt_rounds: int = Field(default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    # Dedicated hashing threads and how many more calls may wait before requests get a 503
+    password_hash_workers: int = Field(default=int(os.getenv("PASSWORD_HASH_WORKERS", "2")))
+    password_hash_queue_limit: int = Field(default=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "16")))
     
     # Search & Retrieval Settings
     allowed_domains: List[str] = Field(default_factory=lambda: [
@@ -59,6 +73,63 @@ class Settings(BaseModel):
     request_timeout_seconds: int = Field(default=int(os.getenv("REQUEST_TIMEOUT_SECONDS", "10")))
     cache_ttl_search_min: int = Field(default=int(os.getenv("CACHE_TTL_SEARCH_MIN", "30")))
     cache_ttl_page_min: int = Field(default=int(os.getenv("CACHE_TTL_PAGE_MIN", "60")))
+    # Stale-while-revalidate: how long past its TTL an entry may still be served (0 disables)
+    cache_max_stale_search_min: int = Field(default=int(os.getenv("CACHE_MAX_STALE_SEARCH_MIN", "30")))
+    cache_max_stale_page_min: int = Field(default=int(os.getenv("CACHE_MAX_STALE_PAGE_MIN", "360")))
+    page_cache_max_mb: int = Field(default=int(os.getenv("PAGE_CACHE_MAX_MB", "64")))
+    page_cache_max_entry_kb: int = Field(default=int(os.getenv("PAGE_CACHE_MAX_ENTRY_KB", "2048")))
+    bm25_cache_max_mb: int = Field(default=int(os.getenv("BM25_CACHE_MAX_MB", "32")))
+    # How often the background janitor reclaims expired cache entries (0 disables it)
+    cache_sweep_interval_seconds: float = Field(default=float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "30")))
+    
+    # Verified search fan-out: "serial" queries LangSearch then Bing, "first" races both
+    # and returns the first usable result set, "merge" dedupes both within the deadline
+    search_fanout_mode: str = Field(default=os.getenv("SEARCH_FANOUT_MODE", "first").lower())
+    search_hedge_delay_ms: int = Field(default=int(os.getenv("SEARCH_HEDGE_DELAY_MS", "300")))
+    search_fanout_deadline_seconds: float = Field(default=float(os.getenv("SEARCH_FANOUT_DEADLINE_SECONDS", "10")))
+    # Overall budget for fetching/extracting source pages of one verify; late pages are skipped
+    fetch_deadline_seconds: float = Field(default=float(os.getenv("FETCH_DEADLINE_SECONDS", "6")))
+    
+    # Batch claim verification
+    batch_verify_max_claims: int = Field(default=int(os.getenv("BATCH_VERIFY_MAX_CLAIMS", "500")))
+    batch_verify_concurrency: int = Field(default=int(os.getenv("BATCH_VERIFY_CONCURRENCY", "8")))
+    # Per source page, counted from when the page gets a fetch slot; claims whose pages
+    # all time out are reported with error="timeout" rather than as a verdict
+    batch_fetch_timeout_seconds: float = Field(default=float(os.getenv("BATCH_FETCH_TIMEOUT_SECONDS", "15")))
+    # Whole batch; when it runs out every claim is reported with error="timeout"
+    batch_verify_deadline_seconds: float = Field(default=float(os.getenv("BATCH_VERIFY_DEADLINE_SECONDS", "60")))
+    
+    # Shared outbound HTTP client (search providers, source pages, rerank)
+    http2_enabled: bool = Field(default=(os.getenv("HTTP2_ENABLED", "true").lower() == "true"))
+    http_connect_timeout_seconds: float = Field(default=float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5")))
+    http_max_connections: int = Field(default=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")))
+    http_max_keepalive_connections: int = Field(default=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")))
+    http_keepalive_expiry_seconds: float = Field(default=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")))
+    
+    # PostgreSQL connection pool
+    db_pool_min_size: int = Field(default=int(os.getenv("DB_POOL_MIN_SIZE", "1")))
+    db_pool_max_size: int = Field(default=int(os.getenv("DB_POOL_MAX_SIZE", "10")))
+    # How long a request waits for a free connection before failing
+    db_pool_timeout_seconds: float = Field(default=float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10")))
+    # Recycle connections periodically so server-side/pgbouncer limits never cut them mid-request
+    db_pool_max_lifetime_seconds: float = Field(default=float(os.getenv("DB_POOL_MAX_LIFETIME_SECONDS", "1800")))
+    db_pool_max_idle_seconds: float = Field(default=float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300")))
+    db_pool_check: bool = Field(default=(os.getenv("DB_POOL_CHECK", "true").lower() == "true"))
+    db_connect_timeout_seconds: int = Field(default=int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10")))
+    
+    # Users loaded for authenticated requests; writes invalidate this process's copy,
+    # so with several workers another worker may serve a copy up to the TTL old
+    user_cache_ttl_seconds: int = Field(default=int(os.getenv("USER_CACHE_TTL_SECONDS", "30")))
+    user_cache_max_entries: int = Field(default=int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000")))
+    
+    # Write-behind: queue progress/fact-card writes of /search/verify and flush them in batches
+    write_behind_enabled: bool = Field(default=(os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"))
+    write_behind_batch_size: int = Field(default=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200")))
+    write_behind_flush_interval_seconds: float = Field(default=float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_SECONDS", "1")))
+    # Above this many queued writes the request thread flushes inline (backpressure)
+    write_behind_max_pending: int = Field(default=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000")))
+    # Failed attempts before a batch is written row by row and bad rows are dead-lettered
+    write_behind_max_retries: int = Field(default=int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3")))
     
     # CORS Settings
     allowed_origins: List[str] = Field(default_factory=lambda: [
@@ -75,6 +146,13 @@ class Settings(BaseModel):
             raise ValueError("ALLOWED_DOMAINS must not be empty")
         return [domain.lower().strip() for domain in v]
     
+    @field_validator("search_fanout_mode")
+    @classmethod
+    def validate_fanout_mode(cls, v: str) -> str:
+        if v not in ("serial", "first", "merge"):
+            raise ValueError("SEARCH_FANOUT_MODE must be one of: serial, first, merge")
+        return v
+    
     @field_validator("allowed_origins")
     @classmethod
     def validate_origins(cls, v: List[str]) -> List[str]:
@@ -2,160 +2,575 @@
 Database connection manager supporting both PostgreSQL and SQLite.
 PostgreSQL is the primary choice for production, SQLite for development fallback.
 """
+import asyncio
+import itertools
 import os
-from typing import Union, Optional
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Union, Optional
 import sqlite3
 import psycopg
+from psycopg.conninfo import make_conninfo
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
 from .config import settings
 
+
+class DatabaseUnavailable(Exception):
+    """No pooled connection became free within ``db_pool_timeout_seconds``; retry later."""
+
+
+def _conninfo() -> str:
+    if settings.DATABASE_URL and "postgresql" in settings.DATABASE_URL.lower():
+        # Use DATABASE_URL if provided (Supabase style)
+        return settings.DATABASE_URL
+    # Use individual connection parameters
+    return make_conninfo(
+        host=settings.DB_HOST,
+        dbname=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        port=settings.DB_PORT,
+    )
+
+
+def _pool_options() -> Dict[str, Any]:
+    """Pool configuration shared by the sync and async pools."""
+    return {
+        "min_size": settings.db_pool_min_size,
+        "max_size": settings.db_pool_max_size,
+        "kwargs": {
+            "row_factory": dict_row,
+            "connect_timeout": settings.db_connect_timeout_seconds,
+            "autocommit": False,
+        },
+        "timeout": settings.db_pool_timeout_seconds,
+        "max_lifetime": settings.db_pool_max_lifetime_seconds,
+        "max_idle": settings.db_pool_max_idle_seconds,
+        "open": False,
+    }
+
+
+# Connection of the transaction() block enclosing the current thread/task, if any
+_active_connection: ContextVar[Optional[Any]] = ContextVar("db_active_connection", default=None)
+_active_async_connection: ContextVar[Optional[Any]] = ContextVar("db_active_async_connection", default=None)
+_savepoint_ids = itertools.count(1)
+# Callbacks to run once the enclosing transaction() commits (see on_commit())
+_commit_callbacks: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar("db_commit_callbacks", default=None)
+_async_commit_callbacks: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar(
+    "db_async_commit_callbacks", default=None
+)
+# Thread running the SQLite fallback of the enclosing async transaction() (see
+# AsyncDatabaseManager._sqlite_transaction)
+_sqlite_worker: ContextVar[Optional[ThreadPoolExecutor]] = ContextVar("db_sqlite_worker", default=None)
+
+
+def _run_callbacks(callbacks: List[Callable[[], None]]) -> None:
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error in on_commit callback: {e}")
+
+
+@contextmanager
+def _savepoint(conn) -> Iterator[None]:
+    name = f"sp_{next(_savepoint_ids)}"
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        raise
+    else:
+        conn.execute(f"RELEASE SAVEPOINT {name}")
+
+
+@asynccontextmanager
+async def _async_savepoint(conn) -> AsyncIterator[None]:
+    name = f"sp_{next(_savepoint_ids)}"
+    await conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        await conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        raise
+    else:
+        await conn.execute(f"RELEASE SAVEPOINT {name}")
+
+
+def _sqlite_sql(sql: str) -> str:
+    """Repositories write psycopg-style ``%s`` placeholders; sqlite3 expects ``?``."""
+    return sql.replace("%s", "?")
+
+
+def _first_value(row) -> Any:
+    if isinstance(row, dict):
+        # psycopg3 with dict_row returns a dict
+        return list(row.values())[0]
+    # tuple result
+    return row[0]
+
 class DatabaseManager:
     """Database connection manager supporting both SQLite and PostgreSQL"""
     
     def __init__(self):
         self.db_type = settings.DB_TYPE
-        self.connection = None
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
     
-    def get_connection(self):
-        """Get database connection based on configuration"""
-        if settings.is_postgresql:
-            return self._get_postgresql_connection()
-        else:
-            return self._get_sqlite_connection()
+    @property
+    def pool(self) -> ConnectionPool:
+        """PostgreSQL connection pool, opened on first use."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._create_pool()
+        return self._pool
     
-    def _get_postgresql_connection(self):
-        """Get PostgreSQL connection with retry logic"""
-        import time
-        max_retries = 3
-        retry_delay = 1
+    def _create_pool(self) -> ConnectionPool:
+        """Create and open the PostgreSQL pool.
         
-        for attempt in range(max_retries):
+        Connections are established in the background and re-established by the
+        pool if the server drops them, so request threads never sleep on retries;
+        they wait at most db_pool_timeout_seconds for a free connection.
+        """
+        pool = ConnectionPool(
+            _conninfo(),
+            # Validate a connection before handing it out (cheap when it is healthy)
+            check=ConnectionPool.check_connection if settings.db_pool_check else None,
+            name="healthfact",
+            **_pool_options(),
+        )
+        pool.open(wait=False)
+        return pool
+    
+    def open(self, wait: bool = False, timeout: float = 30.0):
+        """Open the pool ahead of the first request (application startup)."""
+        if not settings.is_postgresql:
+            return
+        pool = self.pool
+        if wait:
+            pool.wait(timeout=timeout)
+    
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a database connection for the duration of the block."""
+        if settings.is_postgresql:
             try:
-                if settings.DATABASE_URL and "postgresql" in settings.DATABASE_URL.lower():
-                    # Use DATABASE_URL if provided (Supabase style)
-                    return psycopg.connect(
-                        settings.DATABASE_URL, 
-                        row_factory=dict_row,
-                        connect_timeout=10,
-                        autocommit=False
-                    )
-                else:
-                    # Use individual connection parameters
-                    return psycopg.connect(
-                        host=settings.DB_HOST,
-                        dbname=settings.DB_NAME,
-                        user=settings.DB_USER,
-                        password=settings.DB_PASSWORD,
-                        port=settings.DB_PORT,
-                        row_factory=dict_row,
-                        connect_timeout=10,
-                        autocommit=False
-                    )
-            except Exception as e:
-                print(f"Connection attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise Exception(f"PostgreSQL connection failed after {max_retries} attempts: {e}")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
+                with self.pool.connection() as conn:
+                    yield conn
+            except PoolTimeout as e:
+                raise DatabaseUnavailable(
+                    f"No PostgreSQL connection available within {settings.db_pool_timeout_seconds}s"
+                ) from e
+        else:
+            conn = self._get_sqlite_connection()
+            try:
+                yield conn
+            finally:
+                conn.close()
     
     def _get_sqlite_connection(self):
         """Get SQLite connection (fallback)"""
         try:
-            return sqlite3.connect(settings.DB_NAME)
+            conn = sqlite3.connect(settings.sqlite_path)
+            conn.execute("PRAGMA foreign_keys = ON")
+            return conn
         except Exception as e:
             raise Exception(f"SQLite connection failed: {e}")
     
+    def pool_stats(self) -> Dict[str, Any]:
+        """Pool sizing and counters (connections served, waiting, timeouts, ...)."""
+        if not settings.is_postgresql:
+            return {"backend": "sqlite", "pooled": False}
+        pool = self.pool
+        return {
+            "backend": "postgresql",
+            "pooled": True,
+            "min_size": pool.min_size,
+            "max_size": pool.max_size,
+            "timeout_seconds": pool.timeout,
+            "max_lifetime_seconds": pool.max_lifetime,
+            **pool.get_stats(),
+        }
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """Unit of work: run several repository calls on one connection with one commit.
+    
+        Every execute_* inside the block (in this thread/task) reuses the block's
+        connection instead of borrowing its own and committing. Nested blocks become
+        savepoints, so an inner failure can be caught without losing the outer work.
+        """
+        conn = _active_connection.get()
+        if conn is not None:
+            with _savepoint(conn):
+                yield conn
+            return
+    
+        with self.connection() as conn:
+            if not settings.is_postgresql:
+                # sqlite3 only opens a transaction implicitly before DML; make it explicit
+                # so savepoints and leading SELECTs are covered too
+                conn.execute("BEGIN")
+            token = _active_connection.set(conn)
+            callbacks_token = _commit_callbacks.set([])
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+                _run_callbacks(_commit_callbacks.get())
+            finally:
+                _commit_callbacks.reset(callbacks_token)
+                _active_connection.reset(token)
+    
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` after the enclosing transaction() commits (now if there is none,
+        i.e. the caller's statements have already committed on their own)."""
+        callbacks = _commit_callbacks.get()
+        if _active_connection.get() is not None and callbacks is not None:
+            callbacks.append(callback)
+        else:
+            _run_callbacks([callback])
+    
+    @contextmanager
+    def _unit_of_work(self) -> Iterator[Any]:
+        """Yield ``(conn, owned)``: the enclosing transaction's connection, or a fresh one
+        that the caller commits itself."""
+        conn = _active_connection.get()
+        if conn is not None:
+            yield conn, False
+            return
+        with self.connection() as conn:
+            yield conn, True
+    
     def execute_query(self, query: str, params: tuple = None):
         """Execute a SELECT query and return results"""
-        conn = None
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
+        with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = conn.cursor()
+                if not settings.is_postgresql:
+                    query = _sqlite_sql(query)
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                
+                if query.strip().upper().startswith('SELECT'):
+                    results = cursor.fetchall()
+                else:
+                    results = cursor.rowcount
+                # Also ends a read-only transaction before the connection goes back to the pool
+                if owned:
+                    conn.commit()
                 return results
-            else:
-                conn.commit()
-                return cursor.rowcount
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
-        finally:
-            if conn:
-                conn.close()
+            except Exception as e:
+                # Inside a transaction() the failure unwinds to its savepoint/rollback instead
+                if owned:
+                    conn.rollback()
+                raise e
     
     def execute_command(self, command: str, params: tuple = None) -> int:
         """Execute INSERT/UPDATE/DELETE and return affected rows"""
-        conn = None
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(command, params)
-            else:
-                cursor.execute(command)
-            
-            conn.commit()
-            return cursor.rowcount
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
-        finally:
-            if conn:
-                conn.close()
+        with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = conn.cursor()
+                if not settings.is_postgresql:
+                    command = _sqlite_sql(command)
+                if params:
+                    cursor.execute(command, params)
+                else:
+                    cursor.execute(command)
+                
+                if owned:
+                    conn.commit()
+                return cursor.rowcount
+            except Exception as e:
+                # Inside a transaction() the failure unwinds to its savepoint/rollback instead
+                if owned:
+                    conn.rollback()
+                raise e
+    
+    def execute_many(self, command: str, params_seq) -> int:
+        """Execute one INSERT/UPDATE/DELETE for each parameter tuple and return affected rows
+        
+        psycopg pipelines the statements, so a batch costs one round trip.
+        """
+        with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = conn.cursor()
+                if not settings.is_postgresql:
+                    command = _sqlite_sql(command)
+                cursor.executemany(command, params_seq)
+                
+                if owned:
+                    conn.commit()
+                return cursor.rowcount
+            except Exception as e:
+                # Inside a transaction() the failure unwinds to its savepoint/rollback instead
+                if owned:
+                    conn.rollback()
+                raise e
     
     def execute_command_get_id(self, command: str, params: tuple = None) -> int:
         """Execute command and return the last inserted row ID"""
-        conn = None
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(command, params)
-            else:
-                cursor.execute(command)
-            
-            conn.commit()
-            
-            if settings.is_postgresql:
-                # PostgreSQL: get the last inserted ID using RETURNING clause or sequence
-                if "RETURNING" in command.upper():
-                    result = cursor.fetchone()
-                    if isinstance(result, dict):
-                        # psycopg3 with dict_row returns a dict
-                        return list(result.values())[0]
-                    else:
-                        # tuple result
-                        return result[0]
+        with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = conn.cursor()
+                if not settings.is_postgresql:
+                    command = _sqlite_sql(command)
+                if params:
+                    cursor.execute(command, params)
                 else:
-                    cursor.execute("SELECT lastval()")
+                    cursor.execute(command)
+                
+                if settings.is_postgresql:
+                    # PostgreSQL: get the last inserted ID using RETURNING clause or sequence
+                    if "RETURNING" not in command.upper():
+                        cursor.execute("SELECT lastval()")
                     result = cursor.fetchone()
-                    if isinstance(result, dict):
-                        return list(result.values())[0]
-                    else:
-                        return result[0]
+                    if owned:
+                        conn.commit()
+                    return _first_value(result)
+                else:
+                    # SQLite: get the last inserted ID (RETURNING rows must be consumed first)
+                    row = cursor.fetchone() if "RETURNING" in command.upper() else None
+                    if owned:
+                        conn.commit()
+                    return row[0] if row else cursor.lastrowid
+            except Exception as e:
+                # Inside a transaction() the failure unwinds to its savepoint/rollback instead
+                if owned:
+                    conn.rollback()
+                raise e
+    
+    def close(self):
+        """Close the connection pool (application shutdown)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+
+class AsyncDatabaseManager:
+    """Async counterpart of DatabaseManager for ``async def`` routes.
+    
+    PostgreSQL goes through psycopg's AsyncConnectionPool, so waiting on the
+    database costs a coroutine instead of a threadpool thread. The pool is bound
+    to the event loop that first uses it (the application loop). SQLite has no
+    async driver, so that fallback runs the sync manager in a worker thread (one
+    dedicated thread per transaction()).
+    """
+    
+    def __init__(self, sync_manager: DatabaseManager):
+        self._sync = sync_manager
+        self._pool: Optional[AsyncConnectionPool] = None
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pool_lock = threading.Lock()
+    
+    async def pool(self) -> AsyncConnectionPool:
+        """Async PostgreSQL pool, opened on first use."""
+        loop = asyncio.get_running_loop()
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = AsyncConnectionPool(
+                    _conninfo(),
+                    check=AsyncConnectionPool.check_connection if settings.db_pool_check else None,
+                    name="healthfact-async",
+                    **_pool_options(),
+                )
+                self._pool_loop = loop
+                opening = True
             else:
-                # SQLite: get the last inserted ID
-                return cursor.lastrowid
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
+                opening = False
+            pool = self._pool
+        if self._pool_loop is not loop:
+            raise RuntimeError("AsyncDatabaseManager is bound to another event loop; use db_manager from this thread")
+        if opening:
+            await pool.open(wait=False)
+        return pool
+    
+    async def open(self, wait: bool = False, timeout: float = 30.0):
+        """Open the pool ahead of the first request (application startup)."""
+        if not settings.is_postgresql:
+            return
+        pool = await self.pool()
+        if wait:
+            await pool.wait(timeout=timeout)
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        """Borrow a pooled PostgreSQL connection for the duration of the block."""
+        pool = await self.pool()
+        try:
+            async with pool.connection() as conn:
+                yield conn
+        except PoolTimeout as e:
+            raise DatabaseUnavailable(
+                f"No PostgreSQL connection available within {settings.db_pool_timeout_seconds}s"
+            ) from e
+    
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Optional[psycopg.AsyncConnection]]:
+        """Async unit of work; see DatabaseManager.transaction().
+    
+        With the SQLite fallback the block yields None; its statements still run in
+        one transaction (see _sqlite_transaction).
+        """
+        if not settings.is_postgresql:
+            async with self._sqlite_transaction():
+                yield None
+            return
+    
+        conn = _active_async_connection.get()
+        if conn is not None:
+            async with _async_savepoint(conn):
+                yield conn
+            return
+    
+        async with self.connection() as conn:
+            token = _active_async_connection.set(conn)
+            callbacks_token = _async_commit_callbacks.set([])
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+                _run_callbacks(_async_commit_callbacks.get())
+            finally:
+                _async_commit_callbacks.reset(callbacks_token)
+                _active_async_connection.reset(token)
+    
+    @asynccontextmanager
+    async def _sqlite_transaction(self) -> AsyncIterator[None]:
+        """The sync transaction() entered, used and exited on one worker thread.
+    
+        sqlite3 connections are bound to the thread that opened them, so the block's
+        statements are sent to that thread (see _run_sqlite) instead of to_thread.
+        """
+        worker = _sqlite_worker.get()
+        owned = worker is None
+        if owned:
+            worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="healthfact-sqlite-tx")
+            token = _sqlite_worker.set(worker)
+            callbacks_token = _async_commit_callbacks.set([])
+        try:
+            # Nested blocks find the outer connection in the worker and become savepoints
+            block = self._sync.transaction()
+            await asyncio.wrap_future(worker.submit(block.__enter__))
+            try:
+                yield
+            except BaseException as e:
+                await asyncio.wrap_future(worker.submit(block.__exit__, type(e), e, e.__traceback__))
+                raise
+            await asyncio.wrap_future(worker.submit(block.__exit__, None, None, None))
+            if owned:
+                _run_callbacks(_async_commit_callbacks.get())
         finally:
-            if conn:
-                conn.close()
+            if owned:
+                _async_commit_callbacks.reset(callbacks_token)
+                _sqlite_worker.reset(token)
+                worker.shutdown(wait=False)
     
-    def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
+    async def _run_sqlite(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a sync manager call in the enclosing transaction's thread, or any worker thread."""
+        worker = _sqlite_worker.get()
+        if worker is None:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(worker.submit(fn, *args))
+    
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """See DatabaseManager.on_commit()."""
+        callbacks = _async_commit_callbacks.get()
+        in_transaction = _active_async_connection.get() is not None or _sqlite_worker.get() is not None
+        if in_transaction and callbacks is not None:
+            callbacks.append(callback)
+        else:
+            self._sync.on_commit(callback)
+    
+    @asynccontextmanager
+    async def _unit_of_work(self) -> AsyncIterator[Any]:
+        conn = _active_async_connection.get()
+        if conn is not None:
+            yield conn, False
+            return
+        async with self.connection() as conn:
+            yield conn, True
+    
+    async def execute_query(self, query: str, params: tuple = None):
+        """Execute a SELECT query and return results"""
+        if not settings.is_postgresql:
+            return await self._run_sqlite(self._sync.execute_query, query, params)
+        async with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = await conn.execute(query, params or None)
+                if query.strip().upper().startswith('SELECT'):
+                    results = await cursor.fetchall()
+                else:
+                    results = cursor.rowcount
+                if owned:
+                    await conn.commit()
+                return results
+            except Exception as e:
+                if owned:
+                    await conn.rollback()
+                raise e
+    
+    async def execute_command(self, command: str, params: tuple = None) -> int:
+        """Execute INSERT/UPDATE/DELETE and return affected rows"""
+        if not settings.is_postgresql:
+            return await self._run_sqlite(self._sync.execute_command, command, params)
+        async with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = await conn.execute(command, params or None)
+                if owned:
+                    await conn.commit()
+                return cursor.rowcount
+            except Exception as e:
+                if owned:
+                    await conn.rollback()
+                raise e
+    
+    async def execute_command_get_id(self, command: str, params: tuple = None) -> int:
+        """Execute command and return the last inserted row ID"""
+        if not settings.is_postgresql:
+            return await self._run_sqlite(self._sync.execute_command_get_id, command, params)
+        async with self._unit_of_work() as (conn, owned):
+            try:
+                cursor = await conn.execute(command, params or None)
+                if "RETURNING" not in command.upper():
+                    await cursor.execute("SELECT lastval()")
+                result = await cursor.fetchone()
+                if owned:
+                    await conn.commit()
+                return _first_value(result)
+            except Exception as e:
+                if owned:
+                    await conn.rollback()
+                raise e
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Counters of the async pool (empty until first use)."""
+        if self._pool is None:
+            return {}
+        return self._pool.get_stats()
+    
+    async def close(self):
+        """Close the async pool (application shutdown)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            self._pool_loop = None
+        if pool is not None:
+            await pool.close()
 
-# Global database manager instance
+# Global database manager instances
 db_manager = DatabaseManager()
+async_db_manager = AsyncDatabaseManager(db_manager)
@@ -1,18 +1,21 @@
 """
 Dependency injection container and FastAPI dependencies.
 """
-from typing import Generator
+from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from app.repositories.user_repository import UserRepository
-from app.repositories.fact_card_repository import FactCardRepository
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
+from app.repositories.fact_card_repository import AsyncFactCardRepository, FactCardRepository
+from app.repositories.user_fact_repository import UserFactRepository
 from app.services.auth_service import AuthService
 from app.services.progress_service import ProgressService
 from app.services.search_service import SearchService
 from app.services.quiz_service import QuizService
 from app.services.fact_card_service import FactCardService
-from app.models.user import User
+from app.models.user import Principal
+from app.core.config import settings
+from app.write_behind import WriteBehindBuffer, write_behind
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -20,6 +23,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 # Repository instances (singleton pattern)
 _user_repository = None
 _fact_card_repository = None
+_async_user_repository = None
+_async_fact_card_repository = None
+_user_fact_repository = None
 _auth_service = None
 _progress_service = None
 _search_service = None
@@ -33,22 +39,43 @@ def get_user_repository() -> UserRepository:
         _user_repository = UserRepository()
     return _user_repository
 
+def get_async_user_repository() -> AsyncUserRepository:
+    """Get async user repository instance."""
+    global _async_user_repository
+    if _async_user_repository is None:
+        _async_user_repository = AsyncUserRepository()
+    return _async_user_repository
+
 def get_auth_service(
-    user_repository: UserRepository = Depends(get_user_repository)
+    user_repository: UserRepository = Depends(get_user_repository),
+    async_user_repository: AsyncUserRepository = Depends(get_async_user_repository)
 ) -> AuthService:
     """Get auth service instance."""
     global _auth_service
     if _auth_service is None:
-        _auth_service = AuthService(user_repository)
+        _auth_service = AuthService(user_repository, async_user_repository)
     return _auth_service
 
+def get_user_fact_repository() -> UserFactRepository:
+    """Get user fact repository instance."""
+    global _user_fact_repository
+    if _user_fact_repository is None:
+        _user_fact_repository = UserFactRepository()
+    return _user_fact_repository
+
+def get_write_buffer() -> Optional[WriteBehindBuffer]:
+    """Get the write-behind buffer, or None when writes go straight to the database."""
+    return write_behind if settings.write_behind_enabled else None
+
 def get_progress_service(
-    user_repository: UserRepository = Depends(get_user_repository)
+    user_repository: UserRepository = Depends(get_user_repository),
+    user_fact_repository: UserFactRepository = Depends(get_user_fact_repository),
+    write_buffer: Optional[WriteBehindBuffer] = Depends(get_write_buffer)
 ) -> ProgressService:
     """Get progress service instance."""
     global _progress_service
     if _progress_service is None:
-        _progress_service = ProgressService(user_repository)
+        _progress_service = ProgressService(user_repository, user_fact_repository, write_buffer)
     return _progress_service
 
 def get_search_service(
@@ -69,12 +96,14 @@ def get_quiz_service(
         _quiz_service = QuizService(progress_service)
     return _quiz_service
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service)
-) -> User:
-    """Get current authenticated user."""
-    user = auth_service.get_current_user(token)
+) -> Principal:
+    """Get current authenticated user (identity only; load the full User where needed)."""
+    # Runs on the event loop: every authenticated route needs this lookup,
+    # so it should not cost a threadpool thread
+    user = await auth_service.get_current_principal_async(token)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,7 +112,7 @@ def get_current_user(
         )
     return user
 
-def get_current_user_id(current_user: User = Depends(get_current_user)) -> int:
+def get_current_user_id(current_user: Principal = Depends(get_current_user)) -> int:
     """Get current user ID."""
     return current_user.id
 
@@ -94,11 +123,20 @@ def get_fact_card_repository() -> FactCardRepository:
         _fact_card_repository = FactCardRepository()
     return _fact_card_repository
 
+def get_async_fact_card_repository() -> AsyncFactCardRepository:
+    """Get async fact card repository instance."""
+    global _async_fact_card_repository
+    if _async_fact_card_repository is None:
+        _async_fact_card_repository = AsyncFactCardRepository()
+    return _async_fact_card_repository
+
 def get_fact_card_service(
-    fact_card_repository: FactCardRepository = Depends(get_fact_card_repository)
+    fact_card_repository: FactCardRepository = Depends(get_fact_card_repository),
+    async_fact_card_repository: AsyncFactCardRepository = Depends(get_async_fact_card_repository),
+    write_buffer: Optional[WriteBehindBuffer] = Depends(get_write_buffer)
 ) -> FactCardService:
     """Get fact card service instance."""
     global _fact_card_service
     if _fact_card_service is None:
-        _fact_card_service = FactCardService(fact_card_repository)
+        _fact_card_service = FactCardService(fact_card_repository, async_fact_card_repository, write_buffer)
     return _fact_card_service
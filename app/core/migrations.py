@@ -0,0 +1,425 @@
+"""
+Versioned schema migrations for PostgreSQL and SQLite.
+
+Each migration runs once, inside its own transaction, and its version is recorded
+in ``schema_migrations``. Migrations are plain Python functions receiving the
+connection and the dialect name, so one list serves both databases.
+"""
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Set
+
+from app.models.user_fact import UserFact
+
+from .config import settings
+from .database import DatabaseManager, db_manager
+
+POSTGRESQL = "postgresql"
+SQLITE = "sqlite"
+
+logger = logging.getLogger(__name__)
+
+# Serialises concurrent runners (several app instances deploying at once)
+_ADVISORY_LOCK_ID = 824_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change: ``apply(conn, dialect)``."""
+    version: int
+    name: str
+    apply: Callable[[Any, str], None]
+
+
+def _columns(conn, dialect: str, table: str) -> Set[str]:
+    if dialect == SQLITE:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    rows = conn.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s",
+        (table,)
+    ).fetchall()
+    return {row["column_name"] if isinstance(row, dict) else row[0] for row in rows}
+
+
+def _create_base_tables(conn, dialect: str) -> None:
+    """Users and fact cards, with the columns the repositories use."""
+    if dialect == SQLITE:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                email TEXT UNIQUE,
+                facts_learned TEXT DEFAULT '[]',
+                current_streak INTEGER DEFAULT 0,
+                longest_streak INTEGER DEFAULT 0,
+                total_facts_count INTEGER DEFAULT 0,
+                last_activity_date TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS fact_cards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                title TEXT NOT NULL,
+                summary TEXT,
+                category TEXT DEFAULT 'General',
+                confidence TEXT,
+                sources TEXT DEFAULT '[]',
+                search_query TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        return
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            email VARCHAR(255) UNIQUE,
+            facts_learned TEXT DEFAULT '[]',
+            current_streak INTEGER DEFAULT 0,
+            longest_streak INTEGER DEFAULT 0,
+            total_facts_count INTEGER DEFAULT 0,
+            last_activity_date VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fact_cards (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            title VARCHAR(255) NOT NULL,
+            summary TEXT,
+            category VARCHAR(100) DEFAULT 'General',
+            confidence VARCHAR(20),
+            sources TEXT DEFAULT '[]',
+            search_query TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _reconcile_fact_cards(conn, dialect: str) -> None:
+    """Bring ``fact_cards`` created by the old init scripts (content/source_url) in line
+    with FactCardRepository (summary/confidence/sources/search_query)."""
+    columns = _columns(conn, dialect, "fact_cards")
+    legacy = {"content", "source_url"} & columns
+
+    if dialect == SQLITE and legacy:
+        # SQLite cannot drop NOT NULL from content, so rebuild the table
+        conn.execute("ALTER TABLE fact_cards RENAME TO fact_cards_legacy")
+        _create_base_tables(conn, dialect)
+        summary = "content" if "content" in columns else "NULL"
+        sources = (
+            "CASE WHEN source_url IS NULL THEN '[]' "
+            "ELSE json_array(json_object('name', 'Source', 'url', source_url)) END"
+            if "source_url" in columns else "'[]'"
+        )
+        conn.execute(f"""
+            INSERT INTO fact_cards (id, user_id, title, summary, category, sources, created_at, updated_at)
+            SELECT id, user_id, title, {summary}, category, {sources}, created_at, updated_at
+            FROM fact_cards_legacy
+            -- Cards of deleted users are unreachable and would fail the new foreign key
+            WHERE user_id IS NULL OR user_id IN (SELECT id FROM users)
+        """)
+        conn.execute("DROP TABLE fact_cards_legacy")
+        return
+
+    for column, ddl in (
+        ("summary", "TEXT"),
+        ("confidence", "VARCHAR(20)"),
+        ("sources", "TEXT DEFAULT '[]'"),
+        ("search_query", "TEXT"),
+    ):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE fact_cards ADD COLUMN {column} {ddl}")
+
+    if "content" in columns:
+        conn.execute("UPDATE fact_cards SET summary = content WHERE summary IS NULL")
+        # The repository never writes content; keep the column but stop requiring it
+        conn.execute("ALTER TABLE fact_cards ALTER COLUMN content DROP NOT NULL")
+    if "source_url" in columns:
+        conn.execute("""
+            UPDATE fact_cards
+            SET sources = json_build_array(json_build_object('name', 'Source', 'url', source_url))::text
+            WHERE source_url IS NOT NULL AND (sources IS NULL OR sources = '[]')
+        """)
+
+
+def _add_fact_card_indexes(conn, dialect: str) -> None:
+    """Serve ``WHERE user_id = ? [AND category = ?] ORDER BY created_at DESC`` from an index."""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fact_cards_user_created "
+        "ON fact_cards (user_id, created_at DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fact_cards_user_category_created "
+        "ON fact_cards (user_id, category, created_at DESC)"
+    )
+
+
+def _create_user_facts(conn, dialect: str) -> None:
+    """Move ``users.facts_learned`` JSON arrays into an append-only ``user_facts`` table.
+
+    Adding a fact becomes one row insert instead of rewriting the user's whole
+    history, and history/category/weekly reads use the (user_id, ...) indexes.
+    """
+    if dialect == SQLITE:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_facts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                type TEXT NOT NULL DEFAULT 'general',
+                category TEXT NOT NULL DEFAULT 'General',
+                content TEXT NOT NULL DEFAULT '',
+                source_url TEXT,
+                extra TEXT,
+                learned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    else:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_facts (
+                id BIGSERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                type VARCHAR(20) NOT NULL DEFAULT 'general',
+                category VARCHAR(100) NOT NULL DEFAULT 'General',
+                content TEXT NOT NULL DEFAULT '',
+                source_url TEXT,
+                extra TEXT,
+                learned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_facts_user_learned "
+        "ON user_facts (user_id, learned_at DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_facts_user_type_learned "
+        "ON user_facts (user_id, type, learned_at DESC)"
+    )
+
+    # Backfill in Python so malformed JSON in one user's blob cannot fail the migration.
+    # Only blobs converted in full are cleared; anything else keeps its original text.
+    placeholder = "%s" if dialect == POSTGRESQL else "?"
+    insert = (
+        "INSERT INTO user_facts (user_id, type, category, content, source_url, extra, learned_at) "
+        f"VALUES ({', '.join([placeholder] * 7)})"
+    )
+    rows = conn.execute(
+        "SELECT id, facts_learned FROM users WHERE facts_learned IS NOT NULL AND facts_learned <> '[]'"
+    ).fetchall()
+    cursor = conn.cursor()
+    converted = []
+    for row in rows:
+        user_id, blob = (row["id"], row["facts_learned"]) if isinstance(row, dict) else row
+        try:
+            facts = json.loads(blob)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning("user_facts backfill: kept facts_learned of user %s (not valid JSON)", user_id)
+            continue
+        if not isinstance(facts, list):
+            logger.warning("user_facts backfill: kept facts_learned of user %s (not a JSON list)", user_id)
+            continue
+        params = []
+        for fact in facts:
+            if isinstance(fact, dict):
+                f = UserFact.from_legacy_dict(user_id, fact)
+                params.append((f.user_id, f.type, f.category, f.content,
+                               f.source_url, f.extra_json, f.learned_at_db))
+        if params:
+            cursor.executemany(insert, params)
+        if len(params) == len(facts):
+            converted.append((user_id,))
+        else:
+            logger.warning("user_facts backfill: kept facts_learned of user %s (%d of %d entries "
+                           "are not objects and were not copied)", user_id, len(facts) - len(params), len(facts))
+
+    # The rows now live in user_facts; shrink the user rows that every lookup reads
+    if converted:
+        cursor.executemany(f"UPDATE users SET facts_learned = '[]' WHERE id = {placeholder}", converted)
+
+
+def _create_progress_aggregates(conn, dialect: str) -> None:
+    """Per-user category totals and per-day activity buckets, maintained at write time
+    and backfilled here from ``user_facts``."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_category_counts (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            category VARCHAR(100) NOT NULL,
+            fact_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, category)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_daily_activity (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            activity_type VARCHAR(20) NOT NULL,
+            category VARCHAR(100) NOT NULL DEFAULT '',
+            activity_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, activity_type, category)
+        )
+    """)
+
+    day = "date(learned_at)" if dialect == SQLITE else "CAST(learned_at AS DATE)"
+    conn.execute("""
+        INSERT INTO user_category_counts (user_id, category, fact_count)
+        SELECT user_id, category, COUNT(*) FROM user_facts GROUP BY user_id, category
+    """)
+    conn.execute(f"""
+        INSERT INTO user_daily_activity (user_id, day, activity_type, category, activity_count)
+        SELECT user_id, {day}, type, category, COUNT(*) FROM user_facts
+        WHERE learned_at IS NOT NULL
+        GROUP BY user_id, {day}, type, category
+    """)
+
+
+def _add_fact_card_keyset_indexes(conn, dialect: str) -> None:
+    """Extend the listing indexes with ``id`` for keyset pagination on (created_at, id).
+
+    The old indexes are prefixes of the new ones, so they are dropped.
+    """
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fact_cards_user_created_id "
+        "ON fact_cards (user_id, created_at DESC, id DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fact_cards_user_category_created_id "
+        "ON fact_cards (user_id, category, created_at DESC, id DESC)"
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_fact_cards_user_created")
+    conn.execute("DROP INDEX IF EXISTS idx_fact_cards_user_category_created")
+
+
+def _add_fact_card_full_text(conn, dialect: str) -> None:
+    """Full-text index over title (weight A), search_query (B) and summary (C).
+
+    PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index.
+    SQLite: an external-content FTS5 table kept in sync by triggers.
+    """
+    if dialect == POSTGRESQL:
+        conn.execute("""
+            ALTER TABLE fact_cards ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(search_query, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(summary, '')), 'C')
+            ) STORED
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fact_cards_search_vector "
+            "ON fact_cards USING GIN (search_vector)"
+        )
+        return
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS fact_cards_fts USING fts5(
+            title, summary, search_query,
+            content='fact_cards', content_rowid='id', tokenize='porter unicode61'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS fact_cards_fts_insert AFTER INSERT ON fact_cards BEGIN
+            INSERT INTO fact_cards_fts (rowid, title, summary, search_query)
+            VALUES (new.id, new.title, new.summary, new.search_query);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS fact_cards_fts_delete AFTER DELETE ON fact_cards BEGIN
+            INSERT INTO fact_cards_fts (fact_cards_fts, rowid, title, summary, search_query)
+            VALUES ('delete', old.id, old.title, old.summary, old.search_query);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS fact_cards_fts_update AFTER UPDATE ON fact_cards BEGIN
+            INSERT INTO fact_cards_fts (fact_cards_fts, rowid, title, summary, search_query)
+            VALUES ('delete', old.id, old.title, old.summary, old.search_query);
+            INSERT INTO fact_cards_fts (rowid, title, summary, search_query)
+            VALUES (new.id, new.title, new.summary, new.search_query);
+        END
+    """)
+    # Index the cards that already exist
+    conn.execute("INSERT INTO fact_cards_fts (fact_cards_fts) VALUES ('rebuild')")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create_base_tables", _create_base_tables),
+    Migration(2, "reconcile_fact_cards", _reconcile_fact_cards),
+    Migration(3, "fact_card_indexes", _add_fact_card_indexes),
+    Migration(4, "user_facts", _create_user_facts),
+    Migration(5, "progress_aggregates", _create_progress_aggregates),
+    Migration(6, "fact_card_keyset_indexes", _add_fact_card_keyset_indexes),
+    Migration(7, "fact_card_full_text", _add_fact_card_full_text),
+]
+
+
+def _dialect() -> str:
+    return POSTGRESQL if settings.is_postgresql else SQLITE
+
+
+def _ensure_migrations_table(manager: DatabaseManager) -> None:
+    manager.execute_command("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(manager: DatabaseManager = db_manager) -> Set[int]:
+    """Versions already recorded in ``schema_migrations``."""
+    _ensure_migrations_table(manager)
+    rows = manager.execute_query("SELECT version FROM schema_migrations")
+    return {row["version"] if isinstance(row, dict) else row[0] for row in rows}
+
+
+def pending_migrations(manager: DatabaseManager = db_manager) -> List[Migration]:
+    applied = applied_versions(manager)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def run_migrations(target: Optional[int] = None, manager: DatabaseManager = db_manager,
+                   verbose: bool = False) -> List[Migration]:
+    """Apply pending migrations in version order, up to ``target`` if given.
+
+    Each migration and its ``schema_migrations`` row commit together, so a failed
+    migration leaves nothing half-applied and is retried on the next run.
+    """
+    dialect = _dialect()
+    placeholder = "%s" if dialect == POSTGRESQL else "?"
+    applied: List[Migration] = []
+
+    for migration in pending_migrations(manager):
+        if target is not None and migration.version > target:
+            break
+        with manager.transaction() as conn:
+            if dialect == POSTGRESQL:
+                conn.execute("SELECT pg_advisory_xact_lock(%s)", (_ADVISORY_LOCK_ID,))
+            # Another runner may have applied it while we waited for the lock
+            already = conn.execute(
+                f"SELECT 1 FROM schema_migrations WHERE version = {placeholder}",
+                (migration.version,)
+            ).fetchone()
+            if already:
+                continue
+            if verbose:
+                print(f"Applying migration {migration.version}: {migration.name}")
+            migration.apply(conn, dialect)
+            conn.execute(
+                f"INSERT INTO schema_migrations (version, name) VALUES ({placeholder}, {placeholder})",
+                (migration.version, migration.name)
+            )
+        applied.append(migration)
+
+    return applied
@@ -1,34 +1,30 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
 
-import requests
 from bs4 import BeautifulSoup
 
 from .cache import TTLCache
 from .core.config import settings
+from .http_client import get_async_client, get_client
 from .utils import is_allowed
 
 
-PAGE_CACHE = TTLCache(maxsize=256, ttl_seconds=settings.cache_ttl_page_min * 60)
+# Bounded by estimated bytes as well as entry count: extracted pages range from a few KB
+# to several MB, so the byte budget is what keeps worker memory predictable.
+# Health-source pages rarely change within hours, so stale copies are served while
+# a background refresh runs. Sync and async fetches of one URL share one download.
+PAGE_CACHE = TTLCache(
+    maxsize=256,
+    ttl_seconds=settings.cache_ttl_page_min * 60,
+    name="page",
+    maxbytes=settings.page_cache_max_mb * 1024 * 1024,
+    max_entry_bytes=settings.page_cache_max_entry_kb * 1024,
+    stale_ttl_seconds=settings.cache_max_stale_page_min * 60,
+)
 
 
-def fetch_main_text(url: str) -> dict[str, str] | None:
-    if not is_allowed(url):
-        return None
-
-    cached = PAGE_CACHE.get(url)
-    if cached is not None:
-        return cached
-
-    headers = {"User-Agent": "HealthFactAI/1.0 (+verified-search)"}
-    try:
-        resp = requests.get(url, headers=headers, timeout=settings.request_timeout_seconds)
-        resp.raise_for_status()
-        html = resp.text
-    except Exception:
-        return None
-
+def _extract(url: str, html: str) -> dict[str, str] | None:
     # Try readability first, but import lazily to avoid hard dependency at startup
     try:
         from readability import Document  # type: ignore
@@ -47,8 +43,89 @@ def fetch_main_text(url: str) -> dict[str, str] | None:
     if not text or len(text) < 400:
         return None
 
-    result = {"title": title, "url": url, "text": text}
-    PAGE_CACHE.set(url, result)
-    return result
+    return {"title": title, "url": url, "text": text}
+
+
+def fetch_main_text(url: str) -> dict[str, str] | None:
+    if not is_allowed(url):
+        return None
+
+    return PAGE_CACHE.get_or_compute(url, lambda: _fetch_main_text(url))
+
+
+def _fetch_main_text(url: str) -> dict[str, str] | None:
+    try:
+        resp = get_client().get(url)
+        resp.raise_for_status()
+        html = resp.text
+    except Exception:
+        return None
+
+    return _extract(url, html)
+
+
+async def fetch_main_text_async(url: str) -> dict[str, str] | None:
+    if not is_allowed(url):
+        return None
+
+    return await PAGE_CACHE.aget_or_compute(url, lambda: _fetch_main_text_async(url))
+
+
+async def _fetch_main_text_async(url: str) -> dict[str, str] | None:
+    try:
+        resp = await get_async_client().get(url)
+        resp.raise_for_status()
+        html = resp.text
+    except Exception:
+        return None
+
+    # readability/lxml parsing is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(_extract, url, html)
+
+
+async def fetch_pages_async(urls: list[str], deadline: float | None = None) -> list[dict[str, str] | None]:
+    """Fetch and extract ``urls`` concurrently; pages not finished by ``deadline`` come back as None."""
+    if not urls:
+        return []
+    if deadline is None:
+        deadline = settings.fetch_deadline_seconds
+
+    tasks = [asyncio.ensure_future(fetch_main_text_async(u)) for u in urls]
+    try:
+        await asyncio.wait(tasks, timeout=deadline)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return [
+        task.result() if task.done() and not task.cancelled() and task.exception() is None else None
+        for task in tasks
+    ]
+
+
+async def fetch_pages_timed_async(
+    urls: list[str],
+    timeout: float,
+    concurrency: int | None = None,
+) -> tuple[list[dict[str, str] | None], set[str]]:
+    """Fetch and extract ``urls`` with a ``timeout`` per page rather than one deadline for all.
+
+    A page's clock starts once it gets one of the ``concurrency`` slots, so a long list
+    does not starve its tail. Returns the pages (None when unavailable) and the URLs
+    that timed out, so callers can tell "too slow" from "no usable content".
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+    timed_out: set[str] = set()
 
+    async def fetch(u: str) -> dict[str, str] | None:
+        try:
+            if semaphore is None:
+                return await asyncio.wait_for(fetch_main_text_async(u), timeout)
+            async with semaphore:
+                return await asyncio.wait_for(fetch_main_text_async(u), timeout)
+        except asyncio.TimeoutError:
+            timed_out.add(u)
+            return None
 
+    pages = await asyncio.gather(*(fetch(u) for u in urls))
+    return list(pages), timed_out
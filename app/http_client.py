@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Any
+
+import httpx
+
+from .core.config import settings
+
+
+USER_AGENT = "HealthFactAI/1.0 (+verified-search)"
+
+_client: httpx.Client | None = None
+# httpx.AsyncClient pools are bound to the loop that first used them, so keep one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    return settings.http2_enabled and importlib.util.find_spec("h2") is not None
+
+
+def _client_options() -> dict[str, Any]:
+    return {
+        "http2": _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        "timeout": httpx.Timeout(
+            settings.request_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds,
+        ),
+        "headers": {"User-Agent": USER_AGENT},
+        "follow_redirects": True,
+    }
+
+
+def get_client() -> httpx.Client:
+    """Process-wide keep-alive client for sync callers (thread-safe)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = httpx.Client(**_client_options())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Keep-alive client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_clients() -> None:
+    """Close every pooled client; called on application shutdown."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+    current = asyncio.get_running_loop()
+    for loop, async_client in list(_async_clients.items()):
+        if loop is current:
+            await async_client.aclose()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(async_client.aclose(), loop))
+    _async_clients.clear()
@@ -120,3 +120,27 @@ class User:
                 total_facts_count=int(row[7]) if len(row) > 7 and row[7] is not None else 0,
                 last_activity_date=row[8] if len(row) > 8 else None
             )
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated identity: the user columns auth checks need, without progress data."""
+    id: int
+    username: str
+    email: Optional[str] = None
+    
+    @classmethod
+    def from_db_row(cls, row) -> "Principal":
+        """Create Principal from an ``id, username, email`` row (dict or tuple)."""
+        if not row:
+            return None
+        
+        if isinstance(row, dict):
+            user_id, username, email = row.get('id'), row.get('username'), row.get('email')
+        else:
+            user_id, username, email = row[0], row[1], row[2]
+        return cls(
+            id=int(user_id),
+            username=str(username or ''),
+            email=str(email) if email is not None else None
+        )
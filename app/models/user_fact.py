@@ -0,0 +1,108 @@
+"""
+User fact model: one learned fact per row in ``user_facts``.
+"""
+from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+import json
+
+LEARNED_AT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Stored as naive UTC; this format sorts and compares correctly on SQLite too
+DB_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    text = str(value).replace("T", " ").rstrip("Z")
+    try:
+        return datetime.strptime(text[:19], DB_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+@dataclass
+class UserFact:
+    """A fact a user learned through search or quiz activity."""
+    id: Optional[int] = None
+    user_id: int = 0
+    type: str = "general"
+    category: str = "General"
+    content: str = ""
+    source_url: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)  # e.g. quiz question count
+    learned_at: Optional[datetime] = None  # naive UTC
+
+    @classmethod
+    def create(cls, user_id: int, content: str, category: str, source_url: Optional[str] = None,
+               fact_type: str = "general", **extra_data) -> "UserFact":
+        """New fact learned now."""
+        return cls(
+            user_id=user_id,
+            type=fact_type,
+            category=category,
+            content=content,
+            source_url=source_url,
+            extra=extra_data,
+            learned_at=datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        )
+
+    @classmethod
+    def from_legacy_dict(cls, user_id: int, fact: Dict[str, Any]) -> "UserFact":
+        """Fact from an entry of the old ``users.facts_learned`` JSON array."""
+        known = {"content", "category", "source_url", "learned_at", "type"}
+        return cls(
+            user_id=user_id,
+            type=str(fact.get("type") or "general"),
+            category=str(fact.get("category") or "General"),
+            content=str(fact.get("content") or ""),
+            source_url=fact.get("source_url"),
+            extra={k: v for k, v in fact.items() if k not in known},
+            learned_at=_parse_timestamp(fact.get("learned_at"))
+        )
+
+    @property
+    def learned_at_db(self) -> Optional[str]:
+        return self.learned_at.strftime(DB_TIMESTAMP_FORMAT) if self.learned_at else None
+
+    @property
+    def extra_json(self) -> Optional[str]:
+        return json.dumps(self.extra, separators=(",", ":")) if self.extra else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as the old ``facts_learned`` entries, for API responses."""
+        return {
+            "content": self.content,
+            "category": self.category,
+            "source_url": self.source_url,
+            "learned_at": self.learned_at.strftime(LEARNED_AT_FORMAT) if self.learned_at else None,
+            "type": self.type,
+            **self.extra
+        }
+
+    @classmethod
+    def from_db_row(cls, row) -> "UserFact":
+        """Create UserFact from database row (works with both tuple and dict rows)."""
+        if not row:
+            return None
+
+        if isinstance(row, dict):
+            values = [row.get(k) for k in
+                      ("id", "user_id", "type", "category", "content", "source_url", "extra", "learned_at")]
+        else:
+            values = list(row)
+        fact_id, user_id, fact_type, category, content, source_url, extra, learned_at = values
+        try:
+            extra = json.loads(extra) if extra else {}
+        except (json.JSONDecodeError, TypeError):
+            extra = {}
+        return cls(
+            id=int(fact_id) if fact_id is not None else None,
+            user_id=int(user_id or 0),
+            type=str(fact_type or "general"),
+            category=str(category or "General"),
+            content=str(content or ""),
+            source_url=source_url,
+            extra=extra,
+            learned_at=_parse_timestamp(learned_at)
+        )
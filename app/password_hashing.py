@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from passlib.context import CryptContext
+
+from .core.config import settings
+
+
+T = TypeVar("T")
+
+
+class HasherSaturated(Exception):
+    """Every hashing worker is busy and the wait queue is full; retry later."""
+
+
+def make_context(rounds: int) -> CryptContext:
+    # min == max == rounds: hashes made with any other cost report needs_update,
+    # so logins rehash after the configured cost is raised or lowered
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+class PasswordHasher:
+    """bcrypt on a small dedicated thread pool with admission control.
+
+    bcrypt releases the GIL, so a few threads hash in parallel without blocking the
+    event loop or the request threadpool. At most ``workers + queue_limit`` calls are
+    admitted at once; anything beyond that raises ``HasherSaturated`` immediately
+    instead of queueing behind a login burst.
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 16, rounds: int = 12):
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self.context = make_context(rounds)
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._admitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> Future:
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HasherSaturated("Password hashing is saturated")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="healthfact-bcrypt")
+            self._admitted += 1
+            future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._admitted -= 1
+            self.completed += 1
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """(matches, new hash if the stored one uses an outdated cost, else None)."""
+        return self._submit(self.context.verify_and_update, password, hashed).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_and_update_async(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        return await asyncio.wrap_future(self._submit(self.context.verify_and_update, password, hashed))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "admitted": self._admitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit,
+    rounds=settings.bcrypt_rounds,
+)
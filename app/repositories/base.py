@@ -3,11 +3,33 @@ Base repository pattern for database operations.
 Supports both PostgreSQL and SQLite through the database manager.
 """
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Optional, List, Any
-from app.core.database import db_manager
+from typing import Generic, TypeVar, Optional, List, Any, Callable, Iterable, Iterator, NamedTuple, Sequence
+from app.core.database import async_db_manager, db_manager
 
 T = TypeVar('T')
 
+# Bound parameters per statement: PostgreSQL allows 65535, SQLite (>= 3.32) 32766
+MAX_BIND_PARAMS = 32766
+
+
+def chunked(items: Sequence, params_per_item: int) -> Iterator[Sequence]:
+    """Slices of ``items`` small enough for one multi-row statement each."""
+    size = max(1, MAX_BIND_PARAMS // params_per_item)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Statement(NamedTuple):
+    """SQL, its parameters and how to turn the outcome (rows, or affected row count)
+    into the method's result.
+
+    Repositories build statements in shared helpers; the sync and async classes only
+    differ in how they run them (``fetch``/``execute`` vs ``await fetch``/``execute``).
+    """
+    sql: str
+    params: tuple
+    result: Callable[[Any], Any] = list
+
 class BaseRepository(ABC, Generic[T]):
     """Base repository with common database operations."""
     
@@ -34,14 +56,81 @@ class BaseRepository(ABC, Generic[T]):
         """Delete an entity."""
         pass
     
+    def transaction(self):
+        """Share one connection and commit across repository calls (savepoint if nested)."""
+        return self.db.transaction()
+    
     def execute_query(self, query: str, params: tuple = ()) -> List[Any]:
         """Execute a SELECT query and return results."""
         return self.db.execute_query(query, params)
     
+    def fetch(self, statement: Statement) -> Any:
+        """Run a SELECT statement and map its rows."""
+        return statement.result(self.execute_query(statement.sql, statement.params))
+    
+    def execute(self, statement: Statement) -> Any:
+        """Run an INSERT/UPDATE/DELETE statement and map its affected row count."""
+        return statement.result(self.execute_command(statement.sql, statement.params))
+    
     def execute_command(self, command: str, params: tuple = ()) -> int:
         """Execute an INSERT/UPDATE/DELETE command and return affected rows."""
         return self.db.execute_command(command, params)
     
+    def execute_many(self, command: str, params_seq: Iterable[tuple]) -> int:
+        """Execute a command once per parameter tuple and return affected rows."""
+        return self.db.execute_many(command, params_seq)
+    
     def execute_command_get_id(self, command: str, params: tuple = ()) -> int:
         """Execute command and return the last inserted row ID."""
         return self.db.execute_command_get_id(command, params)
+
+
+class AsyncBaseRepository(ABC, Generic[T]):
+    """Async base repository; same SQL as the sync repositories, awaited on the async pool."""
+    
+    def __init__(self):
+        self.db = async_db_manager
+    
+    @abstractmethod
+    async def create(self, entity: T) -> T:
+        """Create a new entity."""
+        pass
+    
+    @abstractmethod
+    async def get_by_id(self, entity_id: int) -> Optional[T]:
+        """Get entity by ID."""
+        pass
+    
+    @abstractmethod
+    async def update(self, entity: T) -> T:
+        """Update an entity."""
+        pass
+    
+    @abstractmethod
+    async def delete(self, entity_id: int) -> bool:
+        """Delete an entity."""
+        pass
+    
+    def transaction(self):
+        """Async unit of work: ``async with repository.transaction(): ...``."""
+        return self.db.transaction()
+    
+    async def execute_query(self, query: str, params: tuple = ()) -> List[Any]:
+        """Execute a SELECT query and return results."""
+        return await self.db.execute_query(query, params)
+    
+    async def fetch(self, statement: Statement) -> Any:
+        """Run a SELECT statement and map its rows."""
+        return statement.result(await self.execute_query(statement.sql, statement.params))
+    
+    async def execute(self, statement: Statement) -> Any:
+        """Run an INSERT/UPDATE/DELETE statement and map its affected row count."""
+        return statement.result(await self.execute_command(statement.sql, statement.params))
+    
+    async def execute_command(self, command: str, params: tuple = ()) -> int:
+        """Execute an INSERT/UPDATE/DELETE command and return affected rows."""
+        return await self.db.execute_command(command, params)
+    
+    async def execute_command_get_id(self, command: str, params: tuple = ()) -> int:
+        """Execute command and return the last inserted row ID."""
+        return await self.db.execute_command_get_id(command, params)
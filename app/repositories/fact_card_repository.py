@@ -1,161 +1,466 @@
 """
 Fact Card repository for database operations.
 """
-from typing import Optional, List
+import base64
+import binascii
+import json
+import re
+from datetime import datetime, timezone
+from typing import Dict, Optional, List, Sequence, Tuple
+from app.core.config import settings
 # PostgreSQL support through database manager
-from app.repositories.base import BaseRepository
+from app.repositories.base import AsyncBaseRepository, BaseRepository, Statement, chunked
 from app.models.fact_card import FactCard
 
+# SQL shared by the sync and async repositories; the module-level helpers below
+# build each read as a Statement, so the two classes only differ in how they run it
+INSERT_FACT_CARD = """
+    INSERT INTO fact_cards (user_id, title, summary, category, confidence,
+                           sources, search_query, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    RETURNING id
+"""
+
+# Multi-row insert for batched writes; cards keep the time they were created at
+INSERT_FACT_CARDS_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s)"
+INSERT_FACT_CARDS = """
+    INSERT INTO fact_cards (user_id, title, summary, category, confidence,
+                           sources, search_query, created_at, updated_at)
+    VALUES
+"""
+
+SELECT_FACT_CARD = """
+    SELECT id, user_id, title, summary, category, confidence, sources,
+           search_query, created_at, updated_at
+    FROM fact_cards
+"""
+SELECT_FACT_CARD_BY_ID = SELECT_FACT_CARD + " WHERE id = %s"
+# id breaks created_at ties, so pages are stable and match the keyset order
+SELECT_FACT_CARDS_BY_USER = SELECT_FACT_CARD + """
+    WHERE user_id = %s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s OFFSET %s
+"""
+SELECT_FACT_CARDS_BY_USER_AND_CATEGORY = SELECT_FACT_CARD + """
+    WHERE user_id = %s AND category = %s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s OFFSET %s
+"""
+
+SELECT_CATEGORIES_FOR_USER = """
+    SELECT DISTINCT category
+    FROM fact_cards
+    WHERE user_id = %s
+    ORDER BY category
+"""
+
+# All of a user's per-category counts in one index-only scan
+COUNT_BY_CATEGORY = """
+    SELECT category, COUNT(*) AS count
+    FROM fact_cards
+    WHERE user_id = %s
+    GROUP BY category
+    ORDER BY category
+"""
+
+COUNT_BY_USER = "SELECT COUNT(*) FROM fact_cards WHERE user_id = %s"
+COUNT_BY_USER_AND_CATEGORY = "SELECT COUNT(*) FROM fact_cards WHERE user_id = %s AND category = %s"
+
+UPDATE_FACT_CARD = """
+    UPDATE fact_cards
+    SET title = %s, summary = %s, category = %s, confidence = %s,
+        sources = %s, search_query = %s, updated_at = CURRENT_TIMESTAMP
+    WHERE id = %s
+"""
+
+DELETE_FACT_CARD = "DELETE FROM fact_cards WHERE id = %s"
+DELETE_FACT_CARDS_BY_USER = "DELETE FROM fact_cards WHERE user_id = %s"
+
+
+def _insert_params(fact_card: FactCard) -> tuple:
+    return (
+        fact_card.user_id,
+        fact_card.title,
+        fact_card.summary,
+        fact_card.category,
+        fact_card.confidence,
+        fact_card.sources,
+        fact_card.search_query
+    )
+
+
+def _timestamped_insert_params(fact_card: FactCard) -> tuple:
+    created_at = fact_card.created_at or datetime.now(timezone.utc)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    created_at = created_at.strftime("%Y-%m-%d %H:%M:%S")
+    return _insert_params(fact_card) + (created_at, created_at)
+
+
+def _update_params(fact_card: FactCard) -> tuple:
+    return (
+        fact_card.title,
+        fact_card.summary,
+        fact_card.category,
+        fact_card.confidence,
+        fact_card.sources,
+        fact_card.search_query,
+        fact_card.id
+    )
+
+
+def _substring_query(user_id: int, search_term: str, category: Optional[str],
+                  limit: int) -> Tuple[str, list]:
+    query = SELECT_FACT_CARD + """
+        WHERE user_id = %s AND (
+            title LIKE %s OR
+            summary LIKE %s OR
+            search_query LIKE %s
+        )
+    """
+
+    params = [user_id, f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"]
+
+    if category and category.lower() != "all":
+        query += " AND category = %s"
+        params.append(category)
+
+    query += " ORDER BY created_at DESC LIMIT %s"
+    params.append(limit)
+    return query, params
+
+
+def encode_cursor(fact_card: FactCard) -> str:
+    """Opaque cursor pointing just after ``fact_card`` in (created_at, id) DESC order."""
+    created_at = fact_card.created_at
+    key = created_at.isoformat(sep=" ") if isinstance(created_at, datetime) else str(created_at)
+    raw = json.dumps([key, fact_card.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(created_at, id) from ``encode_cursor``; ValueError if the cursor is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, fact_card_id = json.loads(raw)
+        return str(created_at), int(fact_card_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _page_query(user_id: int, category: Optional[str], limit: int,
+                after: Optional[Tuple[str, int]], offset: int) -> Tuple[str, list]:
+    """One page plus one extra row (to know whether there is a next page).
+
+    With ``after`` the page starts right after that (created_at, id) key, which is
+    an index seek on (user_id, [category,] created_at DESC, id DESC) however deep
+    the page is; otherwise it falls back to ``offset``.
+    """
+    query = SELECT_FACT_CARD + " WHERE user_id = %s"
+    params: list = [user_id]
+    if category and category.lower() != "all":
+        query += " AND category = %s"
+        params.append(category)
+    if after is not None:
+        query += " AND (created_at, id) < (%s, %s)"
+        params.extend(after)
+    query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+    params.append(limit + 1)
+    if after is None and offset:
+        query += " OFFSET %s"
+        params.append(offset)
+    return query, params
+
+
+def _page(rows, limit: int) -> Tuple[List[FactCard], Optional[str]]:
+    fact_cards = [FactCard.from_db_row(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(fact_cards[-1]) if len(rows) > limit and fact_cards else None
+    return fact_cards, next_cursor
+
+
+# Ranked full-text search (migration 7). Title matches weigh most, then the
+# original search query, then the summary; ties go to the newest card.
+FULL_TEXT_SEARCH_PG = SELECT_FACT_CARD.rstrip() + """, to_tsquery('english', %s) AS query
+    WHERE user_id = %s AND search_vector @@ query
+"""
+FULL_TEXT_ORDER_PG = " ORDER BY ts_rank(search_vector, query) DESC, created_at DESC, id DESC LIMIT %s"
+
+FULL_TEXT_SEARCH_SQLITE = """
+    SELECT fc.id, fc.user_id, fc.title, fc.summary, fc.category, fc.confidence, fc.sources,
+           fc.search_query, fc.created_at, fc.updated_at
+    FROM fact_cards_fts JOIN fact_cards fc ON fc.id = fact_cards_fts.rowid
+    WHERE fact_cards_fts MATCH %s AND fc.user_id = %s
+"""
+FULL_TEXT_ORDER_SQLITE = (
+    " ORDER BY bm25(fact_cards_fts, 10.0, 1.0, 5.0), fc.created_at DESC, fc.id DESC LIMIT %s"
+)
+
+
+def _full_text_query(user_id: int, search_term: str, category: Optional[str],
+                     limit: int) -> Optional[Tuple[str, list]]:
+    """Ranked full-text query, or None when the term has no searchable words.
+
+    Every word must match; the last one also matches as a prefix, so results
+    follow the user while they type.
+    """
+    words = re.findall(r"\w+", search_term.lower())
+    if not words:
+        return None
+
+    if settings.is_postgresql:
+        query = FULL_TEXT_SEARCH_PG
+        match = " & ".join(words[:-1] + [words[-1] + ":*"])
+        category_filter, order = " AND category = %s", FULL_TEXT_ORDER_PG
+    else:
+        query = FULL_TEXT_SEARCH_SQLITE
+        match = " ".join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+        category_filter, order = " AND fc.category = %s", FULL_TEXT_ORDER_SQLITE
+
+    params: list = [match, user_id]
+    if category and category.lower() != "all":
+        query += category_filter
+        params.append(category)
+    params.append(limit)
+    return query + order, params
+
+
+def _cards(rows) -> List[FactCard]:
+    return [FactCard.from_db_row(row) for row in rows]
+
+
+def _card(rows) -> Optional[FactCard]:
+    return FactCard.from_db_row(rows[0]) if rows else None
+
+
+def _categories(rows) -> List[str]:
+    return [row['category'] if isinstance(row, dict) else row[0] for row in rows]
+
+
+def _category_counts(rows) -> Dict[str, int]:
+    return {
+        (row['category'] if isinstance(row, dict) else row[0]):
+        int(row['count'] if isinstance(row, dict) else row[1])
+        for row in rows
+    }
+
+
+def _count(rows) -> int:
+    if rows:
+        row = rows[0]
+        return row['count'] if isinstance(row, dict) else row[0]
+    return 0
+
+
+def _affected(count: int) -> bool:
+    return count > 0
+
+
+def _by_id(fact_card_id: int) -> Statement:
+    return Statement(SELECT_FACT_CARD_BY_ID, (fact_card_id,), _card)
+
+
+def _by_user_and_category(user_id: int, category: str, limit: int, offset: int) -> Statement:
+    if category.lower() == "all":
+        return Statement(SELECT_FACT_CARDS_BY_USER, (user_id, limit, offset), _cards)
+    return Statement(SELECT_FACT_CARDS_BY_USER_AND_CATEGORY, (user_id, category, limit, offset), _cards)
+
+
+def _page_statement(user_id: int, category: Optional[str], limit: int,
+                    cursor: Optional[str], offset: int) -> Statement:
+    after = decode_cursor(cursor) if cursor else None
+    query, params = _page_query(user_id, category, limit, after, offset)
+    return Statement(query, tuple(params), lambda rows: _page(rows, limit))
+
+
+def _categories_of(user_id: int) -> Statement:
+    return Statement(SELECT_CATEGORIES_FOR_USER, (user_id,), _categories)
+
+
+def _counts_by_category(user_id: int) -> Statement:
+    return Statement(COUNT_BY_CATEGORY, (user_id,), _category_counts)
+
+
+def _count_of(user_id: int, category: str) -> Statement:
+    if category.lower() == "all":
+        return Statement(COUNT_BY_USER, (user_id,), _count)
+    return Statement(COUNT_BY_USER_AND_CATEGORY, (user_id, category), _count)
+
+
+def _search(user_id: int, search_term: str, category: Optional[str], limit: int,
+            full_text: bool) -> Optional[Statement]:
+    """Ranked full-text or substring search; None when there is nothing to search for."""
+    if full_text:
+        full_text_query = _full_text_query(user_id, search_term, category, limit)
+        if full_text_query is None:
+            return None
+        query, params = full_text_query
+    else:
+        query, params = _substring_query(user_id, search_term, category, limit)
+    return Statement(query, tuple(params), _cards)
+
+
+def _update(fact_card: FactCard) -> Statement:
+    return Statement(UPDATE_FACT_CARD, _update_params(fact_card), lambda count: fact_card)
+
+
+def _delete(fact_card_id: int) -> Statement:
+    return Statement(DELETE_FACT_CARD, (fact_card_id,), _affected)
+
+
+def _delete_by_user(user_id: int) -> Statement:
+    return Statement(DELETE_FACT_CARDS_BY_USER, (user_id,), _affected)
+
+
 class FactCardRepository(BaseRepository[FactCard]):
     """Repository for fact card-related database operations."""
-    
+
     def create(self, fact_card: FactCard) -> FactCard:
         """Create a new fact card."""
-        command = """
-            INSERT INTO fact_cards (user_id, title, summary, category, confidence, 
-                                   sources, search_query, created_at, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            RETURNING id
-        """
-        params = (
-            fact_card.user_id,
-            fact_card.title,
-            fact_card.summary,
-            fact_card.category,
-            fact_card.confidence,
-            fact_card.sources,
-            fact_card.search_query
-        )
-        
-        fact_card_id = self.execute_command_get_id(command, params)
-        fact_card.id = fact_card_id
+        fact_card.id = self.execute_command_get_id(INSERT_FACT_CARD, _insert_params(fact_card))
         return fact_card
-    
+
+    def create_many(self, fact_cards: Sequence[FactCard]) -> int:
+        """Insert fact cards with multi-row INSERTs in one transaction; ids are not read back."""
+        inserted = 0
+        with self.transaction():
+            for chunk in chunked(fact_cards, INSERT_FACT_CARDS_ROW.count("%s")):
+                command = INSERT_FACT_CARDS + ", ".join([INSERT_FACT_CARDS_ROW] * len(chunk))
+                params = tuple(value for card in chunk for value in _timestamped_insert_params(card))
+                inserted += self.execute_command(command, params)
+        return inserted
+
     def get_by_id(self, fact_card_id: int) -> Optional[FactCard]:
         """Get fact card by ID."""
-        query = """
-            SELECT id, user_id, title, summary, category, confidence, sources, 
-                   search_query, created_at, updated_at
-            FROM fact_cards WHERE id = %s
-        """
-        rows = self.execute_query(query, (fact_card_id,))
-        return FactCard.from_db_row(rows[0]) if rows else None
-    
+        return self.fetch(_by_id(fact_card_id))
+
     def get_by_user_id(self, user_id: int, limit: int = 50, offset: int = 0) -> List[FactCard]:
         """Get all fact cards for a user, ordered by most recent first."""
-        query = """
-            SELECT id, user_id, title, summary, category, confidence, sources, 
-                   search_query, created_at, updated_at
-            FROM fact_cards 
-            WHERE user_id = %s 
-            ORDER BY created_at DESC 
-            LIMIT %s OFFSET %s
-        """
-        rows = self.execute_query(query, (user_id, limit, offset))
-        return [FactCard.from_db_row(row) for row in rows]
-    
-    def get_by_user_and_category(self, user_id: int, category: str, 
+        return self.fetch(_by_user_and_category(user_id, "All", limit, offset))
+
+    def get_by_user_and_category(self, user_id: int, category: str,
                                  limit: int = 50, offset: int = 0) -> List[FactCard]:
         """Get fact cards for a user filtered by category."""
-        if category.lower() == "all":
-            return self.get_by_user_id(user_id, limit, offset)
+        return self.fetch(_by_user_and_category(user_id, category, limit, offset))
+
+    def get_page(self, user_id: int, category: Optional[str] = None, limit: int = 50,
+                 cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[FactCard], Optional[str], Optional[int]]:
+        """Most recent cards first, resuming after ``cursor``.
         
-        query = """
-            SELECT id, user_id, title, summary, category, confidence, sources, 
-                   search_query, created_at, updated_at
-            FROM fact_cards 
-            WHERE user_id = %s AND category = %s
-            ORDER BY created_at DESC 
-            LIMIT %s OFFSET %s
+        Returns (cards, next cursor or None, total cards of the user/category). The
+        total is only counted for a page without ``cursor`` (None otherwise), with an
+        index-only COUNT, so deeper pages never scan the user's cards.
         """
-        rows = self.execute_query(query, (user_id, category, limit, offset))
-        return [FactCard.from_db_row(row) for row in rows]
-    
+        fact_cards, next_cursor = self.fetch(_page_statement(user_id, category, limit, cursor, offset))
+        total = None if cursor else self.fetch(_count_of(user_id, category or "All"))
+        return fact_cards, next_cursor, total
+
     def get_categories_for_user(self, user_id: int) -> List[str]:
         """Get all categories that have fact cards for a user."""
-        query = """
-            SELECT DISTINCT category 
-            FROM fact_cards 
-            WHERE user_id = %s 
-            ORDER BY category
-        """
-        rows = self.execute_query(query, (user_id,))
-        return [row['category'] if isinstance(row, dict) else row[0] for row in rows]
-    
+        return self.fetch(_categories_of(user_id))
+
+    def count_by_category(self, user_id: int) -> Dict[str, int]:
+        """Number of fact cards per category (only categories that have cards)."""
+        return self.fetch(_counts_by_category(user_id))
+
     def count_by_user(self, user_id: int) -> int:
         """Count total fact cards for a user."""
-        query = "SELECT COUNT(*) FROM fact_cards WHERE user_id = %s"
-        rows = self.execute_query(query, (user_id,))
-        if rows:
-            row = rows[0]
-            return row['count'] if isinstance(row, dict) else row[0]
-        return 0
-    
+        return self.fetch(_count_of(user_id, "All"))
+
     def count_by_user_and_category(self, user_id: int, category: str) -> int:
         """Count fact cards for a user in a specific category."""
-        if category.lower() == "all":
-            return self.count_by_user(user_id)
-        
-        query = "SELECT COUNT(*) FROM fact_cards WHERE user_id = %s AND category = %s"
-        rows = self.execute_query(query, (user_id, category))
-        if rows:
-            row = rows[0]
-            return row['count'] if isinstance(row, dict) else row[0]
-        return 0
-    
+        return self.fetch(_count_of(user_id, category))
+
     def update(self, fact_card: FactCard) -> FactCard:
         """Update an existing fact card."""
-        command = """
-            UPDATE fact_cards 
-            SET title = %s, summary = %s, category = %s, confidence = %s, 
-                sources = %s, search_query = %s, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """
-        params = (
-            fact_card.title,
-            fact_card.summary,
-            fact_card.category,
-            fact_card.confidence,
-            fact_card.sources,
-            fact_card.search_query,
-            fact_card.id
-        )
-        
-        self.execute_command(command, params)
-        return fact_card
-    
+        return self.execute(_update(fact_card))
+
     def delete(self, fact_card_id: int) -> bool:
         """Delete a fact card."""
-        command = "DELETE FROM fact_cards WHERE id = %s"
-        return self.execute_command(command, (fact_card_id,)) > 0
-    
+        return self.execute(_delete(fact_card_id))
+
     def delete_by_user(self, user_id: int) -> bool:
         """Delete all fact cards for a user."""
-        command = "DELETE FROM fact_cards WHERE user_id = %s"
-        return self.execute_command(command, (user_id,)) > 0
-    
-    def search_fact_cards(self, user_id: int, search_term: str, 
-                         category: Optional[str] = None, limit: int = 50) -> List[FactCard]:
-        """Search fact cards by title, summary, or search query."""
-        base_query = """
-            SELECT id, user_id, title, summary, category, confidence, sources, 
-                   search_query, created_at, updated_at
-            FROM fact_cards 
-            WHERE user_id = %s AND (
-                title LIKE %s OR 
-                summary LIKE %s OR 
-                search_query LIKE %s
-            )
-        """
-        
-        params = [user_id, f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"]
+        return self.execute(_delete_by_user(user_id))
+
+    def search_fact_cards(self, user_id: int, search_term: str,
+                         category: Optional[str] = None, limit: int = 50,
+                         full_text: bool = True) -> List[FactCard]:
+        """Search fact cards by title, summary, or search query.
         
-        if category and category.lower() != "all":
-            base_query += " AND category = %s"
-            params.append(category)
+        ``full_text`` ranks word matches by relevance using the full-text index;
+        otherwise this is a substring match, newest first.
+        """
+        statement = _search(user_id, search_term, category, limit, full_text)
+        return self.fetch(statement) if statement else []
+
+
+class AsyncFactCardRepository(AsyncBaseRepository[FactCard]):
+    """Async variant of FactCardRepository for ``async def`` routes."""
+
+    async def create(self, fact_card: FactCard) -> FactCard:
+        """Create a new fact card."""
+        fact_card.id = await self.execute_command_get_id(INSERT_FACT_CARD, _insert_params(fact_card))
+        return fact_card
+
+    async def get_by_id(self, fact_card_id: int) -> Optional[FactCard]:
+        """Get fact card by ID."""
+        return await self.fetch(_by_id(fact_card_id))
+
+    async def get_by_user_id(self, user_id: int, limit: int = 50, offset: int = 0) -> List[FactCard]:
+        """Get all fact cards for a user, ordered by most recent first."""
+        return await self.fetch(_by_user_and_category(user_id, "All", limit, offset))
+
+    async def get_by_user_and_category(self, user_id: int, category: str,
+                                       limit: int = 50, offset: int = 0) -> List[FactCard]:
+        """Get fact cards for a user filtered by category."""
+        return await self.fetch(_by_user_and_category(user_id, category, limit, offset))
+
+    async def get_page(self, user_id: int, category: Optional[str] = None, limit: int = 50,
+                       cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[FactCard], Optional[str], Optional[int]]:
+        """Most recent cards first, resuming after ``cursor``.
         
-        base_query += " ORDER BY created_at DESC LIMIT %s"
-        params.append(limit)
+        Returns (cards, next cursor or None, total cards of the user/category); the
+        total is None on ``cursor`` pages (see FactCardRepository.get_page).
+        """
+        fact_cards, next_cursor = await self.fetch(_page_statement(user_id, category, limit, cursor, offset))
+        total = None if cursor else await self.fetch(_count_of(user_id, category or "All"))
+        return fact_cards, next_cursor, total
+
+    async def get_categories_for_user(self, user_id: int) -> List[str]:
+        """Get all categories that have fact cards for a user."""
+        return await self.fetch(_categories_of(user_id))
+
+    async def count_by_category(self, user_id: int) -> Dict[str, int]:
+        """Number of fact cards per category (only categories that have cards)."""
+        return await self.fetch(_counts_by_category(user_id))
+
+    async def count_by_user(self, user_id: int) -> int:
+        """Count total fact cards for a user."""
+        return await self.fetch(_count_of(user_id, "All"))
+
+    async def count_by_user_and_category(self, user_id: int, category: str) -> int:
+        """Count fact cards for a user in a specific category."""
+        return await self.fetch(_count_of(user_id, category))
+
+    async def update(self, fact_card: FactCard) -> FactCard:
+        """Update an existing fact card."""
+        return await self.execute(_update(fact_card))
+
+    async def delete(self, fact_card_id: int) -> bool:
+        """Delete a fact card."""
+        return await self.execute(_delete(fact_card_id))
+
+    async def delete_by_user(self, user_id: int) -> bool:
+        """Delete all fact cards for a user."""
+        return await self.execute(_delete_by_user(user_id))
+
+    async def search_fact_cards(self, user_id: int, search_term: str,
+                                category: Optional[str] = None, limit: int = 50,
+                                full_text: bool = True) -> List[FactCard]:
+        """Search fact cards by title, summary, or search query.
         
-        rows = self.execute_query(base_query, params)
-        return [FactCard.from_db_row(row) for row in rows]
+        ``full_text`` ranks word matches by relevance using the full-text index;
+        otherwise this is a substring match, newest first.
+        """
+        statement = _search(user_id, search_term, category, limit, full_text)
+        return await self.fetch(statement) if statement else []
@@ -0,0 +1,311 @@
+"""
+User fact repository: append-only log of what each user learned, plus the
+per-user aggregates (category totals, daily activity) maintained alongside it.
+"""
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from app.core.config import settings
+from app.repositories.base import BaseRepository, chunked
+from app.repositories.user_repository import BUMP_USER_ACTIVITY, bump_activity_params, invalidate_users
+from app.models.user_fact import UserFact
+
+INSERT_USER_FACT = """
+    INSERT INTO user_facts (user_id, type, category, content, source_url, extra, learned_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    RETURNING id
+"""
+
+SELECT_USER_FACT = """
+    SELECT id, user_id, type, category, content, source_url, extra, learned_at
+    FROM user_facts
+"""
+
+
+# Aggregates are bumped by upsert at write time so progress reads never scan history
+# (ON CONFLICT ... DO UPDATE works on PostgreSQL and SQLite >= 3.24)
+INCREMENT_CATEGORY_COUNT = """
+    INSERT INTO user_category_counts (user_id, category, fact_count)
+    VALUES (%s, %s, 1)
+    ON CONFLICT (user_id, category)
+    DO UPDATE SET fact_count = user_category_counts.fact_count + 1
+"""
+
+INCREMENT_DAILY_ACTIVITY = """
+    INSERT INTO user_daily_activity (user_id, day, activity_type, category, activity_count)
+    VALUES (%s, %s, %s, %s, 1)
+    ON CONFLICT (user_id, day, activity_type, category)
+    DO UPDATE SET activity_count = user_daily_activity.activity_count + 1
+"""
+
+# Batched variants: one row per key, pre-aggregated by the caller (a single INSERT may
+# not hit the same conflict key twice on PostgreSQL)
+INSERT_USER_FACTS = """
+    INSERT INTO user_facts (user_id, type, category, content, source_url, extra, learned_at)
+    VALUES
+"""
+INSERT_USER_FACTS_ROW = "(%s, %s, %s, %s, %s, %s, %s)"
+
+ADD_CATEGORY_COUNTS = """
+    INSERT INTO user_category_counts (user_id, category, fact_count)
+    VALUES
+"""
+ADD_CATEGORY_COUNTS_ROW = "(%s, %s, %s)"
+ADD_CATEGORY_COUNTS_CONFLICT = """
+    ON CONFLICT (user_id, category)
+    DO UPDATE SET fact_count = user_category_counts.fact_count + excluded.fact_count
+"""
+
+ADD_DAILY_ACTIVITY = """
+    INSERT INTO user_daily_activity (user_id, day, activity_type, category, activity_count)
+    VALUES
+"""
+ADD_DAILY_ACTIVITY_ROW = "(%s, %s, %s, %s, %s)"
+ADD_DAILY_ACTIVITY_CONFLICT = """
+    ON CONFLICT (user_id, day, activity_type, category)
+    DO UPDATE SET activity_count = user_daily_activity.activity_count + excluded.activity_count
+"""
+
+# Daily activity that is not a learned fact (quiz grading only moves the streak)
+QUIZ_ANSWERS_ACTIVITY = "quiz_answers"
+
+
+# PostgreSQL: the whole progress update (user counters and streak, fact row, both
+# aggregates) as one data-modifying CTE, i.e. one round trip. The inserts select
+# from the UPDATE, so nothing is written for an unknown user (the result is NULL).
+RECORD_FACT_PROGRESS = f"""
+    WITH u AS ({BUMP_USER_ACTIVITY} RETURNING id),
+    f AS (
+        INSERT INTO user_facts (user_id, type, category, content, source_url, extra, learned_at)
+        SELECT id, %s, %s, %s, %s, %s, CAST(%s AS TIMESTAMP) FROM u
+        RETURNING id
+    ),
+    c AS (
+        INSERT INTO user_category_counts (user_id, category, fact_count)
+        SELECT id, %s, 1 FROM u
+        ON CONFLICT (user_id, category)
+        DO UPDATE SET fact_count = user_category_counts.fact_count + 1
+    ),
+    d AS (
+        INSERT INTO user_daily_activity (user_id, day, activity_type, category, activity_count)
+        SELECT id, CAST(%s AS DATE), %s, %s, 1 FROM u
+        ON CONFLICT (user_id, day, activity_type, category)
+        DO UPDATE SET activity_count = user_daily_activity.activity_count + 1
+    )
+    SELECT (SELECT id FROM f) AS id
+"""
+
+RECORD_ACTIVITY_PROGRESS = f"""
+    WITH u AS ({BUMP_USER_ACTIVITY} RETURNING id),
+    d AS (
+        INSERT INTO user_daily_activity (user_id, day, activity_type, category, activity_count)
+        SELECT id, CAST(%s AS DATE), %s, %s, 1 FROM u
+        ON CONFLICT (user_id, day, activity_type, category)
+        DO UPDATE SET activity_count = user_daily_activity.activity_count + 1
+    )
+    SELECT (SELECT id FROM u) AS id
+"""
+
+
+def _insert_params(fact: UserFact) -> tuple:
+    return (
+        fact.user_id, fact.type, fact.category, fact.content,
+        fact.source_url, fact.extra_json, fact.learned_at_db
+    )
+
+
+def _values(row: str, count: int) -> str:
+    return ", ".join([row] * count)
+
+
+class UserFactRepository(BaseRepository[UserFact]):
+    """Repository for user fact operations; every read is served by an index on user_id."""
+
+    def create(self, fact: UserFact) -> UserFact:
+        """Append a fact (one indexed row insert, independent of history size)."""
+        fact.id = self.execute_command_get_id(INSERT_USER_FACT, _insert_params(fact))
+        return fact
+
+    def get_by_id(self, fact_id: int) -> Optional[UserFact]:
+        """Get fact by ID."""
+        rows = self.execute_query(SELECT_USER_FACT + " WHERE id = %s", (fact_id,))
+        return UserFact.from_db_row(rows[0]) if rows else None
+
+    def update(self, fact: UserFact) -> UserFact:
+        """Update a fact's descriptive fields."""
+        command = """
+            UPDATE user_facts SET type = %s, category = %s, content = %s, source_url = %s, extra = %s
+            WHERE id = %s
+        """
+        self.execute_command(command, (fact.type, fact.category, fact.content,
+                                       fact.source_url, fact.extra_json, fact.id))
+        return fact
+
+    def delete(self, fact_id: int) -> bool:
+        """Delete a fact."""
+        return self.execute_command("DELETE FROM user_facts WHERE id = %s", (fact_id,)) > 0
+
+    def get_by_user(self, user_id: int, types: Optional[Sequence[str]] = None,
+                    limit: int = 50) -> List[UserFact]:
+        """Most recent facts of a user, optionally restricted to some fact types."""
+        query = SELECT_USER_FACT + " WHERE user_id = %s"
+        params: list = [user_id]
+        if types:
+            query += " AND type IN (" + ", ".join(["%s"] * len(types)) + ")"
+            params.extend(types)
+        query += " ORDER BY learned_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+        rows = self.execute_query(query, tuple(params))
+        return [UserFact.from_db_row(row) for row in rows]
+
+    def record_fact(self, fact: UserFact, day: date) -> UserFact:
+        """Append a fact and bump its category total and daily bucket."""
+        self.create(fact)
+        self.execute_command(INCREMENT_CATEGORY_COUNT, (fact.user_id, fact.category))
+        self.record_activity(fact.user_id, day, fact.type, fact.category)
+        return fact
+
+    def record_progress(self, user_id: int, fact: Optional[UserFact], day: date,
+                        activity_type: str = QUIZ_ANSWERS_ACTIVITY) -> bool:
+        """Apply one unit of user activity atomically; False if the user does not exist.
+        
+        With a fact: append it, bump its aggregates, count it on the user and advance
+        the streak. Without: record ``activity_type`` for ``day`` and advance the streak.
+        One statement on PostgreSQL; on SQLite the same writes run in one transaction.
+        """
+        invalidate_users(user_id)
+        if settings.is_postgresql:
+            bump = bump_activity_params(user_id, day, 1 if fact else 0)
+            if fact is None:
+                params = bump + (day.isoformat(), activity_type, "")
+                return self.execute_command_get_id(RECORD_ACTIVITY_PROGRESS, params) is not None
+            params = (bump + _insert_params(fact)[1:] + (fact.category,)
+                      + (day.isoformat(), fact.type, fact.category))
+            fact.id = self.execute_command_get_id(RECORD_FACT_PROGRESS, params)
+            return fact.id is not None
+        
+        with self.transaction():
+            # The UPDATE goes first so the write lock is taken before anything is read
+            if self.execute_command(BUMP_USER_ACTIVITY, bump_activity_params(user_id, day, 1 if fact else 0)) == 0:
+                return False
+            if fact is None:
+                self.record_activity(user_id, day, activity_type)
+            else:
+                self.record_fact(fact, day)
+            return True
+
+    def record_progress_batch(self, events: Sequence[Tuple[int, Optional[UserFact], date]]) -> int:
+        """Apply many ``record_progress`` events in one transaction; returns events applied.
+        
+        Streak/counter updates run as one pipelined UPDATE per (user, day) in day order,
+        facts and both aggregates as multi-row INSERTs. Events of unknown users are dropped.
+        """
+        user_ids = sorted({user_id for user_id, _, _ in events})
+        if not user_ids:
+            return 0
+        with self.transaction():
+            known = self.existing_user_ids(user_ids)
+            events = [event for event in events if event[0] in known]
+            if not events:
+                return 0
+            invalidate_users(*known)
+            
+            facts_per_day: Counter = Counter()
+            for user_id, fact, day in events:
+                facts_per_day[(user_id, day)] += 1 if fact is not None else 0
+            self.execute_many(BUMP_USER_ACTIVITY, [
+                bump_activity_params(user_id, day, delta)
+                for (user_id, day), delta in sorted(facts_per_day.items(), key=lambda item: item[0][1])
+            ])
+            
+            # Multi-row statements are split to stay under the bound-parameter limit
+            facts = [fact for _, fact, _ in events if fact is not None]
+            for chunk in chunked(facts, INSERT_USER_FACTS_ROW.count("%s")):
+                self.execute_command(
+                    INSERT_USER_FACTS + _values(INSERT_USER_FACTS_ROW, len(chunk)),
+                    tuple(value for fact in chunk for value in _insert_params(fact))
+                )
+            categories = list(Counter((fact.user_id, fact.category) for fact in facts).items())
+            for chunk in chunked(categories, ADD_CATEGORY_COUNTS_ROW.count("%s")):
+                self.execute_command(
+                    ADD_CATEGORY_COUNTS + _values(ADD_CATEGORY_COUNTS_ROW, len(chunk))
+                    + ADD_CATEGORY_COUNTS_CONFLICT,
+                    tuple(value for key, count in chunk for value in key + (count,))
+                )
+            
+            activity = list(Counter(
+                (user_id, day.isoformat(), fact.type, fact.category) if fact is not None
+                else (user_id, day.isoformat(), QUIZ_ANSWERS_ACTIVITY, "")
+                for user_id, fact, day in events
+            ).items())
+            for chunk in chunked(activity, ADD_DAILY_ACTIVITY_ROW.count("%s")):
+                self.execute_command(
+                    ADD_DAILY_ACTIVITY + _values(ADD_DAILY_ACTIVITY_ROW, len(chunk))
+                    + ADD_DAILY_ACTIVITY_CONFLICT,
+                    tuple(value for key, count in chunk for value in key + (count,))
+                )
+        return len(events)
+
+    def existing_user_ids(self, user_ids: Sequence[int]) -> Set[int]:
+        """Which of ``user_ids`` still exist."""
+        existing: Set[int] = set()
+        for chunk in chunked(list(user_ids), 1):
+            rows = self.execute_query(
+                "SELECT id FROM users WHERE id IN (" + ", ".join(["%s"] * len(chunk)) + ")",
+                tuple(chunk)
+            )
+            existing.update(int(row["id"] if isinstance(row, dict) else row[0]) for row in rows)
+        return existing
+
+    def record_activity(self, user_id: int, day: date, activity_type: str, category: str = "") -> None:
+        """Bump the user's activity bucket for ``day``."""
+        self.execute_command(INCREMENT_DAILY_ACTIVITY, (user_id, day.isoformat(), activity_type, category))
+
+    def count_by_category(self, user_id: int) -> Dict[str, int]:
+        """Number of facts per category (one row per category the user has touched)."""
+        rows = self.execute_query(
+            "SELECT category, fact_count FROM user_category_counts WHERE user_id = %s",
+            (user_id,)
+        )
+        return {
+            (row["category"] if isinstance(row, dict) else row[0]):
+            int(row["fact_count"] if isinstance(row, dict) else row[1])
+            for row in rows
+        }
+
+    def count_since(self, user_id: int, since: date) -> int:
+        """Number of facts learned on or after ``since``, from the daily buckets."""
+        rows = self.execute_query(
+            """
+            SELECT COALESCE(SUM(activity_count), 0) AS count FROM user_daily_activity
+            WHERE user_id = %s AND day >= %s AND activity_type <> %s
+            """,
+            (user_id, since.isoformat(), QUIZ_ANSWERS_ACTIVITY)
+        )
+        if rows:
+            row = rows[0]
+            return int(row["count"] if isinstance(row, dict) else row[0])
+        return 0
+
+    def daily_activity(self, user_id: int, since: date) -> List[Dict[str, Any]]:
+        """Daily buckets on or after ``since`` (oldest first), one row per type/category."""
+        rows = self.execute_query(
+            """
+            SELECT day, activity_type, category, activity_count FROM user_daily_activity
+            WHERE user_id = %s AND day >= %s
+            ORDER BY day, activity_type, category
+            """,
+            (user_id, since.isoformat())
+        )
+        buckets = []
+        for row in rows:
+            if not isinstance(row, dict):
+                row = dict(zip(("day", "activity_type", "category", "activity_count"), row))
+            day = row["day"]
+            buckets.append({
+                "day": day.isoformat() if hasattr(day, "isoformat") else str(day)[:10],
+                "activity_type": row["activity_type"],
+                "category": row["category"] or "",
+                "count": int(row["activity_count"] or 0)
+            })
+        return buckets
@@ -1,115 +1,314 @@
 """
 User repository for database operations.
 """
-from typing import Optional, List
+import threading
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Any, Callable, Hashable, Optional, Tuple
+from app.cache import TTLCache, request_memo
+from app.core.config import settings
+from app.core.database import db_manager
 # PostgreSQL support through database manager
-from app.repositories.base import BaseRepository
-from app.models.user import User
+from app.repositories.base import AsyncBaseRepository, BaseRepository, Statement
+from app.models.user import Principal, User
+
+# SQL shared by the sync and async repositories
+INSERT_USER = """
+    INSERT INTO users (username, password, email, facts_learned, current_streak,
+                     longest_streak, total_facts_count, last_activity_date)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+SELECT_USER = """
+    SELECT id, username, password, email, facts_learned, current_streak,
+           longest_streak, total_facts_count, last_activity_date
+    FROM users
+"""
+SELECT_USER_BY_ID = SELECT_USER + " WHERE id = %s"
+SELECT_USER_BY_USERNAME = SELECT_USER + " WHERE username = %s"
+# Auth checks only need the identity, not the progress columns
+SELECT_PRINCIPAL_BY_ID = "SELECT id, username, email FROM users WHERE id = %s"
+SELECT_USER_BY_EMAIL = SELECT_USER + " WHERE email = %s"
+
+UPDATE_USER = """
+    UPDATE users
+    SET username = %s, password = %s, email = %s, facts_learned = %s,
+        current_streak = %s, longest_streak = %s, total_facts_count = %s,
+        last_activity_date = %s
+    WHERE id = %s
+"""
+
+UPDATE_USER_PASSWORD = "UPDATE users SET password = %s WHERE id = %s"
+
+# Streak transition computed from the stored row (params: today, yesterday):
+# same day keeps the streak, the day after extends it, any gap restarts at 1
+_LAST_ACTIVITY_DAY = "substr(CAST(last_activity_date AS TEXT), 1, 10)"
+_NEW_STREAK = f"""
+    CASE
+        WHEN {_LAST_ACTIVITY_DAY} = %s THEN CASE WHEN current_streak > 0 THEN current_streak ELSE 1 END
+        WHEN {_LAST_ACTIVITY_DAY} = %s THEN COALESCE(current_streak, 0) + 1
+        ELSE 1
+    END
+"""
+
+# Counter increment and streak update as one atomic statement; SET expressions all
+# read the pre-update row, so concurrent activity never loses an increment
+# (params: facts delta, today, yesterday, today, yesterday, today, user id)
+BUMP_USER_ACTIVITY = f"""
+    UPDATE users
+    SET total_facts_count = COALESCE(total_facts_count, 0) + %s,
+        current_streak = {_NEW_STREAK},
+        longest_streak = CASE
+            WHEN {_NEW_STREAK} > COALESCE(longest_streak, 0) THEN {_NEW_STREAK}
+            ELSE COALESCE(longest_streak, 0)
+        END,
+        last_activity_date = %s
+    WHERE id = %s
+"""
+
+DELETE_USER = "DELETE FROM users WHERE id = %s"
+USERNAME_EXISTS = "SELECT 1 FROM users WHERE username = %s"
+EMAIL_EXISTS = "SELECT 1 FROM users WHERE email = %s"
+
+
+# Read-through user cache: a per-request memo (cache.request_scope()) in front of a
+# short-TTL process cache. Writes evict both right away and again after their
+# transaction commits, so no reader can re-cache the pre-commit row in between.
+USER_CACHE = TTLCache(
+    maxsize=settings.user_cache_max_entries,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    name="users",
+)
+# Bumped by every eviction; a load that raced with one is not cached
+_cache_generation = 0
+_cache_generation_lock = threading.Lock()
+
+
+def _cache_keys(user_id: int) -> tuple:
+    return ("user", user_id), ("principal", user_id)
+
+
+def _cached(key: Hashable) -> Any:
+    memo = request_memo()
+    if memo is not None and key in memo:
+        return memo[key]
+    value = USER_CACHE.get(key) if settings.user_cache_ttl_seconds > 0 else None
+    if value is not None and memo is not None:
+        memo[key] = value
+    return value
+
+
+def _current_generation() -> int:
+    with _cache_generation_lock:
+        return _cache_generation
+
+
+def _store(key: Hashable, value: Any, generation: int) -> None:
+    if value is None:
+        return
+    memo = request_memo()
+    with _cache_generation_lock:
+        if generation != _cache_generation:
+            return
+        if memo is not None:
+            memo[key] = value
+        if settings.user_cache_ttl_seconds > 0:
+            USER_CACHE.set(key, value)
+
+
+def _evict(user_ids) -> None:
+    global _cache_generation
+    memo = request_memo()
+    with _cache_generation_lock:
+        _cache_generation += 1
+        for user_id in user_ids:
+            for key in _cache_keys(user_id):
+                USER_CACHE.delete(key)
+                if memo is not None:
+                    memo.pop(key, None)
+
+
+def invalidate_users(*user_ids: int, manager=db_manager) -> None:
+    """Drop cached copies of these users; call after writing their rows through ``manager``."""
+    _evict(user_ids)
+    manager.on_commit(lambda: _evict(user_ids))
+
+
+def _copy(user: Optional[User]) -> Optional[User]:
+    # Callers may mutate what they get; the cached instance must stay as loaded
+    return replace(user) if user is not None else None
+
+
+def _insert_params(user: User) -> tuple:
+    return (
+        user.username, user.password, user.email, user.facts_learned,
+        user.current_streak, user.longest_streak, user.total_facts_count,
+        user.last_activity_date
+    )
+
+
+def _update_params(user: User) -> tuple:
+    return _insert_params(user) + (user.id,)
+
+
+def bump_activity_params(user_id: int, today: date, facts_delta: int) -> tuple:
+    """Parameters for BUMP_USER_ACTIVITY."""
+    day, yesterday = today.isoformat(), (today - timedelta(days=1)).isoformat()
+    return (facts_delta,) + (day, yesterday) * 3 + (day, user_id)
+
+
+def _first_user(rows) -> Optional[User]:
+    return User.from_db_row(rows[0]) if rows else None
+
+
+def _any(rows) -> bool:
+    return len(rows) > 0
+
+
+def _read_through(key: Hashable, sql: str, user_id: int,
+                  from_row: Callable[[Any], Any]) -> Tuple[Any, Optional[Statement]]:
+    """(cached value, None) on a hit, else (None, a Statement that loads and caches it).
+
+    The generation is taken before the query runs, so a load that races with a write
+    is returned but not cached.
+    """
+    value = _cached(key)
+    if value is not None:
+        return value, None
+    generation = _current_generation()
+
+    def load(rows) -> Any:
+        loaded = from_row(rows[0]) if rows else None
+        _store(key, loaded, generation)
+        return loaded
+    return None, Statement(sql, (user_id,), load)
+
+
+def _lookup(identifier: str) -> Statement:
+    """Find a user by email if ``identifier`` looks like one, else by username."""
+    sql = SELECT_USER_BY_EMAIL if "@" in identifier else SELECT_USER_BY_USERNAME
+    return Statement(sql, (identifier,), _first_user)
+
+
+def _write(sql: str, params: tuple, user_id: int, manager) -> Statement:
+    """A write to ``user_id``'s row; cached copies are dropped once it ran (and on commit)."""
+    def written(count: int) -> bool:
+        invalidate_users(user_id, manager=manager)
+        return count > 0
+    return Statement(sql, params, written)
+
 
 class UserRepository(BaseRepository[User]):
     """Repository for user-related database operations."""
-    
+
     def create(self, user: User) -> User:
         """Create a new user."""
-        command = """
-            INSERT INTO users (username, password, email, facts_learned, current_streak, 
-                             longest_streak, total_facts_count, last_activity_date)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (
-            user.username, user.password, user.email, user.facts_learned,
-            user.current_streak, user.longest_streak, user.total_facts_count,
-            user.last_activity_date
-        )
-        
-        user_id = self.execute_command_get_id(command, params)
-        user.id = user_id
+        user.id = self.execute_command_get_id(INSERT_USER, _insert_params(user))
         return user
-    
+
     def get_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by ID."""
-        query = """
-            SELECT id, username, password, email, facts_learned, current_streak,
-                   longest_streak, total_facts_count, last_activity_date
-            FROM users WHERE id = %s
-        """
-        rows = self.execute_query(query, (user_id,))
-        return User.from_db_row(rows[0]) if rows else None
-    
+        """Get user by ID (cached)."""
+        user, load = _read_through(("user", user_id), SELECT_USER_BY_ID, user_id, User.from_db_row)
+        return _copy(self.fetch(load) if load else user)
+
+    def get_principal(self, user_id: int) -> Optional[Principal]:
+        """Identity of a user for auth checks (cached, without progress columns)."""
+        principal, load = _read_through(("principal", user_id), SELECT_PRINCIPAL_BY_ID, user_id,
+                                        Principal.from_db_row)
+        return self.fetch(load) if load else principal
+
     def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        query = """
-            SELECT id, username, password, email, facts_learned, current_streak,
-                   longest_streak, total_facts_count, last_activity_date
-            FROM users WHERE username = %s
-        """
-        rows = self.execute_query(query, (username,))
-        return User.from_db_row(rows[0]) if rows else None
-    
+        return self.fetch(Statement(SELECT_USER_BY_USERNAME, (username,), _first_user))
+
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        query = """
-            SELECT id, username, password, email, facts_learned, current_streak,
-                   longest_streak, total_facts_count, last_activity_date
-            FROM users WHERE email = %s
-        """
-        rows = self.execute_query(query, (email,))
-        return User.from_db_row(rows[0]) if rows else None
-    
+        return self.fetch(Statement(SELECT_USER_BY_EMAIL, (email,), _first_user))
+
     def get_by_username_or_email(self, identifier: str) -> Optional[User]:
         """Get user by username or email."""
-        if "@" in identifier:
-            return self.get_by_email(identifier)
-        else:
-            return self.get_by_username(identifier)
-    
+        return self.fetch(_lookup(identifier))
+
     def update(self, user: User) -> User:
         """Update user."""
-        command = """
-            UPDATE users 
-            SET username = %s, password = %s, email = %s, facts_learned = %s,
-                current_streak = %s, longest_streak = %s, total_facts_count = %s,
-                last_activity_date = %s
-            WHERE id = %s
-        """
-        params = (
-            user.username, user.password, user.email, user.facts_learned,
-            user.current_streak, user.longest_streak, user.total_facts_count,
-            user.last_activity_date, user.id
-        )
-        
-        self.execute_command(command, params)
+        self.execute(_write(UPDATE_USER, _update_params(user), user.id, self.db))
         return user
-    
-    def update_progress(self, user_id: int, facts_learned: str, total_facts_count: int,
-                       current_streak: int, longest_streak: int, last_activity_date: str) -> bool:
-        """Update user progress fields efficiently."""
-        command = """
-            UPDATE users 
-            SET facts_learned = %s, total_facts_count = %s, current_streak = %s,
-                longest_streak = %s, last_activity_date = %s
-            WHERE id = %s
-        """
-        params = (facts_learned, total_facts_count, current_streak, 
-                 longest_streak, last_activity_date, user_id)
-        
-        return self.execute_command(command, params) > 0
-    
+
+    def update_password(self, user_id: int, hashed_password: str) -> bool:
+        """Replace the stored password hash."""
+        return self.execute(_write(UPDATE_USER_PASSWORD, (hashed_password, user_id), user_id, self.db))
+
+    def bump_activity(self, user_id: int, today: date, facts_delta: int = 0) -> bool:
+        """Add ``facts_delta`` facts and advance the streak in a single UPDATE."""
+        params = bump_activity_params(user_id, today, facts_delta)
+        return self.execute(_write(BUMP_USER_ACTIVITY, params, user_id, self.db))
+
     def delete(self, user_id: int) -> bool:
         """Delete user."""
-        command = "DELETE FROM users WHERE id = %s"
-        return self.execute_command(command, (user_id,)) > 0
-    
+        return self.execute(_write(DELETE_USER, (user_id,), user_id, self.db))
+
     def exists_username(self, username: str) -> bool:
         """Check if username exists."""
-        query = "SELECT 1 FROM users WHERE username = %s"
-        rows = self.execute_query(query, (username,))
-        return len(rows) > 0
-    
+        return self.fetch(Statement(USERNAME_EXISTS, (username,), _any))
+
     def exists_email(self, email: str) -> bool:
         """Check if email exists."""
-        if not email:
-            return False
-        query = "SELECT 1 FROM users WHERE email = %s"
-        rows = self.execute_query(query, (email,))
-        return len(rows) > 0
+        return bool(email) and self.fetch(Statement(EMAIL_EXISTS, (email,), _any))
+
+
+class AsyncUserRepository(AsyncBaseRepository[User]):
+    """Async variant of UserRepository for ``async def`` routes."""
+
+    async def create(self, user: User) -> User:
+        """Create a new user."""
+        user.id = await self.execute_command_get_id(INSERT_USER, _insert_params(user))
+        return user
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID (cached)."""
+        user, load = _read_through(("user", user_id), SELECT_USER_BY_ID, user_id, User.from_db_row)
+        return _copy(await self.fetch(load) if load else user)
+
+    async def get_principal(self, user_id: int) -> Optional[Principal]:
+        """Identity of a user for auth checks (cached, without progress columns)."""
+        principal, load = _read_through(("principal", user_id), SELECT_PRINCIPAL_BY_ID, user_id,
+                                        Principal.from_db_row)
+        return await self.fetch(load) if load else principal
+
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """Get user by username."""
+        return await self.fetch(Statement(SELECT_USER_BY_USERNAME, (username,), _first_user))
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Get user by email."""
+        return await self.fetch(Statement(SELECT_USER_BY_EMAIL, (email,), _first_user))
+
+    async def get_by_username_or_email(self, identifier: str) -> Optional[User]:
+        """Get user by username or email."""
+        return await self.fetch(_lookup(identifier))
+
+    async def update(self, user: User) -> User:
+        """Update user."""
+        await self.execute(_write(UPDATE_USER, _update_params(user), user.id, self.db))
+        return user
+
+    async def update_password(self, user_id: int, hashed_password: str) -> bool:
+        """Replace the stored password hash."""
+        return await self.execute(_write(UPDATE_USER_PASSWORD, (hashed_password, user_id), user_id, self.db))
+
+    async def bump_activity(self, user_id: int, today: date, facts_delta: int = 0) -> bool:
+        """Add ``facts_delta`` facts and advance the streak in a single UPDATE."""
+        params = bump_activity_params(user_id, today, facts_delta)
+        return await self.execute(_write(BUMP_USER_ACTIVITY, params, user_id, self.db))
+
+    async def delete(self, user_id: int) -> bool:
+        """Delete user."""
+        return await self.execute(_write(DELETE_USER, (user_id,), user_id, self.db))
+
+    async def exists_username(self, username: str) -> bool:
+        """Check if username exists."""
+        return await self.fetch(Statement(USERNAME_EXISTS, (username,), _any))
+
+    async def exists_email(self, email: str) -> bool:
+        """Check if email exists."""
+        return bool(email) and await self.fetch(Statement(EMAIL_EXISTS, (email,), _any))
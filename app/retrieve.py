@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 from typing import Iterable
+import hashlib
 import re
 
-from rank_bm25 import BM25Okapi
-
+from .bm25 import BM25Index
+from .cache import TTLCache
 from .core.config import settings
-import requests
+from .http_client import get_client
 
 
 _WORD = re.compile(r"\w+")
+# Indexes are reused when the same passage set is ranked again (repeat claims, batches).
+# Keyed by a digest of the passages and bounded by index size, like PAGE_CACHE.
+_BM25_INDEXES = TTLCache(
+    maxsize=64,
+    ttl_seconds=settings.cache_ttl_page_min * 60,
+    name="bm25_index",
+    maxbytes=settings.bm25_cache_max_mb * 1024 * 1024,
+    sizeof=lambda index: index.nbytes,
+)
 
 
 def tokenize(text: str) -> list[str]:
@@ -42,14 +52,24 @@ def chunk(text: str, size: int = 1000, overlap: int = 150) -> list[str]:
     return chunks
 
 
+def _passages_digest(passages: list[str]) -> bytes:
+    digest = hashlib.sha256()
+    for passage in passages:
+        data = passage.encode()
+        # Length-prefixed, so different splits of the same text get different keys
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.digest()
+
+
+def bm25_index(passages: list[str]) -> BM25Index:
+    return _BM25_INDEXES.get_or_compute(_passages_digest(passages), lambda: BM25Index(passages, tokenize))
+
+
 def bm25_rank(query: str, passages: list[str], k: int) -> list[tuple[float, str]]:
     if not passages:
         return []
-    tokenized_passages = [tokenize(p) for p in passages]
-    bm25 = BM25Okapi(tokenized_passages)
-    scores = bm25.get_scores(tokenize(query))
-    ranked = sorted(zip(scores, passages), key=lambda x: (x[0], passages.index(x[1])), reverse=True)
-    return ranked[:k]
+    return bm25_index(passages).top_k(tokenize(query), k)
 
 
 def embed_rerank(query: str, passages: list[str], top_k: int = 5) -> list[tuple[float, str]]:
@@ -60,14 +80,13 @@ def embed_rerank(query: str, passages: list[str], top_k: int = 5) -> list[tuple[
             headers = {
                 "Authorization": f"Bearer {settings.langsearch_api_key}",
                 "Content-Type": "application/json",
-                "User-Agent": "HealthFactAI/1.0 (+verified-search)",
             }
             payload = {
                 "query": query,
                 "documents": passages,
                 "topK": int(top_k),
             }
-            resp = requests.post(url, headers=headers, json=payload, timeout=settings.request_timeout_seconds)
+            resp = get_client().post(url, headers=headers, json=payload)
             resp.raise_for_status()
             data = resp.json() or {}
             results = data.get("data") or []
@@ -1,7 +1,7 @@
 """
 Progress-related Pydantic schemas.
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class ProgressResponse(BaseModel):
@@ -46,3 +46,33 @@ class CategoriesResponse(BaseModel):
                 "total": 10
             }
         }
+
+class DailyActivity(BaseModel):
+    """Activity of one day; ``facts`` excludes quiz grading, which only moves the streak."""
+    date: str
+    facts: int = 0
+    by_type: Dict[str, int] = {}
+    by_category: Dict[str, int] = {}
+
+class TimeseriesResponse(BaseModel):
+    """Schema for the daily activity time series (oldest day first, zero-filled)."""
+    days: int
+    total_facts: int
+    series: List[DailyActivity]
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "days": 2,
+                "total_facts": 3,
+                "series": [
+                    {"date": "2024-01-14", "facts": 0, "by_type": {}, "by_category": {}},
+                    {
+                        "date": "2024-01-15",
+                        "facts": 3,
+                        "by_type": {"search": 2, "quiz": 1, "quiz_answers": 1},
+                        "by_category": {"Nutrition": 2, "Exercise": 1}
+                    }
+                ]
+            }
+        }
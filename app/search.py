@@ -1,27 +1,30 @@
 from __future__ import annotations
 
-import time
+import asyncio
 from typing import Any
 
-import requests
-
 from .cache import TTLCache
+from .concurrency import SingleFlight, run_sync
 from .core.config import settings
+from .http_client import get_async_client, get_client
 from .utils import is_allowed
 
 
-SEARCH_CACHE = TTLCache(maxsize=256, ttl_seconds=settings.cache_ttl_search_min * 60)
-
+# Stale results are served for up to CACHE_MAX_STALE_SEARCH_MIN while refreshed in the background
+SEARCH_CACHE = TTLCache(
+    maxsize=256,
+    ttl_seconds=settings.cache_ttl_search_min * 60,
+    name="search",
+    stale_ttl_seconds=settings.cache_max_stale_search_min * 60,
+)
+# Identical concurrent searches share one upstream round trip
+SEARCH_FLIGHTS = SingleFlight()
 
-def _bing_search(query: str, top: int) -> list[dict[str, str]]:
-    cache_key = ("bing", query, int(top))
-    cached = SEARCH_CACHE.get(cache_key)
-    if cached is not None:
-        return cached
+BING_URL = "https://api.bing.microsoft.com/v7.0/search"
+LANGSEARCH_URL = "https://api.langsearch.com/v1/web-search"
 
-    if not settings.bing_api_key:
-        return []
 
+def _bing_request(query: str, top: int) -> dict[str, Any]:
     params = {
         "q": query,
         "count": int(top),
@@ -30,22 +33,11 @@ def _bing_search(query: str, top: int) -> list[dict[str, str]]:
         "textDecorations": False,
         "setLang": "en",
     }
-    headers = {
-        "Ocp-Apim-Subscription-Key": settings.bing_api_key,
-        "User-Agent": "HealthFactAI/1.0 (+verified-search)",
-    }
-    try:
-        resp = requests.get(
-            "https://api.bing.microsoft.com/v7.0/search",
-            params=params,
-            headers=headers,
-            timeout=settings.request_timeout_seconds,
-        )
-        resp.raise_for_status()
-        data: dict[str, Any] = resp.json()
-    except Exception:
-        return []
+    headers = {"Ocp-Apim-Subscription-Key": settings.bing_api_key}
+    return {"params": params, "headers": headers}
+
 
+def _parse_bing(data: dict[str, Any]) -> list[dict[str, str]]:
     results: list[dict[str, str]] = []
     for item in (data.get("webPages", {}) or {}).get("value", []):
         url = item.get("url") or ""
@@ -53,25 +45,13 @@ def _bing_search(query: str, top: int) -> list[dict[str, str]]:
         if not url or not is_allowed(url):
             continue
         results.append({"title": title, "url": url})
-
-    SEARCH_CACHE.set(cache_key, results)
     return results
 
 
-def langsearch_web_search(query: str, top: int) -> list[dict[str, str]]:
-    cache_key = ("langsearch", query, int(top))
-    cached = SEARCH_CACHE.get(cache_key)
-    if cached is not None:
-        return cached
-
-    if not settings.langsearch_api_key:
-        return []
-
-    url = "https://api.langsearch.com/v1/web-search"
+def _langsearch_request(query: str, top: int) -> dict[str, Any]:
     headers = {
         "Authorization": f"Bearer {settings.langsearch_api_key}",
         "Content-Type": "application/json",
-        "User-Agent": "HealthFactAI/1.0 (+verified-search)",
     }
     payload = {
         "query": query,
@@ -79,13 +59,10 @@ def langsearch_web_search(query: str, top: int) -> list[dict[str, str]]:
         "summary": False,
         "count": int(top),
     }
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=settings.request_timeout_seconds)
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception:
-        return []
+    return {"headers": headers, "json": payload}
 
+
+def _parse_langsearch(data: dict[str, Any]) -> list[dict[str, str]]:
     # The docs indicate a structure with data.webPages.value similar to Bing
     items = (((data or {}).get("data") or {}).get("webPages") or {}).get("value") or []
     results: list[dict[str, str]] = []
@@ -95,16 +72,168 @@ def langsearch_web_search(query: str, top: int) -> list[dict[str, str]]:
         if not u or not is_allowed(u):
             continue
         results.append({"title": t, "url": u})
-
-    SEARCH_CACHE.set(cache_key, results)
     return results
 
 
+def _fetch_bing(query: str, top: int) -> list[dict[str, str]] | None:
+    try:
+        resp = get_client().get(BING_URL, **_bing_request(query, top))
+        resp.raise_for_status()
+        data: dict[str, Any] = resp.json()
+    except Exception:
+        return None
+    return _parse_bing(data)
+
+
+async def _fetch_bing_async(query: str, top: int) -> list[dict[str, str]] | None:
+    try:
+        resp = await get_async_client().get(BING_URL, **_bing_request(query, top))
+        resp.raise_for_status()
+        data: dict[str, Any] = resp.json()
+    except Exception:
+        return None
+    return _parse_bing(data)
+
+
+def _bing_search(query: str, top: int) -> list[dict[str, str]]:
+    if not settings.bing_api_key:
+        return []
+    cache_key = ("bing", query, int(top))
+    return SEARCH_CACHE.get_or_compute(cache_key, lambda: _fetch_bing(query, top)) or []
+
+
+async def _bing_search_async(query: str, top: int) -> list[dict[str, str]]:
+    if not settings.bing_api_key:
+        return []
+    cache_key = ("bing", query, int(top))
+    return await SEARCH_CACHE.aget_or_compute(cache_key, lambda: _fetch_bing_async(query, top)) or []
+
+
+def _fetch_langsearch(query: str, top: int) -> list[dict[str, str]] | None:
+    try:
+        resp = get_client().post(LANGSEARCH_URL, **_langsearch_request(query, top))
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception:
+        return None
+    return _parse_langsearch(data)
+
+
+async def _fetch_langsearch_async(query: str, top: int) -> list[dict[str, str]] | None:
+    try:
+        resp = await get_async_client().post(LANGSEARCH_URL, **_langsearch_request(query, top))
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception:
+        return None
+    return _parse_langsearch(data)
+
+
+def langsearch_web_search(query: str, top: int) -> list[dict[str, str]]:
+    if not settings.langsearch_api_key:
+        return []
+    cache_key = ("langsearch", query, int(top))
+    return SEARCH_CACHE.get_or_compute(cache_key, lambda: _fetch_langsearch(query, top)) or []
+
+
+async def langsearch_web_search_async(query: str, top: int) -> list[dict[str, str]]:
+    if not settings.langsearch_api_key:
+        return []
+    cache_key = ("langsearch", query, int(top))
+    return await SEARCH_CACHE.aget_or_compute(cache_key, lambda: _fetch_langsearch_async(query, top)) or []
+
+
+def _task_results(task: asyncio.Future | None) -> list[dict[str, str]]:
+    if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+        return []
+    return task.result() or []
+
+
+def _merge_results(result_sets: list[list[dict[str, str]]], top: int) -> list[dict[str, str]]:
+    # Earlier sets win on duplicate URLs, so provider preference is preserved
+    seen: set[str] = set()
+    merged: list[dict[str, str]] = []
+    for results in result_sets:
+        for item in results:
+            url = item.get("url") or ""
+            key = url.rstrip("/").lower()
+            if not url or key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+    return merged[: int(top)]
+
+
+async def verified_search_async(
+    query: str,
+    top: int,
+    mode: str | None = None,
+    hedge_delay: float | None = None,
+    deadline: float | None = None,
+) -> list[dict[str, str]]:
+    """Query LangSearch and Bing concurrently.
+
+    ``mode="first"`` returns the first non-empty result set (LangSearch preferred on ties),
+    ``mode="merge"`` waits for both providers and dedupes by URL. Bing is only started once
+    ``hedge_delay`` seconds pass without a usable LangSearch answer. Whatever has arrived
+    when ``deadline`` expires is returned.
+    """
+    mode = mode or settings.search_fanout_mode
+    if hedge_delay is None:
+        hedge_delay = settings.search_hedge_delay_ms / 1000
+    if deadline is None:
+        deadline = settings.search_fanout_deadline_seconds
+    key = ("verified", mode, query, int(top), hedge_delay, deadline)
+    return await SEARCH_FLIGHTS.do_async(key, _fanout_search, query, top, mode, hedge_delay, deadline)
+
+
+async def _fanout_search(query: str, top: int, mode: str, hedge_delay: float, deadline: float) -> list[dict[str, str]]:
+    if mode == "serial":
+        results = await langsearch_web_search_async(query, top)
+        if results:
+            return results
+        return await _bing_search_async(query, top)
+
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + deadline
+    primary = asyncio.ensure_future(langsearch_web_search_async(query, top))
+    secondary: asyncio.Future | None = None
+    try:
+        if hedge_delay > 0:
+            await asyncio.wait({primary}, timeout=min(hedge_delay, deadline))
+            if mode == "first" and _task_results(primary):
+                return _task_results(primary)
+
+        if loop.time() < stop_at:
+            secondary = asyncio.ensure_future(_bing_search_async(query, top))
+
+        pending = {task for task in (primary, secondary) if task is not None and not task.done()}
+        while pending:
+            remaining = stop_at - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if mode == "first":
+                for task in (primary, secondary):
+                    if task in done and _task_results(task):
+                        return _task_results(task)
+
+        return _merge_results([_task_results(primary), _task_results(secondary)], top)
+    finally:
+        for task in (primary, secondary):
+            if task is not None and not task.done():
+                task.cancel()
+
+
 def verified_search(query: str, top: int) -> list[dict[str, str]]:
+    if settings.search_fanout_mode != "serial":
+        return run_sync(verified_search_async(query, top))
+    return SEARCH_FLIGHTS.do(("verified", "serial", query, int(top)), _serial_search, query, top)
+
+
+def _serial_search(query: str, top: int) -> list[dict[str, str]]:
     # Prefer LangSearch if configured; fallback to Bing
     results = langsearch_web_search(query, top)
     if results:
         return results
     return _bing_search(query, top)
-
-
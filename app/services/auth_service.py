@@ -1,30 +1,46 @@
 """
 Authentication service with business logic.
 """
+import hashlib
+import time
 from typing import Optional, Tuple
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 
+from app.cache import TTLCache
 from app.core.config import settings
-from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.core.database import DatabaseUnavailable
+from app.models.user import Principal, User
+from app.password_hashing import PasswordHasher, password_hasher
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
 from app.schemas.auth import UserCreate, UserLogin, TokenData
 
+# Tokens that already passed signature and claim checks, keyed by SHA-256 digest
+# (fixed-size keys, raw tokens are never kept). Each entry lives until its token's exp.
+TOKEN_CACHE = TTLCache(
+    maxsize=max(1, settings.token_cache_max_entries),
+    ttl_seconds=settings.access_token_expire_minutes * 60,
+    name="verified_tokens",
+)
+
 class AuthService:
     """Service for authentication operations."""
     
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository,
+                 async_user_repository: Optional[AsyncUserRepository] = None,
+                 hasher: Optional[PasswordHasher] = None):
         self.user_repository = user_repository
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.async_user_repository = async_user_repository or AsyncUserRepository()
+        # bcrypt runs on the hasher's own bounded pool; raises HasherSaturated when full
+        self.hasher = hasher or password_hasher
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash."""
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return self.hasher.verify_and_update(plain_password, hashed_password)[0]
     
     def get_password_hash(self, password: str) -> str:
         """Hash a password."""
-        return self.pwd_context.hash(password)
+        return self.hasher.hash(password)
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token."""
@@ -39,7 +55,19 @@ class AuthService:
         return encoded_jwt
     
     def verify_token(self, token: str) -> Optional[TokenData]:
-        """Verify and decode a JWT token."""
+        """Verify and decode a JWT token.
+        
+        A token seen before is answered from TOKEN_CACHE until its ``exp`` without
+        re-checking the signature; the cache key is a digest of the whole token, so
+        only the exact bytes that were verified can hit it.
+        """
+        use_cache = settings.token_cache_max_entries > 0
+        digest = hashlib.sha256(token.encode()).digest() if use_cache else None
+        if use_cache:
+            cached = TOKEN_CACHE.get(digest)
+            if cached is not None:
+                return cached
+        
         try:
             payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
             username: str = payload.get("sub")
@@ -49,25 +77,29 @@ class AuthService:
             if username is None or user_id is None:
                 return None
             
-            return TokenData(username=username, user_id=user_id, email=email)
+            token_data = TokenData(username=username, user_id=user_id, email=email)
         except JWTError:
             return None
+        
+        if use_cache:
+            exp = payload.get("exp")
+            ttl = float(exp) - time.time() if isinstance(exp, (int, float)) else None
+            if ttl is None or ttl > 0:
+                TOKEN_CACHE.set(digest, token_data, ttl_seconds=ttl)
+        return token_data
     
-    def register_user(self, user_create: UserCreate) -> Tuple[bool, str, Optional[User]]:
+    async def register_user_async(self, user_create: UserCreate) -> Tuple[bool, str, Optional[User]]:
         """
         Register a new user.
         Returns: (success, message, user)
         """
-        # Check if username already exists
-        if self.user_repository.exists_username(user_create.username):
+        if await self.async_user_repository.exists_username(user_create.username):
             return False, "Username already exists", None
         
-        # Check if email already exists (if provided)
-        if user_create.email and self.user_repository.exists_email(user_create.email):
+        if user_create.email and await self.async_user_repository.exists_email(user_create.email):
             return False, "Email already exists", None
         
-        # Create new user
-        hashed_password = self.get_password_hash(user_create.password)
+        hashed_password = await self.hasher.hash_async(user_create.password)
         user = User(
             username=user_create.username,
             password=hashed_password,
@@ -80,31 +112,37 @@ class AuthService:
         )
         
         try:
-            created_user = self.user_repository.create(user)
+            created_user = await self.async_user_repository.create(user)
             return True, "User registered successfully", created_user
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             return False, f"Registration failed: {str(e)}", None
     
-    def authenticate_user(self, user_login: UserLogin) -> Tuple[bool, str, Optional[User]]:
+    async def authenticate_user_async(self, user_login: UserLogin) -> Tuple[bool, str, Optional[User]]:
         """
         Authenticate a user login.
         Returns: (success, message, user)
         """
-        # Get user by username or email
-        user = self.user_repository.get_by_username_or_email(user_login.username)
+        user = await self.async_user_repository.get_by_username_or_email(user_login.username)
         
         if not user:
             return False, "Invalid credentials", None
         
-        if not self.verify_password(user_login.password, user.password):
+        verified, new_hash = await self.hasher.verify_and_update_async(user_login.password, user.password)
+        if not verified:
             return False, "Invalid credentials", None
         
+        if new_hash:
+            await self.async_user_repository.update_password(user.id, new_hash)
+            user.password = new_hash
+        
         return True, "Authentication successful", user
     
-    def get_current_user(self, token: str) -> Optional[User]:
-        """Get current user from token."""
+    async def get_current_principal_async(self, token: str) -> Optional[Principal]:
+        """Identity behind a token (cached, without progress data); enough for auth checks."""
         token_data = self.verify_token(token)
         if not token_data:
             return None
         
-        return self.user_repository.get_by_id(token_data.user_id)
+        return await self.async_user_repository.get_principal(token_data.user_id)
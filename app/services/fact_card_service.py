@@ -1,100 +1,183 @@
 """
 Fact Card service with business logic.
 """
-from typing import List, Optional, Dict, Any
+import asyncio
+import re
+from typing import List, Optional, Dict, Any, Tuple
+from app.core.database import DatabaseUnavailable
 from app.models.fact_card import FactCard
-from app.repositories.fact_card_repository import FactCardRepository
-from app.schemas.health_categories import classify_health_claim
+from app.repositories.fact_card_repository import AsyncFactCardRepository, FactCardRepository
+from app.schemas.health_categories import HealthCategory, classify_health_claim
+from app.write_behind import WriteBehindBuffer
 
 class FactCardService:
     """Service for fact card operations."""
     
-    def __init__(self, fact_card_repository: FactCardRepository):
+    def __init__(self, fact_card_repository: FactCardRepository,
+                 async_fact_card_repository: Optional[AsyncFactCardRepository] = None,
+                 write_buffer: Optional[WriteBehindBuffer] = None):
         self.fact_card_repository = fact_card_repository
+        self.async_fact_card_repository = async_fact_card_repository or AsyncFactCardRepository()
+        # When set, automatic fact cards from searches are queued and inserted in batches
+        self.write_buffer = write_buffer
+    
+    def _pending_cards(self, user_id: int, category: Optional[str] = None) -> List[FactCard]:
+        """Cards of the user still queued in the write buffer, newest first."""
+        if self.write_buffer is None:
+            return []
+        return [card for card in reversed(self.write_buffer.pending_cards(user_id))
+                if not category or category.lower() == "all" or card.category == category]
+    
+    @staticmethod
+    def _pending_matches(fact_card: FactCard, search_term: str, full_text: bool) -> bool:
+        """Whether a queued card would match ``search_term`` once inserted (approximately)."""
+        text = " ".join((fact_card.title, fact_card.summary, fact_card.search_query)).lower()
+        if not full_text:
+            return search_term.lower() in text
+        words = re.findall(r"\w+", search_term.lower())
+        return bool(words) and all(word in text for word in words)
+    
+    @staticmethod
+    def _build_fact_card(user_id: int, search_query: str, search_result: Dict[str, Any],
+                         category: HealthCategory) -> FactCard:
+        # Override the category in search result with our classification
+        search_result["category"] = category.value
+        
+        # Create fact card from search result
+        return FactCard.from_search_result(user_id, search_query, search_result)
+    
+    @staticmethod
+    def _with_all(categories: List[str]) -> List[str]:
+        # Always include "All" at the beginning
+        if categories and "All" not in categories:
+            categories.insert(0, "All")
+        elif not categories:
+            categories = ["All"]
+        return categories
     
     def save_search_result(self, user_id: int, search_query: str, 
-                          search_result: Dict[str, Any]) -> Optional[FactCard]:
-        """Save a search result as a fact card."""
+                          search_result: Dict[str, Any],
+                          category: Optional[HealthCategory] = None) -> Optional[FactCard]:
+        """Save a search result as a fact card.
+        
+        ``category`` is the already classified search query; without it the query is
+        classified here (an OpenAI call), so callers holding a transaction should pass it.
+        """
         try:
             # Classify the search query to ensure proper categorization
-            category = classify_health_claim(search_query)
-            
-            # Override the category in search result with our classification
-            search_result["category"] = category.value
+            if category is None:
+                category = classify_health_claim(search_query)
+            fact_card = self._build_fact_card(user_id, search_query, search_result, category)
             
-            # Create fact card from search result
-            fact_card = FactCard.from_search_result(user_id, search_query, search_result)
+            if self.write_buffer is not None:
+                # Inserted by the next batch flush; the card has no id until then
+                self.write_buffer.add_fact_card(fact_card)
+                return fact_card
             
-            # Save to database
-            return self.fact_card_repository.create(fact_card)
+            # Save to database; a savepoint when the caller already holds a transaction,
+            # so a failed insert can be reported without aborting the caller's writes
+            with self.fact_card_repository.transaction():
+                return self.fact_card_repository.create(fact_card)
             
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             print(f"Error saving search result: {str(e)}")
             return None
     
-    def get_user_fact_cards(self, user_id: int, category: str = "All", 
-                           limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get fact cards for a user, optionally filtered by category."""
+    # Used by the ``async def`` fact card routes (save_search_result above serves /search/verify)
+    
+    async def save_search_result_async(self, user_id: int, search_query: str,
+                                       search_result: Dict[str, Any]) -> Optional[FactCard]:
+        """Save a search result as a fact card."""
         try:
-            if category.lower() == "all":
-                fact_cards = self.fact_card_repository.get_by_user_id(user_id, limit, offset)
-            else:
-                fact_cards = self.fact_card_repository.get_by_user_and_category(
-                    user_id, category, limit, offset
-                )
+            # Classified before the transaction opens, off the event loop
+            category = await asyncio.to_thread(classify_health_claim, search_query)
+            fact_card = self._build_fact_card(user_id, search_query, search_result, category)
+            async with self.async_fact_card_repository.transaction():
+                return await self.async_fact_card_repository.create(fact_card)
             
-            # Convert to fact card format for frontend
-            return [fact_card.to_fact_card_format() for fact_card in fact_cards]
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            print(f"Error saving search result: {str(e)}")
+            return None
+    
+    async def get_user_fact_cards_page_async(self, user_id: int, category: str = "All", limit: int = 50,
+                                             cursor: Optional[str] = None,
+                                             offset: int = 0) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[int]]:
+        """One page of a user's fact cards, the cursor of the next page (None on the last)
+        and the total number of cards in the category (None on ``cursor`` pages).
+        
+        Raises ValueError for a malformed cursor.
+        """
+        try:
+            # Queued cards are the newest, so they lead the first page (read-your-writes);
+            # the rest of it comes from the database, which the cursor keeps pointing into
+            pending = self._pending_cards(user_id, category)
+            leading = pending if cursor is None and not offset else []
+            fact_cards, next_cursor, total = await self.async_fact_card_repository.get_page(
+                user_id, category, max(1, limit - len(leading)), cursor, offset
+            )
+            fact_cards = leading + fact_cards
+            if total is not None:
+                total += len(pending)
+            return [fact_card.to_fact_card_format() for fact_card in fact_cards], next_cursor, total
             
+        except (ValueError, DatabaseUnavailable):
+            raise
         except Exception as e:
             print(f"Error getting user fact cards: {e}")
-            return []
+            return [], None, None if cursor else 0
     
-    def get_user_categories(self, user_id: int) -> List[str]:
+    async def get_user_categories_async(self, user_id: int) -> List[str]:
         """Get all categories that have fact cards for a user."""
         try:
-            categories = self.fact_card_repository.get_categories_for_user(user_id)
-            # Always include "All" at the beginning
-            if categories and "All" not in categories:
-                categories.insert(0, "All")
-            elif not categories:
-                categories = ["All"]
-            return categories
+            categories = await self.async_fact_card_repository.get_categories_for_user(user_id)
+            pending = {fact_card.category for fact_card in self._pending_cards(user_id)}
+            if not pending.issubset(categories):
+                categories = sorted(pending.union(categories))
+            return self._with_all(categories)
             
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             print(f"Error getting user categories: {e}")
             return ["All"]
     
-    def search_fact_cards(self, user_id: int, search_term: str, 
-                         category: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """Search user's fact cards."""
+    async def search_fact_cards_async(self, user_id: int, search_term: str,
+                                      category: Optional[str] = None, limit: int = 50,
+                                      full_text: bool = True) -> List[Dict[str, Any]]:
+        """Search user's fact cards (most relevant first with ``full_text``)."""
         try:
-            fact_cards = self.fact_card_repository.search_fact_cards(
-                user_id, search_term, category, limit
+            fact_cards = await self.async_fact_card_repository.search_fact_cards(
+                user_id, search_term, category, limit, full_text
             )
-            return [fact_card.to_fact_card_format() for fact_card in fact_cards]
+            pending = [fact_card for fact_card in self._pending_cards(user_id, category)
+                       if self._pending_matches(fact_card, search_term, full_text)]
+            return [fact_card.to_fact_card_format() for fact_card in (pending + fact_cards)[:limit]]
             
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             print(f"Error searching fact cards: {e}")
             return []
     
-    def get_fact_card_stats(self, user_id: int) -> Dict[str, Any]:
+    async def get_fact_card_stats_async(self, user_id: int) -> Dict[str, Any]:
         """Get statistics about user's fact cards."""
         try:
-            total_cards = self.fact_card_repository.count_by_user(user_id)
-            categories = self.fact_card_repository.get_categories_for_user(user_id)
-            
-            category_counts = {}
-            for category in categories:
-                count = self.fact_card_repository.count_by_user_and_category(user_id, category)
-                category_counts[category] = count
+            category_counts = await self.async_fact_card_repository.count_by_category(user_id)
+            for fact_card in self._pending_cards(user_id):
+                category_counts[fact_card.category] = category_counts.get(fact_card.category, 0) + 1
             
             return {
-                "total_fact_cards": total_cards,
-                "categories": categories,
+                "total_fact_cards": sum(category_counts.values()),
+                "categories": list(category_counts),
                 "category_counts": category_counts
             }
             
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             print(f"Error getting fact card stats: {str(e)}")
             return {
@@ -103,16 +186,17 @@ class FactCardService:
                 "category_counts": {}
             }
     
-    def delete_fact_card(self, user_id: int, fact_card_id: int) -> bool:
+    async def delete_fact_card_async(self, user_id: int, fact_card_id: int) -> bool:
         """Delete a fact card (with user ownership verification)."""
         try:
-            # First verify the fact card belongs to the user
-            fact_card = self.fact_card_repository.get_by_id(fact_card_id)
+            fact_card = await self.async_fact_card_repository.get_by_id(fact_card_id)
             if not fact_card or fact_card.user_id != user_id:
                 return False
             
-            return self.fact_card_repository.delete(fact_card_id)
+            return await self.async_fact_card_repository.delete(fact_card_id)
             
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             print(f"Error deleting fact card: {e}")
             return False
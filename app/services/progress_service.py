@@ -1,19 +1,52 @@
 """
 Progress tracking service with business logic.
 """
-from typing import Dict, Any, Optional, List
-from datetime import datetime, date, timedelta
-import json
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import date, datetime, timedelta, timezone
 
-from app.models.user import User
+from app.models.user_fact import UserFact
 from app.repositories.user_repository import UserRepository
+from app.repositories.user_fact_repository import QUIZ_ANSWERS_ACTIVITY, UserFactRepository
 from app.schemas.health_categories import HealthCategory, classify_health_claim
+from app.write_behind import WriteBehindBuffer
+
+_VALID_CATEGORIES = frozenset(cat.value for cat in HealthCategory)
+
+
+def _chart_category(category: str) -> Optional[str]:
+    """Category as shown in charts; None for quiz-related categories."""
+    if category == "Quiz" or category == "quiz_answer":
+        return None
+    return category if category in _VALID_CATEGORIES else "General"
+
+
+def _utc_today() -> date:
+    """Today in UTC: facts carry naive UTC timestamps, so every day bucket is a UTC day."""
+    return datetime.now(timezone.utc).date()
+
+
+def _advance_streak(current: int, longest: int, last_activity: Optional[str],
+                    today: date) -> Tuple[int, int, str]:
+    """Streak after activity on ``today``; same rules as the SQL in BUMP_USER_ACTIVITY."""
+    last = str(last_activity)[:10] if last_activity else None
+    if last == today.isoformat():
+        new_current = current if current > 0 else 1
+    elif last == (today - timedelta(days=1)).isoformat():
+        new_current = current + 1
+    else:
+        new_current = 1
+    return new_current, max(longest, new_current), today.isoformat()
 
 class ProgressService:
     """Service for user progress tracking."""
     
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository,
+                 user_fact_repository: Optional[UserFactRepository] = None,
+                 write_buffer: Optional[WriteBehindBuffer] = None):
         self.user_repository = user_repository
+        self.user_fact_repository = user_fact_repository or UserFactRepository()
+        # When set, activity is queued and flushed in batches; reads overlay what is queued
+        self.write_buffer = write_buffer
     
     def get_user_progress(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get comprehensive user progress data."""
@@ -22,10 +55,10 @@ class ProgressService:
             return None
         
         # Get category breakdown
-        categories = user.get_category_breakdown()
+        categories = self._category_breakdown(user_id)
         
         # Calculate facts this week
-        facts_this_week = self._count_facts_this_week(user.facts_as_list)
+        facts_this_week = self._count_facts_this_week(user_id)
         
         # Convert last_activity_date to string if it's a datetime object
         last_activity = user.last_activity_date
@@ -36,7 +69,7 @@ class ProgressService:
             # It's a datetime object, get date part and convert to string
             last_activity = last_activity.date().strftime("%Y-%m-%d")
             
-        return {
+        progress = {
             "total_facts": user.total_facts_count,
             "current_streak": user.current_streak,
             "longest_streak": user.longest_streak,
@@ -44,145 +77,157 @@ class ProgressService:
             "last_activity": last_activity,
             "facts_this_week": facts_this_week
         }
+        return self._with_pending(progress, self._pending(user_id))
     
-    def add_search_fact(self, user_id: int, claim: str, source_url: Optional[str] = None) -> bool:
-        """Add a fact from search activity."""
-        user = self.user_repository.get_by_id(user_id)
-        if not user:
-            return False
+    def _pending(self, user_id: int) -> List[Tuple[Optional[UserFact], date]]:
+        """Activity of the user still queued in the write buffer."""
+        return self.write_buffer.pending_progress(user_id) if self.write_buffer else []
+    
+    def _with_pending(self, progress: Dict[str, Any],
+                      pending: List[Tuple[Optional[UserFact], date]]) -> Dict[str, Any]:
+        """Progress as it will be once queued activity is flushed (read-your-writes)."""
+        if not pending:
+            return progress
+        
+        week_ago = _utc_today() - timedelta(days=6)
+        current, longest = progress["current_streak"] or 0, progress["longest_streak"] or 0
+        last_activity = progress["last_activity"]
+        for day in sorted({day for _, day in pending}):
+            current, longest, last_activity = _advance_streak(current, longest, last_activity, day)
+        
+        categories = dict(progress["categories"])
+        facts = [(fact, day) for fact, day in pending if fact is not None]
+        for fact, _ in facts:
+            category = _chart_category(fact.category)
+            if category is not None:
+                categories[category] = categories.get(category, 0) + 1
         
+        return {
+            **progress,
+            "total_facts": progress["total_facts"] + len(facts),
+            "current_streak": current,
+            "longest_streak": longest,
+            "categories": categories,
+            "last_activity": last_activity,
+            "facts_this_week": progress["facts_this_week"] + sum(1 for _, day in facts if day >= week_ago)
+        }
+    
+    def add_search_fact(self, user_id: int, claim: str, source_url: Optional[str] = None,
+                        category: Optional[HealthCategory] = None) -> bool:
+        """Add a fact from search activity; ``category`` skips classifying the claim again."""
         # Classify the claim
-        category = classify_health_claim(claim)
+        if category is None:
+            category = classify_health_claim(claim)
         
-        # Add the fact
-        user.add_fact(
+        fact = UserFact.create(
+            user_id,
             content=claim,
             category=category.value,
             source_url=source_url,
             fact_type="search"
         )
-        
-        # Update streak
-        self._update_streak(user)
-        
-        # Save to database
-        return self._save_user_progress(user)
+        return self._apply_progress(user_id, fact)
     
     def add_quiz_fact(self, user_id: int, claim: str, source_url: Optional[str] = None, 
                      questions_count: int = 0) -> bool:
         """Add a fact from quiz generation."""
-        user = self.user_repository.get_by_id(user_id)
-        if not user:
-            return False
-        
         # Classify the claim
         category = classify_health_claim(claim)
         
-        # Add the fact
-        user.add_fact(
+        fact = UserFact.create(
+            user_id,
             content=claim,
             category=category.value,
             source_url=source_url,
             fact_type="quiz",
             questions=questions_count
         )
-        
-        # Update streak
-        self._update_streak(user)
-        
-        # Save to database
-        return self._save_user_progress(user)
+        return self._apply_progress(user_id, fact)
+    
+    def get_facts(self, user_id: int, types: Optional[List[str]] = None,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent learned facts (newest first), optionally of some types only."""
+        facts = self.user_fact_repository.get_by_user(user_id, types, limit)
+        queued = [fact for fact, _ in reversed(self._pending(user_id))
+                  if fact is not None and (not types or fact.type in types)]
+        return [fact.to_dict() for fact in (queued + facts)[:limit]]
     
     def add_quiz_answers(self, user_id: int, answers: List[str], correct_answers: List[str]) -> bool:
         """Add facts for each quiz answer."""
-        user = self.user_repository.get_by_id(user_id)
-        if not user:
-            return False
-        
         # Add fact for each answer - but don't create individual facts per answer
         # Instead, just update the streak without adding quiz answer facts
         # This prevents "Quiz" category from appearing in charts
         
         # Only update streak (once per quiz session)
-        self._update_streak(user)
-        
-        # Save to database
-        return self._save_user_progress(user)
-    
-    def _update_streak(self, user: User) -> None:
-        """Update user's daily streak."""
-        from datetime import datetime, date, timedelta
-        
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-        
-        current_streak = user.current_streak or 0
-        longest_streak = user.longest_streak or 0
-        
-        # Parse last activity date
-        last_activity = None
-        if user.last_activity_date:
-            try:
-                # Handle both string and datetime objects
-                if isinstance(user.last_activity_date, str):
-                    last_activity = datetime.strptime(user.last_activity_date, "%Y-%m-%d").date()
-                else:
-                    # It's already a datetime object
-                    last_activity = user.last_activity_date.date()
-            except (ValueError, AttributeError):
-                pass
-        
-        if last_activity is None:
-            # First time activity
-            new_current = 1
-        elif last_activity == today:
-            # Activity already today, maintain streak
-            new_current = current_streak or 1
-        elif last_activity == yesterday:
-            # Activity yesterday, increment streak
-            new_current = current_streak + 1
-        else:
-            # Gap in activity, reset streak
-            new_current = 1
-        
-        new_longest = max(longest_streak, new_current)
-        new_last_activity = today.strftime("%Y-%m-%d")
-        
-        user.current_streak = new_current
-        user.longest_streak = new_longest
-        user.last_activity_date = new_last_activity
+        return self._apply_progress(user_id, None)
     
-    def _save_user_progress(self, user: User) -> bool:
-        """Save user progress to database."""
+    def _apply_progress(self, user_id: int, fact: Optional[UserFact]) -> bool:
+        """Record a fact (or a bare activity) and update counters/streak atomically.
+        
+        Counter increments and the streak transition are computed by the database
+        from the stored row, so concurrent activity of the same user cannot lose
+        updates and nothing is read back first. Inside an outer transaction this
+        becomes a savepoint.
+        """
+        if self.write_buffer is not None:
+            self.write_buffer.add_progress(user_id, fact, _utc_today())
+            return True
         try:
-            return self.user_repository.update_progress(
-                user.id,
-                user.facts_learned,
-                user.total_facts_count,
-                user.current_streak,
-                user.longest_streak,
-                user.last_activity_date
-            )
+            with self.user_repository.transaction():
+                return self.user_fact_repository.record_progress(user_id, fact, _utc_today())
         except Exception as e:
             print(f"Error saving user progress: {e}")
             return False
     
-    def _count_facts_this_week(self, facts: List[Dict[str, Any]]) -> int:
-        """Count facts learned in the past week."""
-        today = date.today()
-        week_ago = today - timedelta(days=6)
-        count = 0
+    def _category_breakdown(self, user_id: int) -> Dict[str, int]:
+        """Count of facts by category, filtered to only show health categories."""
+        categories: Dict[str, int] = {}
+        
+        for category, count in self.user_fact_repository.count_by_category(user_id).items():
+            # Filter out non-health categories like "Quiz" and map to valid categories
+            category = _chart_category(category)
+            if category is None:
+                continue  # Skip quiz-related categories
+            
+            categories[category] = categories.get(category, 0) + count
+        
+        return categories
+    
+    def get_timeseries(self, user_id: int, days: int = 7) -> Dict[str, Any]:
+        """Per-day activity for the last ``days`` days (today included), from the daily rollups."""
+        today = _utc_today()
+        start = today - timedelta(days=days - 1)
+        series = {
+            (start + timedelta(days=i)).isoformat(): {"facts": 0, "by_type": {}, "by_category": {}}
+            for i in range(days)
+        }
         
-        for fact in facts:
-            learned_at = fact.get("learned_at")
-            if not learned_at:
+        buckets = self.user_fact_repository.daily_activity(user_id, start) + [
+            {"day": day.isoformat(), "activity_type": fact.type if fact else QUIZ_ANSWERS_ACTIVITY,
+             "category": fact.category if fact else "", "count": 1}
+            for fact, day in self._pending(user_id)
+        ]
+        for bucket in buckets:
+            day = series.get(bucket["day"])
+            if day is None:
+                continue  # Buckets dated in the future (clock skew)
+            activity_type, count = bucket["activity_type"], bucket["count"]
+            day["by_type"][activity_type] = day["by_type"].get(activity_type, 0) + count
+            if activity_type == QUIZ_ANSWERS_ACTIVITY:
                 continue
-            
-            try:
-                fact_date = datetime.strptime(learned_at, "%Y-%m-%dT%H:%M:%SZ").date()
-                if week_ago <= fact_date <= today:
-                    count += 1
-            except (ValueError, TypeError):
+            day["facts"] += count
+            category = _chart_category(bucket["category"])
+            if category is None:
                 continue
+            day["by_category"][category] = day["by_category"].get(category, 0) + count
         
-        return count
+        return {
+            "days": days,
+            "total_facts": sum(day["facts"] for day in series.values()),
+            "series": [{"date": key, **value} for key, value in series.items()]
+        }
+    
+    def _count_facts_this_week(self, user_id: int) -> int:
+        """Count facts learned in the past week."""
+        week_ago = _utc_today() - timedelta(days=6)
+        return self.user_fact_repository.count_since(user_id, week_ago)
@@ -218,21 +218,6 @@ class QuizService:
     
     def get_quiz_history(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get user's quiz history."""
-        progress = self.progress_service.get_user_progress(user_id)
-        if not progress:
-            return []
-        
-        # Get user facts and filter for quiz type
-        user = self.progress_service.user_repository.get_by_id(user_id)
-        if not user:
-            return []
-        
-        facts = user.facts_as_list
-        quiz_facts = [
-            fact for fact in facts 
-            if fact.get("type") in ["quiz", "quiz_answer"]
-        ]
-        
-        # Sort by learned_at descending and limit
-        quiz_facts.sort(key=lambda x: x.get("learned_at", ""), reverse=True)
-        return quiz_facts[:limit]
+        # Newest facts of the matching type, read from the indexed user_facts table
+        # (an unknown user simply has none)
+        return self.progress_service.get_facts(user_id, ["quiz", "quiz_answer"], limit)
@@ -2,92 +2,179 @@
 Search service integrating existing search functionality with progress tracking.
 """
 from typing import Dict, Any, Optional, List
-import json
+import asyncio
 
 from app.core.config import settings
+from app.schemas.health_categories import HealthCategory
 from app.services.progress_service import ProgressService
-from app.search import verified_search
-from app.extract import fetch_main_text
+from app.concurrency import SingleFlight, run_sync
+from app.search import verified_search, verified_search_async
+from app.extract import fetch_pages_async, fetch_pages_timed_async
 from app.retrieve import chunk, bm25_rank, embed_rerank
 from app.utils import build_query
 
+# Concurrent verifies of the same claim share one search/fetch/rank pass
+_verify_flights = SingleFlight()
+
 class SearchService:
     """Service for health fact search and verification."""
     
     def __init__(self, progress_service: ProgressService):
         self.progress_service = progress_service
     
-    def search_verified_claim(self, claim: str, user_id: int) -> Dict[str, Any]:
-        """
-        Search and verify a health claim using existing search infrastructure.
-        """
+    def verify_claim(self, claim: str) -> Dict[str, Any]:
+        """Verify a claim without recording anything for the user (no database work)."""
+        key = " ".join(claim.split())
+        result = dict(_verify_flights.do(key, self._verify_claim, claim))
+        result["claim"] = claim
+        return result
+    
+    def record_search(self, user_id: int, claim: str, result: Dict[str, Any],
+                      category: Optional[HealthCategory] = None) -> bool:
+        """Track progress for a verified claim."""
+        source_url = result["sources"][0]["url"] if result["sources"] else None
+        return self.progress_service.add_search_fact(user_id, claim, source_url, category)
+    
+    def _verify_claim(self, claim: str) -> Dict[str, Any]:
+        """Run the user-independent search, fetch and ranking work for a claim."""
         # Use existing search functionality
         query = build_query(claim, settings.allowed_domains)
         search_results = verified_search(query, top=6)
         
+        # Fetch and analyze content from the top 4 results concurrently,
+        # keeping whatever pages finish within the fetch deadline
+        urls = [item["url"] for item in search_results[:4]]
+        pages = run_sync(fetch_pages_async(urls, deadline=settings.fetch_deadline_seconds)) if urls else []
+        return self._build_result(claim, search_results, pages)
+    
+    async def verify_claims_batch_async(self, claims: List[str],
+                                        deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Verify many claims in one pass, sharing search, page fetch and chunking work.
+        Results are returned in the order of ``claims``. Batch verification is a
+        read-only re-check: it records no progress and saves no fact cards.
+        If the batch takes longer than ``deadline`` seconds, every claim is
+        reported with error="timeout".
+        """
+        try:
+            return await asyncio.wait_for(self._verify_claims_batch_async(claims), deadline)
+        except asyncio.TimeoutError:
+            return [self._timed_out_result(claim, []) for claim in claims]
+    
+    async def _verify_claims_batch_async(self, claims: List[str]) -> List[Dict[str, Any]]:
+        unique_claims = list(dict.fromkeys(" ".join(c.split()) for c in claims))
+        semaphore = asyncio.Semaphore(settings.batch_verify_concurrency)
+        
+        async def search(claim: str) -> List[Dict[str, str]]:
+            async with semaphore:
+                query = build_query(claim, settings.allowed_domains)
+                return await verified_search_async(query, top=6)
+        
+        search_results = await asyncio.gather(*(search(c) for c in unique_claims))
+        
+        # Every distinct URL is fetched once, however many claims cite it
+        urls = list(dict.fromkeys(item["url"] for results in search_results for item in results[:4]))
+        pages, timed_out = await fetch_pages_timed_async(
+            urls,
+            timeout=settings.batch_fetch_timeout_seconds,
+            concurrency=settings.batch_verify_concurrency,
+        )
+        page_by_url = dict(zip(urls, pages))
+        
+        def build_one(claim: str, results: List[Dict[str, str]],
+                      passage_cache: Dict[str, List[str]]) -> Dict[str, Any]:
+            claim_urls = [item["url"] for item in results[:4]]
+            claim_pages = [page_by_url.get(url) for url in claim_urls]
+            if not any(page and page.get("text") for page in claim_pages) and timed_out.intersection(claim_urls):
+                return self._timed_out_result(claim, results)
+            return self._build_result(claim, results, claim_pages, passage_cache)
+        
+        def build_all() -> Dict[str, Dict[str, Any]]:
+            passage_cache: Dict[str, List[str]] = {}
+            return {
+                claim: build_one(claim, results, passage_cache)
+                for claim, results in zip(unique_claims, search_results)
+            }
+        
+        # Ranking is CPU-bound; keep it off the shared event loop
+        by_claim = await asyncio.to_thread(build_all)
+        return [{**by_claim[" ".join(c.split())], "claim": c} for c in claims]
+    
+    @staticmethod
+    def _timed_out_result(claim: str, search_results: List[Dict[str, str]]) -> Dict[str, Any]:
+        """No verdict: the claim's sources were too slow, which says nothing about their content."""
+        return {
+            "claim": claim,
+            "is_verified": False,
+            "explanation": "Timed out fetching sources for this claim; retry it later.",
+            "sources": [{"title": item["title"], "url": item["url"], "snippet": ""} for item in search_results],
+            "confidence": 0.0,
+            "error": "timeout"
+        }
+    
+    def _build_result(self, claim: str, search_results: List[Dict[str, str]],
+                      pages: List[Optional[Dict[str, str]]],
+                      passage_cache: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """Turn search hits and their fetched pages into a verification result."""
         if not search_results:
-            result = {
+            return {
                 "claim": claim,
                 "is_verified": False,
                 "explanation": "No reliable sources found to verify this claim.",
                 "sources": [],
                 "confidence": 0.0
             }
+        
+        contexts = []
+        for page in pages:
+            if page and page.get("text"):
+                contexts.append({
+                    "title": page["title"],
+                    "url": page["url"],
+                    "snippet": page["text"][:500]  # First 500 chars
+                })
+        
+        if not contexts:
+            return {
+                "claim": claim,
+                "is_verified": False,
+                "explanation": "Unable to extract meaningful content from available sources.",
+                "sources": [{"title": item["title"], "url": item["url"], "snippet": ""} for item in search_results],
+                "confidence": 0.2
+            }
+        
+        # Use existing retrieval logic to find relevant passages
+        all_passages = []
+        for ctx in contexts:
+            chunks = passage_cache.get(ctx["url"]) if passage_cache is not None else None
+            if chunks is None:
+                chunks = chunk(ctx["snippet"], size=200, overlap=50)
+                if passage_cache is not None:
+                    passage_cache[ctx["url"]] = chunks
+            all_passages.extend(chunks)
+        
+        # Rank passages by relevance
+        if settings.use_embed_rerank:
+            ranked = embed_rerank(claim, all_passages, top_k=3)
         else:
-            # Fetch and analyze content from search results
-            contexts = []
-            for item in search_results[:4]:  # Limit to top 4 results
-                page = fetch_main_text(item["url"])
-                if page and page.get("text"):
-                    contexts.append({
-                        "title": page["title"],
-                        "url": page["url"],
-                        "snippet": page["text"][:500]  # First 500 chars
-                    })
-            
-            if contexts:
-                # Use existing retrieval logic to find relevant passages
-                all_passages = []
-                for ctx in contexts:
-                    chunks = chunk(ctx["snippet"], size=200, overlap=50)
-                    all_passages.extend(chunks)
-                
-                # Rank passages by relevance
-                if settings.use_embed_rerank:
-                    ranked = embed_rerank(claim, all_passages, top_k=3)
-                else:
-                    ranked = bm25_rank(claim, all_passages, k=3)
-                
-                # Generate explanation based on ranked passages
-                explanation = self._generate_explanation(claim, ranked, contexts)
-                
-                result = {
-                    "claim": claim,
-                    "is_verified": True,
-                    "explanation": explanation,
-                    "sources": [
-                        {
-                            "title": ctx["title"],
-                            "url": ctx["url"],
-                            "snippet": ctx["snippet"][:200] + "..."
-                        } for ctx in contexts
-                    ],
-                    "confidence": 0.75  # Could be improved with ML scoring
-                }
-            else:
-                result = {
-                    "claim": claim,
-                    "is_verified": False,
-                    "explanation": "Unable to extract meaningful content from available sources.",
-                    "sources": [{"title": item["title"], "url": item["url"], "snippet": ""} for item in search_results],
-                    "confidence": 0.2
-                }
+            ranked = bm25_rank(claim, all_passages, k=3)
         
-        # Track progress
-        source_url = result["sources"][0]["url"] if result["sources"] else None
-        self.progress_service.add_search_fact(user_id, claim, source_url)
+        # Generate explanation based on ranked passages
+        explanation = self._generate_explanation(claim, ranked, contexts)
         
-        return result
+        return {
+            "claim": claim,
+            "is_verified": True,
+            "explanation": explanation,
+            "sources": [
+                {
+                    "title": ctx["title"],
+                    "url": ctx["url"],
+                    "snippet": ctx["snippet"][:200] + "..."
+                } for ctx in contexts
+            ],
+            "confidence": 0.75  # Could be improved with ML scoring
+        }
     
     def _generate_explanation(self, claim: str, ranked_passages: List[tuple], contexts: List[Dict]) -> str:
         """Generate explanation based on ranked passages."""
@@ -104,21 +191,6 @@ class SearchService:
     
     def get_search_history(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get user's search history."""
-        progress = self.progress_service.get_user_progress(user_id)
-        if not progress:
-            return []
-        
-        # Get user facts and filter for search type
-        user = self.progress_service.user_repository.get_by_id(user_id)
-        if not user:
-            return []
-        
-        facts = user.facts_as_list
-        search_facts = [
-            fact for fact in facts 
-            if fact.get("type") == "search"
-        ]
-        
-        # Sort by learned_at descending and limit
-        search_facts.sort(key=lambda x: x.get("learned_at", ""), reverse=True)
-        return search_facts[:limit]
+        # Newest facts of the matching type, read from the indexed user_facts table
+        # (an unknown user simply has none)
+        return self.progress_service.get_facts(user_id, ["search"], limit)
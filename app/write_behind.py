@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import date
+from typing import Any
+
+from .core.config import settings
+from .models.fact_card import FactCard
+from .models.user_fact import UserFact
+from .repositories.fact_card_repository import FactCardRepository
+from .repositories.user_fact_repository import UserFactRepository
+
+logger = logging.getLogger(__name__)
+
+# (user_id, fact or None for a bare streak activity, day)
+ProgressEvent = tuple[int, UserFact | None, date]
+
+
+class WriteBehindBuffer:
+    """In-process queue for progress and automatic fact-card writes, flushed in batches.
+
+    Writes are flushed by a background thread when ``batch_size`` entries are queued or
+    every ``flush_interval`` seconds, each batch in one transaction (multi-row INSERTs,
+    pipelined UPDATEs). ``stop()`` flushes whatever is left, so a clean shutdown loses
+    nothing; a crash loses at most the unflushed writes. Queued and in-flight entries
+    stay visible through ``pending_progress()`` / ``pending_cards()`` so readers can
+    overlay them (read-your-writes). While a batch commits, a concurrent reader may
+    briefly count its entries twice.
+
+    A batch that keeps failing is retried ``max_retries`` times, then written row by row;
+    rows that still fail are logged and set aside in ``dead_letters`` so they cannot
+    block the entries queued behind them.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 1.0, max_pending: int = 10000,
+                 max_retries: int = 3,
+                 user_fact_repository: UserFactRepository | None = None,
+                 fact_card_repository: FactCardRepository | None = None):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max(1, max_retries)
+        self.user_fact_repository = user_fact_repository or UserFactRepository()
+        self.fact_card_repository = fact_card_repository or FactCardRepository()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._progress: list[ProgressEvent] = []
+        self._cards: list[FactCard] = []
+        self._inflight_progress: list[ProgressEvent] = []
+        self._inflight_cards: list[FactCard] = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._attempts = 0  # failed attempts of the batch at the head of the queue
+        # Most recent rows that could not be written even on their own: (kind, entry, error)
+        self.dead_letters: deque[tuple[str, Any, str]] = deque(maxlen=max(1, max_pending))
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+
+    def add_progress(self, user_id: int, fact: UserFact | None, day: date) -> None:
+        """Queue one unit of progress (see ``UserFactRepository.record_progress``)."""
+        with self._lock:
+            self._progress.append((user_id, fact, day))
+        self._after_add()
+
+    def add_fact_card(self, fact_card: FactCard) -> None:
+        """Queue a fact card insert."""
+        with self._lock:
+            self._cards.append(fact_card)
+        self._after_add()
+
+    def _after_add(self) -> None:
+        pending = self.pending_count()
+        if pending >= self.max_pending or self._thread is None:
+            # Backpressure (or no flusher running): the caller pays for the flush
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._progress) + len(self._cards)
+
+    def pending_progress(self, user_id: int) -> list[tuple[UserFact | None, date]]:
+        """Progress of ``user_id`` not yet committed, oldest first."""
+        with self._lock:
+            return [(fact, day) for uid, fact, day in self._inflight_progress + self._progress if uid == user_id]
+
+    def pending_cards(self, user_id: int) -> list[FactCard]:
+        """Fact cards of ``user_id`` not yet committed, oldest first."""
+        with self._lock:
+            return [card for card in self._inflight_cards + self._cards if card.user_id == user_id]
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of entries written.
+
+        A failed batch goes back to the head of the queue for the next flush; after
+        ``max_retries`` failures it is written row by row (see ``_write_rows``).
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    progress, self._progress = self._progress[:self.batch_size], self._progress[self.batch_size:]
+                    cards, self._cards = self._cards[:self.batch_size], self._cards[self.batch_size:]
+                    self._inflight_progress, self._inflight_cards = progress, cards
+                if not progress and not cards:
+                    return written
+                if self._attempts >= self.max_retries:
+                    count = self._write_rows(progress, cards)
+                else:
+                    try:
+                        with self.user_fact_repository.transaction():
+                            self.user_fact_repository.record_progress_batch(progress)
+                            self._write_cards(cards)
+                    except Exception as e:
+                        self._attempts += 1
+                        logger.warning("Write-behind batch of %d entries failed (attempt %d of %d): %s",
+                                       len(progress) + len(cards), self._attempts, self.max_retries, e)
+                        with self._lock:
+                            self._progress[:0] = progress
+                            self._cards[:0] = cards
+                            self._inflight_progress, self._inflight_cards = [], []
+                            self.failures += 1
+                        return written
+                    count = len(progress) + len(cards)
+                self._attempts = 0
+                with self._lock:
+                    self._inflight_progress, self._inflight_cards = [], []
+                    self.batches += 1
+                    self.flushed += count
+                written += count
+
+    def _write_rows(self, progress: list[ProgressEvent], cards: list[FactCard]) -> int:
+        """Write a repeatedly failing batch one row per transaction, dead-lettering rows that fail."""
+        written = 0
+        for event in progress:
+            try:
+                self.user_fact_repository.record_progress_batch([event])
+                written += 1
+            except Exception as e:
+                self._dead_letter("progress", event, e)
+        for card in cards:
+            try:
+                with self.fact_card_repository.transaction():
+                    self._write_cards([card])
+                written += 1
+            except Exception as e:
+                self._dead_letter("fact_card", card, e)
+        return written
+
+    def _dead_letter(self, kind: str, entry: Any, error: Exception) -> None:
+        logger.error("Write-behind dropped %s entry %r: %s", kind, entry, error)
+        with self._lock:
+            self.dead_letters.append((kind, entry, str(error)))
+            self.dead_lettered += 1
+
+    def _write_cards(self, cards: list[FactCard]) -> None:
+        if not cards:
+            return
+        # Cards of users deleted in the meantime would violate the foreign key
+        known = self.user_fact_repository.existing_user_ids(sorted({card.user_id for card in cards}))
+        self.fact_card_repository.create_many([card for card in cards if card.user_id in known])
+
+    def _flush_forever(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._flush_forever, name="healthfact-write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and write out everything still queued."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        self._wakeup.set()
+        if thread is not None:
+            thread.join(timeout=timeout)
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            if not self.flush():
+                time.sleep(0.1)  # batch failed; retry until the deadline
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._progress) + len(self._cards),
+                "in_flight": len(self._inflight_progress) + len(self._inflight_cards),
+                "flushed": self.flushed,
+                "batches": self.batches,
+                "failures": self.failures,
+                "dead_lettered": self.dead_lettered,
+            }
+
+
+write_behind = WriteBehindBuffer(
+    batch_size=settings.write_behind_batch_size,
+    flush_interval=settings.write_behind_flush_interval_seconds,
+    max_pending=settings.write_behind_max_pending,
+    max_retries=settings.write_behind_max_retries,
+)
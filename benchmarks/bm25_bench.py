@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy BM25 ranker against the previous rank_bm25-based bm25_rank.
+
+Checks that both return the same (score, passage) lists, then times:
+  - legacy: tokenize + BM25Okapi + O(n^2) sort on every call
+  - cold:   BM25Index build + query (first call for a passage set)
+  - warm:   query against a cached index (repeat claims / batches)
+
+Usage: python benchmarks/bm25_bench.py
+"""
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from app.bm25 import BM25Index
+from app.retrieve import bm25_rank, tokenize
+
+SIZES = [12, 100, 1000, 5000]
+QUERY = "does vitamin c prevent the common cold in adults"
+K = 3
+
+
+def legacy_bm25_rank(query: str, passages: list[str], k: int) -> list[tuple[float, str]]:
+    """The pre-NumPy implementation, kept verbatim for comparison."""
+    if not passages:
+        return []
+    tokenized_passages = [tokenize(p) for p in passages]
+    bm25 = BM25Okapi(tokenized_passages)
+    scores = bm25.get_scores(tokenize(query))
+    ranked = sorted(zip(scores, passages), key=lambda x: (x[0], passages.index(x[1])), reverse=True)
+    return ranked[:k]
+
+
+def make_passages(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    vocab = QUERY.split() + [f"term{i}" for i in range(2000)]
+    # Zipf-ish word frequencies, roughly passage-sized chunks like chunk(size=200)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    passages = [" ".join(rng.choices(vocab, weights=weights, k=rng.randint(20, 40))) for _ in range(n)]
+    # Include duplicates so the tie-break path is exercised
+    return passages + passages[: max(1, n // 20)]
+
+
+def best_of(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    print(f"{'passages':>9} {'legacy ms':>10} {'cold ms':>9} {'warm ms':>9} {'speedup(cold)':>14}")
+    for n in SIZES:
+        passages = make_passages(n)
+        expected = legacy_bm25_rank(QUERY, passages, K)
+        actual = BM25Index(passages, tokenize).top_k(tokenize(QUERY), K)
+        assert [p for _, p in expected] == [p for _, p in actual], "ranking mismatch"
+        assert [float(s) for s, _ in expected] == [s for s, _ in actual], "score mismatch"
+
+        full = BM25Index(passages, tokenize).get_scores(tokenize(QUERY))
+        legacy_full = BM25Okapi([tokenize(p) for p in passages]).get_scores(tokenize(QUERY))
+        assert np.array_equal(full, legacy_full), "score vector mismatch"
+
+        number = max(1, 2000 // n)
+        legacy = best_of(lambda: legacy_bm25_rank(QUERY, passages, K), number)
+        cold = best_of(lambda: BM25Index(passages, tokenize).top_k(tokenize(QUERY), K), number)
+        bm25_rank(QUERY, passages, K)  # populate the index cache
+        warm = best_of(lambda: bm25_rank(QUERY, passages, K), number * 10)
+        print(f"{len(passages):>9} {legacy:>10.3f} {cold:>9.3f} {warm:>9.3f} {legacy / cold:>13.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import streamlit as st
-from datetime import datetime, timedelta, date
+from datetime import datetime, timezone
 from typing import Dict, Optional
 import plotly.express as px
 import plotly.graph_objects as go
@@ -7,39 +7,24 @@ from plotly.subplots import make_subplots
 
 from styles.theme import get_theme_colors
 from components.cards import render_metric_card
-from utils.api import get_user_progress, get_categories_breakdown
+from utils.api import get_user_progress, get_categories_breakdown, get_activity_timeseries
 from utils.state import is_authenticated
 
-def create_weekly_facts_chart(progress_data: Dict, colors: Dict) -> Optional[go.Figure]:
+def create_weekly_facts_chart(timeseries_data: Dict, colors: Dict) -> Optional[go.Figure]:
     """Create a bar chart for facts learned this week."""
     try:
-        facts_this_week = progress_data.get("facts_this_week", 0)
-        total_facts = progress_data.get("total_facts", 0)
+        # One entry per day (oldest first), already zero-filled by the backend
+        series = timeseries_data.get("series", [])
+        if not series:
+            return None
         
-        # Create mock daily data for the week based on facts_this_week
-        # In a real implementation, you'd get daily breakdown from backend
-        today = date.today()
         week_days = []
         daily_facts = []
         
-        for i in range(7):
-            day_date = today - timedelta(days=6-i)
+        for day in series:
+            day_date = datetime.strptime(day["date"], "%Y-%m-%d").date()
             week_days.append(day_date.strftime("%a"))
-            
-            # Distribute facts across the week (mock data based on total)
-            if i == 6:  # Today
-                daily_facts.append(max(0, facts_this_week - sum(daily_facts)))
-            else:
-                # Random distribution for demo (in reality, this would come from backend)
-                import random
-                daily_facts.append(random.randint(0, max(1, facts_this_week // 4)))
-        
-        # Ensure we don't exceed facts_this_week
-        total_distributed = sum(daily_facts)
-        if total_distributed > facts_this_week:
-            # Scale down proportionally
-            scale_factor = facts_this_week / total_distributed if total_distributed > 0 else 0
-            daily_facts = [int(fact * scale_factor) for fact in daily_facts]
+            daily_facts.append(day.get("facts", 0))
         
         # Create bar chart directly with plotly.graph_objects instead of pandas
         fig = go.Figure(data=[
@@ -188,6 +173,7 @@ def render_progress() -> None:
     with st.spinner("📊 Loading your progress data..."):
         progress_data = get_user_progress()
         categories_data = get_categories_breakdown()
+        timeseries_data = get_activity_timeseries(7)
     
     if not progress_data:
         st.error("❌ Could not load progress data. Please try again later.")
@@ -223,7 +209,7 @@ def render_progress() -> None:
         st.markdown("### 📊 Weekly Activity")
         
         # Facts learned this week chart
-        facts_chart = create_weekly_facts_chart(progress_data, colors)
+        facts_chart = create_weekly_facts_chart(timeseries_data, colors) if timeseries_data else None
         if facts_chart:
             st.plotly_chart(facts_chart, use_container_width=True, key="facts_chart")
         else:
@@ -273,7 +259,7 @@ def render_progress() -> None:
         if last_activity:
             try:
                 last_date = datetime.strptime(last_activity, "%Y-%m-%d").date()
-                days_ago = (date.today() - last_date).days
+                days_ago = (datetime.now(timezone.utc).date() - last_date).days
                 
                 if days_ago == 0:
                     st.success("🔥 You're active today! Keep it up!")
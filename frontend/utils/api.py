@@ -184,6 +184,26 @@ def get_categories_breakdown() -> Optional[Dict]:
         return None
     return None
 
+def get_activity_timeseries(days: int = 7) -> Optional[Dict]:
+    """Get user's per-day activity for the last ``days`` days"""
+    try:
+        headers = get_auth_headers()
+        if not headers:
+            return None
+            
+        response = requests.get(
+            f"{API_URL}/progress/timeseries", 
+            headers=headers,
+            params={"days": days},
+            timeout=5
+        )
+        if response.status_code == 200:
+            return response.json()
+    except Exception as e:
+        st.error(f"❌ Error fetching activity: {e}")
+        return None
+    return None
+
 def track_search_activity(claim: str) -> bool:
     """Track search activity in user progress"""
     try:
@@ -300,14 +320,17 @@ def save_fact_card(search_query: str, search_result: Dict) -> bool:
         # Silently fail - fact card saving shouldn't break main functionality
         return False
 
-def get_user_fact_cards(category: str = "All", limit: int = 20, offset: int = 0) -> Optional[Dict]:
-    """Get user's saved fact cards"""
+def get_user_fact_cards(category: str = "All", limit: int = 20, offset: int = 0,
+                        cursor: Optional[str] = None) -> Optional[Dict]:
+    """Get user's saved fact cards (pass the previous page's next_cursor as cursor)"""
     try:
         headers = get_auth_headers()
         if not headers:
             return None
         
         params = {"category": category, "limit": limit, "offset": offset}
+        if cursor:
+            params["cursor"] = cursor
         response = requests.get(
             f"{API_URL}/fact-cards/",
             headers=headers,
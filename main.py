@@ -4,13 +4,41 @@ HealthFactAI Backend Application - Clean Architecture.
 This is the new clean architecture implementation that integrates 
 existing functionality with proper separation of concerns.
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.v1 import api_router
+from app.cache import request_scope, start_janitor, stop_janitor
+from app.core.database import DatabaseUnavailable, async_db_manager, db_manager
+from app.http_client import aclose_clients
+from app.password_hashing import password_hasher
+from app.write_behind import write_behind
+
+# Database connections are pooled by app/core/database.py
 
-# Database is initialized through app/core/database.py
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks."""
+    if settings.cache_sweep_interval_seconds > 0:
+        start_janitor(settings.cache_sweep_interval_seconds)
+    # Start filling the DB pool now rather than on the first request
+    db_manager.open()
+    await async_db_manager.open()
+    if settings.write_behind_enabled:
+        write_behind.start()
+    yield
+    stop_janitor()
+    # Queued writes go out before the pools close
+    write_behind.stop()
+    db_manager.close()
+    await async_db_manager.close()
+    # Release pooled upstream connections
+    await aclose_clients()
+    password_hasher.shutdown()
 
 def create_application() -> FastAPI:
     """Create and configure the FastAPI application."""
@@ -21,6 +49,7 @@ def create_application() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url=f"{settings.API_V1_STR}/docs",
         redoc_url=f"{settings.API_V1_STR}/redoc",
+        lifespan=lifespan,
     )
 
     # Add CORS middleware
@@ -32,6 +61,21 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.middleware("http")
+    async def request_cache_scope(request: Request, call_next):
+        # Users (and other per-request lookups) are loaded at most once per request
+        with request_scope():
+            return await call_next(request)
+
+    @app.exception_handler(DatabaseUnavailable)
+    async def database_unavailable(request: Request, exc: DatabaseUnavailable):
+        # Pool exhausted: shed the request instead of failing it as a server error
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "The database is busy at the moment, please retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+
     # Include API router
     app.include_router(api_router, prefix=settings.API_V1_STR)
     
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Apply database schema migrations for HealthFactAI.
+
+Usage:
+    python migrate.py              # apply all pending migrations
+    python migrate.py --list       # show applied/pending versions
+    python migrate.py --target 2   # apply up to version 2
+
+Works against PostgreSQL (DATABASE_URL=postgresql://...) and
+SQLite (DATABASE_URL=sqlite:///./healthfact.db).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.migrations import MIGRATIONS, applied_versions, run_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply HealthFactAI schema migrations")
+    parser.add_argument("--target", type=int, default=None, help="highest version to apply")
+    parser.add_argument("--list", action="store_true", help="list migrations and exit")
+    args = parser.parse_args()
+
+    backend = "PostgreSQL" if settings.is_postgresql else f"SQLite ({settings.sqlite_path})"
+    print(f"📍 Database: {backend}")
+
+    try:
+        if args.list:
+            applied = applied_versions()
+            for migration in MIGRATIONS:
+                state = "applied" if migration.version in applied else "pending"
+                print(f"  {migration.version:>4}  {migration.name:<32} {state}")
+            return 0
+
+        done = run_migrations(target=args.target, verbose=True)
+        if done:
+            print(f"✅ Applied {len(done)} migration(s)")
+        else:
+            print("✅ Schema is up to date")
+        return 0
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
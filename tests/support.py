@@ -0,0 +1,37 @@
+"""
+Shared setup for the tests: every test class gets its own throwaway SQLite database.
+
+Import this module before anything from ``app`` so settings start out on SQLite.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "healthfact-test.db"))
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import settings
+from app.repositories.user_repository import USER_CACHE
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Points DATABASE_URL at a fresh SQLite file for the class (migrate it in setUpClass)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._db_dir = tempfile.TemporaryDirectory()
+        cls._previous_url = settings.DATABASE_URL
+        settings.DATABASE_URL = f"sqlite:///{Path(cls._db_dir.name) / 'test.db'}"
+        # User ids restart at 1 in every database
+        USER_CACHE.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        settings.DATABASE_URL = cls._previous_url
+        USER_CACHE.clear()
+        cls._db_dir.cleanup()
@@ -0,0 +1,140 @@
+"""
+TTLCache checks, on a fake monotonic clock.
+
+Usage: python -m unittest discover tests
+"""
+import asyncio
+import types
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (project root on sys.path)
+
+from app.cache import TTLCache
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        clock = types.SimpleNamespace(monotonic=lambda: self.now)
+        patcher = mock.patch("app.cache.time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def keys(self, cache):
+        return sorted(key for shard in cache._shards for key in shard.store)
+
+
+class CapacityTest(CacheTestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2, shards=1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(self.keys(cache), ["a", "c"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_capacity_is_per_shard(self):
+        cache = TTLCache(maxsize=4, shards=2)
+        # Even ints all hash to the first shard, which holds maxsize // shards entries
+        for key in (0, 2, 4):
+            cache.set(key, key)
+        cache.set(1, 1)
+        self.assertEqual(self.keys(cache), [1, 2, 4])
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=10, shards=1, maxbytes=100, sizeof=len)
+        cache.set("a", "x" * 40)
+        cache.set("b", "x" * 40)
+        cache.set("c", "x" * 40)
+        self.assertEqual(self.keys(cache), ["b", "c"])
+        self.assertEqual(cache.stats()["bytes"], 80)
+
+    def test_oversize_values_are_not_cached(self):
+        cache = TTLCache(maxsize=10, shards=2, maxbytes=200, max_entry_bytes=150, sizeof=len)
+        cache.set("small", "x" * 10)
+        cache.set("over_entry_limit", "x" * 160)
+        cache.set("over_shard_share", "x" * 120)  # each shard gets 100 bytes
+        self.assertEqual(self.keys(cache), ["small"])
+        self.assertEqual(cache.stats()["rejections"], 2)
+
+    def test_rejected_value_drops_the_old_one(self):
+        cache = TTLCache(maxsize=10, shards=1, max_entry_bytes=50, sizeof=len)
+        cache.set("k", "old")
+        cache.set("k", "x" * 60)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+
+class ExpiryTest(CacheTestCase):
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = TTLCache(ttl_seconds=10)
+        cache.set("default", 1)
+        cache.set("short", 2, ttl_seconds=1)
+        self.now += 5
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("default"), 1)
+        self.now += 6
+        self.assertIsNone(cache.get("default"))
+
+    def test_purge_reclaims_expired_entries_from_the_heap(self):
+        cache = TTLCache(ttl_seconds=10, shards=1)
+        for key in range(5):
+            cache.set(key, key)
+        # Overwritten with a longer TTL: its old heap record must not purge it
+        cache.set(0, "kept", ttl_seconds=100)
+        self.now += 11
+        self.assertEqual(cache.purge_expired(), 4)
+        self.assertEqual(self.keys(cache), [0])
+        self.assertEqual(cache.stats()["expirations"], 4)
+
+    def test_writes_purge_expired_entries(self):
+        cache = TTLCache(ttl_seconds=10, shards=1)
+        cache.set("old", 1)
+        self.now += 11
+        cache.set("new", 2)
+        self.assertEqual(self.keys(cache), ["new"])
+
+    def test_heap_stays_bounded_under_overwrites(self):
+        cache = TTLCache(ttl_seconds=10, shards=1)
+        for value in range(1000):
+            cache.set("hot", value)
+        self.assertLessEqual(len(cache._shards[0].expiry), 2 * len(cache) + 64)
+
+
+class StaleWhileRevalidateTest(CacheTestCase):
+
+    def test_stale_value_is_served_while_it_refreshes(self):
+        cache = TTLCache(ttl_seconds=5, stale_ttl_seconds=10)
+        values = iter(["v1", "v2"])
+
+        async def compute():
+            return next(values)
+
+        async def run():
+            first = await cache.aget_or_compute("k", compute)
+            self.now += 7  # past the TTL, within the stale window
+            stale = await cache.aget_or_compute("k", compute)
+            self.assertIsNone(cache.get("k"))  # plain get() never returns stale values
+            await asyncio.gather(*cache._refresh_tasks)
+            return first, stale, await cache.aget_or_compute("k", compute)
+
+        self.assertEqual(asyncio.run(run()), ("v1", "v1", "v2"))
+        stats = cache.stats()
+        self.assertEqual((stats["stale_hits"], stats["refreshes"]), (1, 1))
+
+    def test_value_past_the_stale_window_is_recomputed(self):
+        cache = TTLCache(ttl_seconds=5, stale_ttl_seconds=10)
+        values = iter(["v1", "v2"])
+        self.assertEqual(cache.get_or_compute("k", lambda: next(values)), "v1")
+        self.now += 16
+        self.assertEqual(cache.get_or_compute("k", lambda: next(values)), "v2")
+        self.assertEqual(cache.stats()["refreshes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+SingleFlight coalescing checks.
+
+Usage: python -m unittest discover tests
+"""
+import asyncio
+import threading
+import unittest
+
+import support  # noqa: F401  (project root on sys.path)
+
+from app.concurrency import SingleFlight
+
+
+class WatchedSingleFlight(SingleFlight):
+    """Sets ``joined`` whenever a caller attaches to a computation already in flight."""
+
+    def __init__(self):
+        super().__init__()
+        self.joined = threading.Event()
+
+    def _claim(self, key):
+        future, leader = super()._claim(key)
+        if not leader:
+            self.joined.set()
+        return future, leader
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        self.flights = WatchedSingleFlight()
+        self.calls = 0
+
+    async def slow(self, release, result="done"):
+        self.calls += 1
+        await release.wait()
+        return result
+
+    async def start(self, fn, *args):
+        """Call ``do_async("k", fn, *args)`` in a task and let it reach its first await."""
+        task = asyncio.create_task(self.flights.do_async("k", fn, *args))
+        await asyncio.sleep(0)
+        return task
+
+    def test_followers_share_the_leaders_result(self):
+        async def run():
+            release = asyncio.Event()
+            leader = await self.start(self.slow, release)
+            followers = [await self.start(self.slow, asyncio.Event(), "own") for _ in range(2)]
+            release.set()
+            return await asyncio.gather(leader, *followers)
+
+        self.assertEqual(asyncio.run(run()), ["done", "done", "done"])
+        self.assertEqual(self.calls, 1)
+        self.assertFalse(self.flights.in_flight("k"))
+
+    def test_followers_see_the_leaders_failure(self):
+        async def failing(release):
+            self.calls += 1
+            await release.wait()
+            raise ValueError("upstream down")
+
+        async def run():
+            release = asyncio.Event()
+            leader = await self.start(failing, release)
+            followers = [await self.start(self.slow, asyncio.Event()) for _ in range(2)]
+            release.set()
+            return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertEqual([type(result) for result in results], [ValueError] * 3)
+        self.assertEqual(self.calls, 1)
+        self.assertFalse(self.flights.in_flight("k"))
+
+    def test_follower_takes_over_when_leader_is_cancelled(self):
+        async def run():
+            release = asyncio.Event()
+            leader = await self.start(self.slow, asyncio.Event())
+            follower = await self.start(self.slow, release, "retried")
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            # The follower saw _Abandoned and now leads its own call
+            await asyncio.sleep(0)
+            self.assertTrue(self.flights.in_flight("k"))
+            release.set()
+            return await follower
+
+        self.assertEqual(asyncio.run(run()), "retried")
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(self.flights.in_flight("k"))
+
+    def test_sync_callers_on_other_threads_coalesce(self):
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def slow():
+            self.calls += 1
+            started.set()
+            release.wait(5)
+            return "done"
+
+        leader = threading.Thread(target=lambda: results.append(self.flights.do("k", slow)))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        follower = threading.Thread(target=lambda: results.append(self.flights.do("k", slow)))
+        follower.start()
+        self.assertTrue(self.flights.joined.wait(5))
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(results, ["done", "done"])
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
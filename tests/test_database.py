@@ -0,0 +1,102 @@
+"""
+Async transaction checks on the SQLite fallback, and how pool exhaustion is reported.
+
+Usage: python -m unittest discover tests
+"""
+import asyncio
+import unittest
+
+from support import SQLiteTestCase
+
+from fastapi.testclient import TestClient
+
+from app.core.database import DatabaseUnavailable, async_db_manager, db_manager
+from app.core.dependencies import get_current_user_id, get_fact_card_service
+from app.repositories.fact_card_repository import AsyncFactCardRepository, FactCardRepository
+from app.services.fact_card_service import FactCardService
+from main import app
+
+
+class AsyncSQLiteTransactionTest(SQLiteTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        db_manager.execute_command("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT NOT NULL)")
+
+    def setUp(self):
+        db_manager.execute_command("DELETE FROM notes")
+
+    def bodies(self):
+        return [row[0] for row in db_manager.execute_query("SELECT body FROM notes ORDER BY id")]
+
+    async def insert(self, body):
+        return await async_db_manager.execute_command_get_id(
+            "INSERT INTO notes (body) VALUES (%s) RETURNING id", (body,)
+        )
+
+    def test_block_commits_together(self):
+        async def work():
+            async with async_db_manager.transaction():
+                await self.insert("first")
+                await self.insert("second")
+                # Uncommitted writes are visible inside the block
+                return await async_db_manager.execute_query("SELECT COUNT(*) FROM notes")
+        self.assertEqual(asyncio.run(work())[0][0], 2)
+        self.assertEqual(self.bodies(), ["first", "second"])
+
+    def test_failure_rolls_back_whole_block(self):
+        async def work():
+            async with async_db_manager.transaction():
+                await self.insert("first")
+                await self.insert(None)  # NOT NULL
+        with self.assertRaises(Exception):
+            asyncio.run(work())
+        self.assertEqual(self.bodies(), [])
+
+    def test_nested_block_is_a_savepoint(self):
+        async def work():
+            async with async_db_manager.transaction():
+                await self.insert("outer")
+                try:
+                    async with async_db_manager.transaction():
+                        await self.insert("inner")
+                        raise RuntimeError("inner failure")
+                except RuntimeError:
+                    pass
+        asyncio.run(work())
+        self.assertEqual(self.bodies(), ["outer"])
+
+    def test_on_commit_waits_for_commit(self):
+        events = []
+
+        async def work():
+            async with async_db_manager.transaction():
+                await self.insert("first")
+                async_db_manager.on_commit(lambda: events.append("committed"))
+                events.append("block done")
+        asyncio.run(work())
+        self.assertEqual(events, ["block done", "committed"])
+
+
+class _ExhaustedPoolRepository(AsyncFactCardRepository):
+    async def count_by_category(self, user_id):
+        raise DatabaseUnavailable("No PostgreSQL connection available within 5s")
+
+
+class DatabaseUnavailableResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        service = FactCardService(FactCardRepository(), _ExhaustedPoolRepository())
+        app.dependency_overrides[get_fact_card_service] = lambda: service
+        self.addCleanup(app.dependency_overrides.clear)
+
+    def test_pool_timeout_is_a_503_with_retry_after(self):
+        response = TestClient(app).get("/api/v1/fact-cards/stats")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Regression checks for fact-card search on a throwaway SQLite database.
+
+FactCardService swallows repository errors and returns [], so a broken query
+shows up as "no results" rather than an exception; these assert on results.
+
+Usage: python -m unittest discover tests
+"""
+import asyncio
+import unittest
+
+from support import SQLiteTestCase
+
+from app.core.migrations import run_migrations
+from app.models.fact_card import FactCard
+from app.models.user import User
+from app.repositories.fact_card_repository import FactCardRepository
+from app.repositories.user_repository import UserRepository
+from app.services.fact_card_service import FactCardService
+
+
+class FactCardSearchTest(SQLiteTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        run_migrations()
+        user = UserRepository().create(User(username="searcher", password="x", email=None,
+                                            facts_learned="[]"))
+        cls.user_id = user.id
+        cls.repository = FactCardRepository()
+        cls.repository.create(FactCard(
+            user_id=cls.user_id,
+            title="Vitamin C and the common cold",
+            summary="Regular supplements do not prevent colds in most adults.",
+            category="Nutrition",
+            confidence="High",
+            sources="[]",
+            search_query="does vitamin c prevent colds",
+        ))
+        cls.service = FactCardService(cls.repository)
+
+    def search(self, term, **kwargs):
+        return asyncio.run(self.service.search_fact_cards_async(self.user_id, term, **kwargs))
+
+    def test_full_text_matches_whole_words(self):
+        results = self.search("vitamin")
+        self.assertEqual([card["title"] for card in results], ["Vitamin C and the common cold"])
+
+    def test_full_text_matches_last_word_as_prefix(self):
+        self.assertEqual(len(self.search("vit")), 1)
+        self.assertEqual(len(self.search("common co")), 1)
+
+    def test_full_text_requires_every_word(self):
+        self.assertEqual(self.search("vitamin zinc"), [])
+
+    def test_full_text_filters_by_category(self):
+        self.assertEqual(len(self.search("vitamin", category="Nutrition")), 1)
+        self.assertEqual(self.search("vitamin", category="Exercise"), [])
+
+    def test_punctuation_only_term_returns_nothing(self):
+        self.assertEqual(self.search("?!"), [])
+
+    def test_substring_mode(self):
+        self.assertEqual(len(self.search("itami", full_text=False)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
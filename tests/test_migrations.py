@@ -0,0 +1,90 @@
+"""
+Migration checks on a throwaway SQLite database.
+
+Usage: python -m unittest discover tests
+"""
+import json
+import logging
+import unittest
+
+from support import SQLiteTestCase
+
+from app.core.database import db_manager
+from app.core.migrations import run_migrations
+
+
+class _Messages(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class UserFactsBackfillTest(SQLiteTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        run_migrations(target=3)
+        cls.good = json.dumps([
+            {"content": "vitamin c", "category": "Nutrition", "learned_at": "2024-01-02T10:00:00Z"},
+            {"content": "quiz", "category": "Quiz", "type": "quiz", "questions": 5},
+        ])
+        cls.blobs = {
+            "good": cls.good,
+            "not_json": "[{oops",
+            "not_a_list": '{"content": "x"}',
+            "mixed": json.dumps([{"content": "sleep", "category": "Sleep"}, "stray string"]),
+        }
+        cls.ids = {}
+        for username, blob in cls.blobs.items():
+            cls.ids[username] = db_manager.execute_command_get_id(
+                "INSERT INTO users (username, password, facts_learned) VALUES (%s, %s, %s) RETURNING id",
+                (username, "x", blob)
+            )
+        handler = _Messages()
+        logger = logging.getLogger("app.core.migrations")
+        logger.addHandler(handler)
+        try:
+            run_migrations()
+        finally:
+            logger.removeHandler(handler)
+        cls.logs = handler.messages
+
+    def facts_learned(self, username):
+        return db_manager.execute_query("SELECT facts_learned FROM users WHERE id = %s",
+                                        (self.ids[username],))[0][0]
+
+    def user_facts(self, username):
+        return db_manager.execute_query(
+            "SELECT type, category, content, extra FROM user_facts WHERE user_id = %s ORDER BY id",
+            (self.ids[username],)
+        )
+
+    def test_good_blob_is_moved_to_user_facts(self):
+        self.assertEqual(self.user_facts("good"), [
+            ("general", "Nutrition", "vitamin c", None),
+            ("quiz", "Quiz", "quiz", '{"questions":5}'),
+        ])
+        self.assertEqual(self.facts_learned("good"), "[]")
+
+    def test_malformed_blobs_are_kept(self):
+        for username in ("not_json", "not_a_list"):
+            self.assertEqual(self.facts_learned(username), self.blobs[username])
+            self.assertEqual(self.user_facts(username), [])
+
+    def test_partially_converted_blob_is_kept(self):
+        self.assertEqual([row[2] for row in self.user_facts("mixed")], ["sleep"])
+        self.assertEqual(self.facts_learned("mixed"), self.blobs["mixed"])
+
+    def test_skipped_users_are_logged(self):
+        logged = "\n".join(self.logs)
+        for username in ("not_json", "not_a_list", "mixed"):
+            self.assertIn(f"user {self.ids[username]} ", logged)
+        self.assertNotIn(f"user {self.ids['good']} ", logged)
+
+
+if __name__ == "__main__":
+    unittest.main()
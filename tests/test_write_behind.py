@@ -0,0 +1,155 @@
+"""
+Write-behind buffer checks on a throwaway SQLite database.
+
+Usage: python -m unittest discover tests
+"""
+import asyncio
+import threading
+import unittest
+from datetime import date
+
+from support import SQLiteTestCase
+
+from app.core.database import db_manager
+from app.core.migrations import run_migrations
+from app.models.user import User
+from app.models.user_fact import UserFact
+from app.repositories.fact_card_repository import FactCardRepository
+from app.repositories.user_fact_repository import UserFactRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.health_categories import HealthCategory
+from app.services.fact_card_service import FactCardService
+from app.write_behind import WriteBehindBuffer
+
+
+class FlakyUserFactRepository(UserFactRepository):
+    """Fails the next ``failures`` batches, and every batch holding a ``poison`` fact."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 0
+        self.poison = set()
+        self.entered = threading.Event()
+        self.release = None  # set to an Event to hold batches until it is set
+
+    def record_progress_batch(self, events):
+        if self.release is not None:
+            self.entered.set()
+            self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database went away")
+        if any(fact is not None and fact.content in self.poison for _, fact, _ in events):
+            raise RuntimeError("bad row")
+        return super().record_progress_batch(events)
+
+
+class WriteBehindTest(SQLiteTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        run_migrations()
+
+    def setUp(self):
+        self.user_id = UserRepository().create(User(username=self.id(), password="x", email=None,
+                                                    facts_learned="[]")).id
+        self.repository = FlakyUserFactRepository()
+        self.buffer = WriteBehindBuffer(batch_size=100, flush_interval=60, max_retries=2,
+                                        user_fact_repository=self.repository)
+        # Pretend a flusher is running so adds only queue; the tests flush explicitly
+        self.buffer._thread = object()
+
+    def add_fact(self, content):
+        fact = UserFact.create(self.user_id, content=content, category="Nutrition")
+        self.buffer.add_progress(self.user_id, fact, date.today())
+        return fact
+
+    def stored_facts(self):
+        return [row[0] for row in db_manager.execute_query(
+            "SELECT content FROM user_facts WHERE user_id = %s ORDER BY id", (self.user_id,)
+        )]
+
+    def test_failed_batch_is_retried(self):
+        self.repository.failures = 1
+        self.add_fact("first")
+        self.add_fact("second")
+
+        with self.assertLogs("app.write_behind", "WARNING"):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.pending_count(), 2)
+        self.assertEqual(self.stored_facts(), [])
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.buffer.pending_count(), 0)
+        self.assertEqual(self.stored_facts(), ["first", "second"])
+        self.assertEqual(self.buffer.stats()["failures"], 1)
+
+    def test_bad_row_is_dead_lettered_after_max_retries(self):
+        self.repository.poison.add("bad")
+        for content in ("before", "bad", "after"):
+            self.add_fact(content)
+
+        # Whole batch fails max_retries times, then goes row by row
+        with self.assertLogs("app.write_behind", "WARNING") as logs:
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(self.buffer.flush(), 2)
+        self.assertIn("dropped progress entry", logs.output[-1])
+
+        self.assertEqual(self.stored_facts(), ["before", "after"])
+        self.assertEqual(self.buffer.pending_count(), 0)
+        [(kind, (user_id, fact, _), error)] = self.buffer.dead_letters
+        self.assertEqual((kind, user_id, fact.content, error), ("progress", self.user_id, "bad", "bad row"))
+        self.assertEqual(self.buffer.stats()["dead_lettered"], 1)
+
+        # The next batch is written whole again
+        self.add_fact("later")
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.stats()["batches"], 2)
+
+    def test_stop_drains_queue(self):
+        self.buffer._thread = None
+        self.buffer.start()
+        self.add_fact("queued")
+        self.buffer.add_progress(self.user_id, None, date.today())
+        self.buffer.stop()
+
+        self.assertEqual(self.buffer.pending_count(), 0)
+        self.assertEqual(self.stored_facts(), ["queued"])
+        self.assertEqual(self.buffer.stats()["flushed"], 2)
+
+    def test_in_flight_progress_stays_visible(self):
+        self.repository.release = threading.Event()
+        fact = self.add_fact("in flight")
+        flusher = threading.Thread(target=self.buffer.flush)
+        flusher.start()
+        try:
+            self.assertTrue(self.repository.entered.wait(5))
+            self.assertEqual(self.buffer.pending_count(), 0)
+            self.assertEqual(self.buffer.pending_progress(self.user_id), [(fact, date.today())])
+            self.assertEqual(self.buffer.stats()["in_flight"], 1)
+        finally:
+            self.repository.release.set()
+            flusher.join(5)
+
+        self.assertEqual(self.buffer.pending_progress(self.user_id), [])
+        self.assertEqual(self.stored_facts(), ["in flight"])
+
+    def test_queued_cards_are_overlaid_on_reads(self):
+        service = FactCardService(FactCardRepository(), write_buffer=self.buffer)
+        service.save_search_result(self.user_id, "is green tea good for you",
+                                   {"title": "Green tea", "summary": "Mostly harmless."},
+                                   category=HealthCategory.NUTRITION)
+
+        cards, _, total = asyncio.run(service.get_user_fact_cards_page_async(self.user_id))
+        self.assertEqual(([card["title"] for card in cards], total), (["Green tea"], 1))
+        self.assertEqual(asyncio.run(service.get_user_categories_async(self.user_id)), ["All", "Nutrition"])
+        self.assertEqual(len(asyncio.run(service.search_fact_cards_async(self.user_id, "green te"))), 1)
+        self.assertEqual(asyncio.run(service.get_fact_card_stats_async(self.user_id))["total_fact_cards"], 1)
+        # Reads did not force a flush
+        self.assertEqual(self.buffer.pending_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()